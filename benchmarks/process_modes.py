@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark of the isentrope/polytrope methods: the 10 step march ("march") against the
+# entropy function inversion ("entropy"). Both end states are compared with a converged reference (the same
+# march with REFERENCE_STEPS midpoint steps on the exact gas properties), so the deviation between the modes shows up
+# as the discretisation error of the 10 step march. Reports the errors, the round trip error and the runtime
+# (without the PropertyCache, every call is evaluated).
+#
+# Usage (from any directory):
+#	python benchmarks/process_modes.py
+
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gtdev.helper_methods import PROCESS_MODES, getProcessMode, isentrope, kappaStatic, polytrope, propertyCache, \
+    setProcessMode
+
+# eta_pol (None: isentropic), T1 [K], p1 [Pa], p2 [Pa], Ma [-], material, beta [-]
+CASES = [
+    [None, 288.15, 101325.0, 8.0 * 101325.0, 0.0, "Air", 0.0],
+    [0.90, 288.15, 101325.0, 4.0 * 101325.0, 0.5, "Air", 0.0],
+    [0.88, 450.0, 4.0e5, 1.6e6, 0.3, "Air", 0.0],
+    [None, 1200.0, 8.0e5, 1.0e5, 0.2, "exhaust", 0.02],
+    [0.88, 1200.0, 8.0e5, 1.0e5, 0.2, "exhaust", 0.02],
+    [0.90, 1500.0, 1.5e6, 3.0e5, 0.3, "exhaust", 0.03],
+]
+REPEAT = 20
+# steps of the reference march (discretisation error below 1e-6 K)
+REFERENCE_STEPS = 20000
+
+
+def endState(eta_pol, T1, p1, p2, Ma, material, beta):
+    if eta_pol is None:
+        T2 = isentrope(T1=T1, p1=p1, p2=p2, Ma=Ma, material=material, beta=beta)
+        p2back = isentrope(T1=T1, T2=T2, p1=p1, Ma=Ma, material=material, beta=beta)
+    else:
+        T2 = polytrope(eta_pol=eta_pol, T1=T1, p1=p1, p2=p2, Ma=Ma, material=material, beta=beta)
+        p2back = polytrope(eta_pol=eta_pol, T1=T1, T2=T2, p1=p1, Ma=Ma, material=material, beta=beta)
+    return T2, p2back
+
+
+# kappa(Tt, Ma) by fixed point iteration on the exact correlations (same as getKappa in "fsolve" mode)
+def exactKappa(Tt, Ma, material, beta):
+    kappa = 1.4
+    for i in range(50):
+        kappa_new = kappaStatic(Tt / (1 + (kappa - 1) / 2 * Ma ** 2), material, beta)
+        if abs(kappa_new - kappa) < 1e-12:
+            break
+        kappa = kappa_new
+    return kappa_new
+
+
+# end temperature of the march with steps steps, kappa taken at the middle of each step (second order, the
+# 10 step march of polytrope takes kappa at the start of the step)
+def referenceState(eta_pol, T1, p1, p2, Ma, material, beta, steps=REFERENCE_STEPS):
+    exponent = 1.0 if eta_pol is None else (1.0 / eta_pol if p2 < p1 else eta_pol)
+    T = T1
+    pressures = numpy.linspace(p1, p2, steps).tolist()
+    for pi_alt, pi in zip(pressures[:-1], pressures[1:]):
+        kappa = exactKappa(T, Ma, material, beta)
+        T_mid = T * (pi / pi_alt) ** ((kappa - 1.0) / kappa / exponent / 2)
+        kappa = exactKappa(T_mid, Ma, material, beta)
+        T *= (pi / pi_alt) ** ((kappa - 1.0) / kappa / exponent)
+    return T
+
+
+def main():
+    oldProcessMode = getProcessMode()
+    try:
+        results = {}
+        with propertyCache(enabled=False):
+            for mode in PROCESS_MODES:
+                setProcessMode(mode)
+                start = time.time()
+                for i in range(REPEAT):
+                    results[mode] = [endState(*case) for case in CASES]
+                results[mode + "_time"] = (time.time() - start) / (REPEAT * len(CASES) * 2)
+        reference = [referenceState(*case) for case in CASES]
+
+        print("%-8s %-6s %9s %9s %12s %12s %12s %12s" % ("material", "eta", "T1", "p2/p1", "T2 reference",
+                                                         "error march", "err entropy", "dp2/p2 march"))
+        for case, T2, march, entropy in zip(CASES, reference, results["march"], results["entropy"]):
+            print("%-8s %-6s %9.2f %9.3f %12.4f %12.4f %12.2e %12.2e" % (
+                case[5], str(case[0]), case[1], case[3] / case[2], T2, march[0] - T2, entropy[0] - T2,
+                march[1] / case[3] - 1.0))
+
+        print("")
+        for mode in PROCESS_MODES:
+            error = numpy.array([state[0] for state in results[mode]]) - reference
+            print("%-8s max |T2 - T2 reference| = %.2e K, %10.1f us per call" % (
+                mode, numpy.max(numpy.abs(error)), 1e6 * results[mode + "_time"]))
+    finally:
+        setProcessMode(oldProcessMode)
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
 # -*- coding: utf-8 -*-
 __all__ = ["gui", "abstract", "compressor", "cyclePlotter", "nozzle", "turbine", "turbofan", "turbojet",
-           "bladeDesignerThread", "bladeDesignerXML", "combChamber"]
+           "bladeDesignerThread", "bladeDesignerXML", "combChamber", "solvers", "sweep", "continuation",
+           "atmosphere", "sensitivity", "optimization", "montecarlo", "stageLoading", "resultCache", "resultStore",
+           "designLibrary"]
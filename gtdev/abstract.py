@@ -8,20 +8,115 @@
 # Published under the Terms of GNU public licence v3
 # ===============================================================================
 
+import contextlib
+import copy
 import math
 import sys
+import numpy
 from gtdev import helper_methods
 
 if sys.version_info[0] == 2:
-    from ConfigParser import ConfigParser, RawConfigParser
+    from ConfigParser import ConfigParser, RawConfigParser, NoSectionError, NoOptionError
 elif sys.version_info[0] == 3:
-    from configparser import ConfigParser, RawConfigParser
+    from configparser import ConfigParser, RawConfigParser, NoSectionError, NoOptionError
+
+# Art des Werts eines Parameters im Parameter store
+OBJECT_VALUE = 0  # None, int, str, array, ... (nicht im Vektor)
+FLOAT_VALUE = 1  # python float
+NUMPY_FLOAT_VALUE = 2  # numpy.float64
+
+
+# parameter schema of an AbstractTurbo class: the parameter names of all instances with their index in the value
+# vector and one shared ["name", "unit", "description"] list per parameter definition
+class ParameterSchema(object):
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.definitions = {}
+
+    # registers a parameter definition and returns the shared definition list
+    def register(self, cls, definition):
+        key = tuple(definition)
+        if key in self.definitions and key[0] in self.index:
+            return self.definitions[key]
+        if key not in self.definitions:
+            self.definitions[key] = list(definition)
+        name = definition[0]
+        if name not in self.index:
+            attribute = getattr(cls, name, None)
+            if attribute is None or isinstance(attribute, Parameter):
+                self.index[name] = len(self.names)
+                self.names.append(name)
+                setattr(cls, name, Parameter(name, self.index[name]))
+        return self.definitions[key]
+
+
+# descriptor of a parameter: float values are written through to the float64 vector of the instance (_values),
+# the type of the value is kept in _kinds. The descriptor has no __get__, so reading an attribute stays a plain
+# lookup in the instance dictionary.
+class Parameter(object):
+    __slots__ = ("name", "index")
+
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
+        i = self.index
+        if i >= len(obj._kinds):
+            obj._resizeParameterStore()
+        if type(value) is float:
+            obj._values[i] = value
+            obj._kinds[i] = FLOAT_VALUE
+        elif type(value) is numpy.float64:
+            obj._values[i] = value
+            obj._kinds[i] = NUMPY_FLOAT_VALUE
+        elif obj._kinds[i] != OBJECT_VALUE:
+            obj._values[i] = numpy.nan
+            obj._kinds[i] = OBJECT_VALUE
+
+    # deleting a parameter resets it to None (as initialize)
+    def __delete__(self, obj):
+        self.__set__(obj, None)
+
+
+# copy of an attribute value for clone and snapshots (immutable values are shared, containers and arrays copied
+# one level deep)
+def _copyValue(value):
+    if value is None or type(value) in (float, int, str, bool, numpy.float64):
+        return value
+    return copy.copy(value)
+
+
+# equality of two parameter values (arrays elementwise, nan is never equal)
+def _isEqual(a, b):
+    if type(a) is float and type(b) is float:
+        return a == b
+    try:
+        return bool(numpy.array_equal(a, b))
+    except Exception:
+        return False
+
+
+## state of a component and its subcomponents (result of AbstractTurbo.takeSnapshot)
+class ComponentSnapshot(object):
+    __slots__ = ("component", "state", "children")
+
+    def __init__(self, component, state, children):
+        self.component = component
+        self.state = state
+        self.children = children
 
 
 # abstract class for any turbomachine object - provides methods for communication and initialization
 # Inheritated by any system-defining class
 class AbstractTurbo(object):
     def __init__(self, ident_):
+        # Parameter store: float64 vector of the parameters of the class schema and the type of their values
+        self._values = numpy.full(len(self.getParameterSchema().names), numpy.nan)
+        self._kinds = bytearray(len(self._values))
+
         # Name of the object (e.g. Projectname, component name.. )
 
         self.type = 'AbstractTurbo'
@@ -43,6 +138,25 @@ class AbstractTurbo(object):
         self.subcomponentList = []
         self.modularSubfunctionList = []
 
+        # Names of the thermodynamic parameters proportional to the mass flow (see scaleMassflow)
+        self.massflowParams = []
+
+        # Parameters computed by the parent object [thermo, aero] (see removeComputedParams)
+        self.computedParams = [[], []]
+
+        # Attributes outside the parameter lists that change the results [thermo, aero] (settings like
+        # radius_const, part of the result cache key, see resultCache.getInputState)
+        self.cacheKeyParams = [[], []]
+
+        # Inkrementelle Berechnung (see updateThermo): Zustand nach der letzten Berechnung und Zaehler
+        self.incremental = False
+        self.thermoState = None
+        self.thermoCalculations = 0
+        self.thermoReuses = 0
+
+        # Persistenter Ergebniscache fuer calcThermo und calcAero (see resultCache, None: aus)
+        self.resultCache = None
+
     # returns the program header as a string
     def getHeader(self):
         header = \
@@ -129,6 +243,7 @@ class AbstractTurbo(object):
 
     # modifies In- and Output of any AbstractTurbo-Object by removing parameters from input lists and adding it to the output list (useful for subcomponent handling)
     def removeComputedParams(self, obj, thermop, aerop):
+        obj.computedParams = [obj.computedParams[0] + list(thermop), obj.computedParams[1] + list(aerop)]
         for rparam in thermop:
             for item in obj.thermoInputParams:
                 if rparam in item:
@@ -142,6 +257,119 @@ class AbstractTurbo(object):
                     obj.aeroInputParams.remove(item)
                     break
 
+    # replaces the subcomponent name by obj (e.g. the compressor of an engine by a MultiStageAxialCompressor),
+    # the parameters computed by this object for the old subcomponent are removed from the inputs of obj as well
+    def replaceSubcomponent(self, name, obj):
+        for component in self.subcomponentList:
+            if component[0] == name:
+                old = component[1]
+                component[1] = obj
+                break
+        else:
+            raise Exception("No subcomponent '" + name + "' in " + self.identification)
+        self.removeComputedParams(obj, old.computedParams[0], old.computedParams[1])
+        setattr(self, name, obj)
+
+    # returns a parameter of the object or of one of its subcomponents given by a dotted path (e.g. "hpc.Pi")
+    def getParameter(self, path):
+        names = path.split(".")
+        obj = self
+        for name in names[:-1]:
+            obj = getattr(obj, name)
+        return getattr(obj, names[-1])
+
+    # sets a parameter of the object or of one of its subcomponents given by a dotted path (e.g. "combc.T_t3")
+    def setParameter(self, path, value):
+        names = path.split(".")
+        obj = self
+        for name in names[:-1]:
+            obj = getattr(obj, name)
+        setattr(obj, names[-1], value)
+
+    # returns the definition ["name", "unit", "description"] of a parameter given by a dotted path (None for
+    # attributes outside the parameter lists)
+    def getParameterDefinition(self, path):
+        names = path.split(".")
+        obj = self
+        for name in names[:-1]:
+            obj = getattr(obj, name)
+        for item in obj.thermoInputParams + obj.thermoOutputParams + obj.aeroInputParams + obj.aeroOutputParams:
+            if item[0] == names[-1]:
+                return item
+        return None
+
+    # returns the dotted paths of all thermodynamic output parameters of the object and its subcomponents
+    def getThermoOutputPaths(self):
+        paths = [item[0] for item in self.thermoOutputParams]
+        for component in self.subcomponentList:
+            paths += [component[0] + "." + item[0] for item in getattr(self, component[0]).thermoOutputParams]
+        return paths
+
+    # returns the dotted paths of all thermodynamic input parameters of the object and its subcomponents
+    def getThermoInputPaths(self):
+        paths = [item[0] for item in self.thermoInputParams]
+        for component in self.subcomponentList:
+            paths += [component[0] + "." + item[0] for item in getattr(self, component[0]).thermoInputParams]
+        return paths
+
+    # multiplies all mass flow proportional parameters of the object and its subcomponents by factor
+    # (all specific quantities of a cycle are independent of the mass flow, see Turbojet.calcThermo)
+    def scaleMassflow(self, factor):
+        for name in self.massflowParams:
+            value = getattr(self, name, None)
+            if value is not None:
+                setattr(self, name, value * factor)
+        for component in self.subcomponentList:
+            getattr(self, component[0]).scaleMassflow(factor)
+
+    ## calculate the thermodynamics only if the inputs changed since the last calculation (incremental mode)
+    #
+    # Used by the engines for their components. With incremental True the values of the thermodynamic inputs
+    # (thermoInputParams and the parameters set by the parent, see removeComputedParams) are stored before and the
+    # outputs after calcThermo. As long as the inputs are unchanged (the parent writes the same upstream values
+    # again), calcThermo is skipped and the outputs are reset to their calculated values (mass flow proportional
+    # outputs may have been scaled by scaleMassflow since). Changing an input of a component, or an upstream value
+    # it consumes, invalidates the component and thereby everything downstream of it.
+    # Objects with subcomponents are always calculated (their components are checked one by one).
+    def updateThermo(self):
+        if not self.incremental or self.subcomponentList:
+            self.calcThermo()
+            return
+        names = tuple([param[0] for param in self.thermoInputParams] + self.computedParams[0])
+        values = [getattr(self, name, None) for name in names]
+        state = self.thermoState
+        if state is not None and state[0] == names and all(_isEqual(a, b) for a, b in zip(values, state[1])):
+            for name, value in state[2]:
+                setattr(self, name, _copyValue(value))
+            self.thermoReuses += 1
+            return
+        values = [_copyValue(value) for value in values]
+        self.thermoState = None
+        self.calcThermo()
+        self.thermoCalculations += 1
+        outputs = [param[0] for param in self.thermoOutputParams if param[0] not in names] + \
+                  [name for name in self.massflowParams if name not in names]
+        self.thermoState = (names, values, [(name, _copyValue(getattr(self, name, None))) for name in outputs])
+
+    ## switch the incremental mode (see updateThermo) of the object and its subcomponents
+    def setIncremental(self, incremental=True):
+        self.incremental = incremental
+        self.thermoState = None
+        for component in self.subcomponentList:
+            component[1].setIncremental(incremental)
+
+    ## use the result cache (resultCache.ResultCache, None: no cache) for the object and its subcomponents
+    def setResultCache(self, cache):
+        self.resultCache = cache
+        for component in self.subcomponentList:
+            component[1].setResultCache(cache)
+
+    ## force the next updateThermo of the object and its subcomponents to calculate
+    def invalidate(self):
+        self.thermoState = None
+        for component in self.subcomponentList:
+            component[1].invalidate()
+
     # prints a dictionary in a better way
     def printDict(self, dict_):
         if dict_ != {}:  # and not [k for k, v in dict_.iteritems() if v == None]:
@@ -170,23 +398,160 @@ class AbstractTurbo(object):
         return d
 
     # initializes a list of strings to global variables with type None
+    #
+    # The parameters are registered in the schema of the class (see getParameterSchema), the entries of list_
+    # are replaced by the shared definition lists of the schema.
     def initialize(self, list_):
+        schema = self.getParameterSchema()
+        definitions, index = schema.definitions, schema.index
         for n in range(len(list_)):
-            setattr(self, list_[n][0], None)
+            name = list_[n][0]
+            definition = definitions.get(tuple(list_[n]))
+            if definition is None or name not in index:
+                definition = schema.register(type(self), list_[n])
+                if name not in index:
+                    list_[n] = definition
+                    setattr(self, name, None)  # Attribut der Klasse mit gleichem Namen
+                    continue
+            list_[n] = definition
+            i = index[name]
+            if i >= len(self._kinds):
+                self._resizeParameterStore()
+            self.__dict__[name] = None
+            self._values[i] = numpy.nan
+            self._kinds[i] = OBJECT_VALUE
+
+    ## parameter schema of the class (created with the first instance, shared by all instances)
+    @classmethod
+    def getParameterSchema(cls):
+        if "_parameterSchema" not in cls.__dict__:
+            cls._parameterSchema = ParameterSchema()
+        return cls._parameterSchema
+
+    ## float values of the parameters as read-only numpy structured array (a named view on the value vector of the
+    # object, no copy), parameters without a float value are nan
+    def getParameterArray(self):
+        self._resizeParameterStore()
+        names = self.getParameterSchema().names
+        view = self._values.view(numpy.dtype([(name, "f8") for name in names]))
+        view.flags.writeable = False
+        return view[0]
+
+    # extends the value vector to new parameters of the schema
+    def _resizeParameterStore(self):
+        size = len(self.getParameterSchema().names)
+        if len(self._values) < size:
+            self._values = numpy.concatenate((self._values, numpy.full(size - len(self._values), numpy.nan)))
+            self._kinds.extend(bytearray(size - len(self._kinds)))
+
+    ## copy of the object and its subcomponents
+    #
+    # The float parameters are copied as one vector per component, the parameter lists share their definitions
+    # with the original.
+    def clone(self):
+        obj = object.__new__(type(self))
+        components = dict((component[0], component[1].clone()) for component in self.subcomponentList)
+        for key, value in self.__dict__.items():
+            if key in components:
+                value = components[key]
+            elif key == "subcomponentList":
+                value = [[component[0], components[component[0]]] for component in value]
+            elif key == "modularSubfunctionList":
+                value = [getattr(obj, function.__name__) if getattr(function, "__self__", None) is self
+                         else function for function in value]
+            else:
+                value = _copyValue(value)
+            obj.__dict__[key] = value
+        return obj
+
+    ## snapshot of the state of the object and its subcomponents (all attributes, the float parameters as one
+    # vector copy per component), see restoreSnapshot and transaction
+    def takeSnapshot(self):
+        components = [component[1] for component in self.subcomponentList]
+        state = dict((key, value if any(value is component for component in components) else _copyValue(value))
+                     for key, value in self.__dict__.items())
+        return ComponentSnapshot(self, state, [component.takeSnapshot() for component in components])
+
+    ## reset the object and its subcomponents to a snapshot of takeSnapshot (the snapshot can be restored again)
+    def restoreSnapshot(self, snapshot):
+        if snapshot.component is not self:
+            raise Exception("Snapshot of '" + str(snapshot.component.identification) +
+                            "' can't be restored to '" + str(self.identification) + "'")
+        state = snapshot.state
+        components = [child.component for child in snapshot.children]
+        self.__dict__.clear()
+        self.__dict__.update((key, value if any(value is component for component in components) else
+                              _copyValue(value)) for key, value in state.items())
+        for child in snapshot.children:
+            child.component.restoreSnapshot(child)
+
+    ## context manager: the object and its subcomponents are reset to their state at the beginning if the block
+    # raises an exception (solver trials), e.g.
+    #	with engine.transaction():
+    #	    engine.calcThermo()
+    @contextlib.contextmanager
+    def transaction(self):
+        snapshot = self.takeSnapshot()
+        try:
+            yield snapshot
+        except BaseException:
+            self.restoreSnapshot(snapshot)
+            raise
+
+    # pickle support: the float parameters are stored as value vector with the parameter names of the schema, so
+    # they can be restored in another process (with its own schema)
+    def __getstate__(self):
+        names = self.getParameterSchema().names
+        state = self.__dict__.copy()
+        for i, kind in enumerate(self._kinds):
+            if kind != OBJECT_VALUE:
+                del state[names[i]]
+        state["_parameterNames"] = names if len(names) == len(self._values) else names[:len(self._values)]
+        state["_values"] = self._values.tobytes()
+        return state
+
+    def __setstate__(self, state):
+        names = state.pop("_parameterNames")
+        values = state["_values"] = numpy.frombuffer(state["_values"]).copy()
+        kinds = state["_kinds"]
+        schema = self.getParameterSchema()
+        if names != schema.names[:len(names)]:
+            # Schema mit anderer Reihenfolge: Werte nach Namen umsortieren
+            cls = type(self)
+            for name in names:
+                schema.register(cls, [name, "", ""])
+            state["_values"] = numpy.full(len(schema.names), numpy.nan)
+            state["_kinds"] = bytearray(len(schema.names))
+            for i, name in enumerate(names):
+                state["_values"][schema.index[name]] = values[i]
+                state["_kinds"][schema.index[name]] = kinds[i]
+        for i, kind in enumerate(kinds):
+            if kind == FLOAT_VALUE:
+                state[names[i]] = float(values[i])
+            elif kind == NUMPY_FLOAT_VALUE:
+                state[names[i]] = values[i]
+        self.__dict__.update(state)
 
     # checks the type of global variables given in a list
     def check(self, list_):
         fails = ""
         for n in range(len(list_)):
             a = getattr(self, list_[n][0], None)
-            if a == None:
+            if a is None:
                 fails += " " + list_[n][0]
-            elif math.isnan(a):
+            elif numpy.any(numpy.isnan(a)) if numpy.ndim(a) > 0 else math.isnan(a):
                 raise Exception(list_[n][0] \
                                 + " has wrong result 'nan'! Probably there is no solution for the given boundary conditions.")
         if fails != "":
             raise Exception("The following parameters were not set/computed in " + self.identification + ":" + fails)
 
+    # raises the no-solution exception of check if the thrust of a cycle calculated for a unit mass flow is not
+    # positive (nan: no expansion in a nozzle), before it is scaled to the required thrust (see scaleMassflow)
+    def checkThrust(self):
+        if not self.F > 0.0:
+            raise Exception("F has wrong result '" + str(self.F) + "'! Probably there is no solution for the given "
+                            + "boundary conditions.")
+
     ## Get-methods for dictionaries
 
     def getThermoInputDict(self):
@@ -205,54 +570,60 @@ class AbstractTurbo(object):
         tdict = self.buildDictFromList(self.aeroOutputParams)
         return tdict
 
+    # saves the parameters of the object and its subcomponents to an INI file (one section per identification, see
+    # designLibrary for files with many designs)
     def saveObject(self, _filename):
-        configparser = ConfigParser()
+        configparser = RawConfigParser()
         configparser.optionxform = str
         configparser.add_section('general')
         configparser.set('general', 'type', self.type)
         configparser.set('general', 'identification', self.identification)
-        configparser.add_section(self.identification)
-        for k, l in self.getThermoInputDict().iteritems():
-            configparser.set(self.identification, k, l[0])
-        for k, l in self.getAeroInputDict().iteritems():
-            configparser.set(self.identification, k, l[0])
-        for k, l in self.getThermoOutputDict().iteritems():
-            configparser.set(self.identification, k, l[0])
-        for k, l in self.getAeroOutputDict().iteritems():
-            configparser.set(self.identification, k, l[0])
-        for i in self.subcomponentList:
-            dummy = getattr(self, i[0])
-            configparser.add_section(dummy.identification)
-            for k, l in dummy.getThermoInputDict().iteritems():
-                configparser.set(dummy.identification, k, l[0])
-            for k, l in dummy.getAeroInputDict().iteritems():
-                configparser.set(dummy.identification, k, l[0])
-            for k, l in dummy.getThermoOutputDict().iteritems():
-                configparser.set(dummy.identification, k, l[0])
-            for k, l in dummy.getAeroOutputDict().iteritems():
-                configparser.set(dummy.identification, k, l[0])
-        with open(_filename, 'wb') as configfile:
+        for obj in [self] + [getattr(self, i[0]) for i in self.subcomponentList]:
+            if not configparser.has_section(obj.identification):
+                configparser.add_section(obj.identification)
+            for k in obj.thermoInputParams + obj.aeroInputParams + obj.thermoOutputParams + obj.aeroOutputParams:
+                configparser.set(obj.identification, k[0], str(getattr(obj, k[0])))
+        with open(_filename, 'w') as configfile:
             configparser.write(configfile)
 
+    # loads the parameters saved by saveObject, the values are converted (see parseConfigValue)
     def loadObject(self, _filename):
         configparser = RawConfigParser()
         configparser.optionxform = str
-        configparser.read(_filename)
+        if not configparser.read(_filename):
+            raise Exception("Could not read " + str(_filename))
 
-        for i in self.thermoInputParams + self.thermoOutputParams + self.aeroInputParams + self.aeroOutputParams:
-            try:
-                setattr(self, i[0], configparser.get(self.identification, i[0]))
-            except configparser.NoSectionError as detail:
-                helper_methods.logger.error(detail)
-            except configparser.NoOptionError as detail:
-                helper_methods.logger.error(detail)
-        for i in self.subcomponentList:
-            dummy = getattr(self, i[0])
-            for k in dummy.thermoInputParams + dummy.thermoOutputParams + dummy.aeroInputParams + dummy.aeroOutputParams:
+        for obj in [self] + [getattr(self, i[0]) for i in self.subcomponentList]:
+            for k in obj.thermoInputParams + obj.thermoOutputParams + obj.aeroInputParams + obj.aeroOutputParams:
                 try:
-                    setattr(dummy, k[0], configparser.get(dummy.identification, k[0]))
-                    setattr(self, i[0], dummy)
-                except configparser.NoSectionError as detail:
-                    helper_methods.logger.error(detail)
-                except configparser.NoOptionError as detail:
+                    setattr(obj, k[0], parseConfigValue(configparser.get(obj.identification, k[0])))
+                except NoSectionError as detail:
                     helper_methods.logger.error(detail)
+                    break
+                except NoOptionError as detail:
+                    # Parameter, die es beim Speichern noch nicht gab
+                    helper_methods.logger.debug(detail)
+
+
+## value of a parameter saved as string by AbstractTurbo.saveObject: None, float, int, bool, numpy array
+# ("[1. 2.]") or the string itself
+def parseConfigValue(text):
+    text = text.strip()
+    if text == "None":
+        return None
+    if text in ("True", "False"):
+        return text == "True"
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    if text.startswith("[") and text.endswith("]"):
+        try:
+            return numpy.array([float(value) for value in text[1:-1].replace(",", " ").split()])
+        except ValueError:
+            pass
+    return text
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# atmosphere.py
+# International Standard Atmosphere (ISA, up to 84.852 km geopotential altitude) for scalars and numpy arrays
+# and flight envelope sweeps (altitude x flight Mach number) of the engine models.
+#
+# Example:
+#	deck = runEnvelope(turbojet.Turbojet, numpy.linspace(0., 11000., 12), [0.0, 0.2, 0.4, 0.6],
+#	                   baseInputs=tj70Inputs, outputs=["mflow", "SFC"])
+#	deck["SFC"][deck["success"]]
+# imports:
+import collections
+
+import numpy
+
+from gtdev import helper_methods, sweep
+
+# ISA Konstanten
+g_0 = 9.80665  # m/s^2
+R_ISA = 287.05287  # J/(kg K)
+KAPPA_ISA = 1.4
+T_0 = 288.15  # K
+p_0 = 101325.0  # Pa
+
+# Schichtgrenzen (geopotentielle Hoehe) [m] und Temperaturgradienten [K/m]
+LAYER_ALTITUDES = numpy.array([0.0, 11000.0, 20000.0, 32000.0, 47000.0, 51000.0, 71000.0, 84852.0])
+LAYER_LAPSE_RATES = numpy.array([-0.0065, 0.0, 0.001, 0.0028, 0.0, -0.0028, -0.002])
+
+
+## temperature and pressure at the layer bases (computed once at import)
+def _layerBases():
+    T = [T_0]
+    p = [p_0]
+    for i, lapse in enumerate(LAYER_LAPSE_RATES[:-1]):
+        dh = LAYER_ALTITUDES[i + 1] - LAYER_ALTITUDES[i]
+        T_top = T[-1] + lapse * dh
+        if lapse == 0.0:
+            p.append(p[-1] * numpy.exp(-g_0 * dh / (R_ISA * T[-1])))
+        else:
+            p.append(p[-1] * (T_top / T[-1]) ** (-g_0 / (lapse * R_ISA)))
+        T.append(T_top)
+    return numpy.array(T), numpy.array(p)
+
+
+LAYER_TEMPERATURES, LAYER_PRESSURES = _layerBases()
+
+
+## static temperature [K], pressure [Pa], density [kg/m^3] and speed of sound [m/s] of the ISA
+#
+# @param altitude
+#	geopotential altitude [m] (scalar or array, 0 ... 84852 m)
+# @param dT
+#	temperature offset to the standard day [K] (e.g. ISA+15), the pressure stays the standard pressure
+# @return (T, p, rho, a), floats for a scalar altitude
+def isa(altitude, dT=0.0):
+    h = numpy.asarray(altitude, dtype=float)
+    if numpy.any(h < LAYER_ALTITUDES[0]) or numpy.any(h > LAYER_ALTITUDES[-1]):
+        raise ValueError("Altitude out of the ISA range " + str(LAYER_ALTITUDES[0]) + " ... " +
+                         str(LAYER_ALTITUDES[-1]) + " m")
+    layer = numpy.clip(numpy.searchsorted(LAYER_ALTITUDES, h, side="right") - 1, 0, len(LAYER_LAPSE_RATES) - 1)
+    lapse = LAYER_LAPSE_RATES[layer]
+    T_b = LAYER_TEMPERATURES[layer]
+    dh = h - LAYER_ALTITUDES[layer]
+
+    T_std = T_b + lapse * dh
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        p = LAYER_PRESSURES[layer] * numpy.where(lapse == 0.0, numpy.exp(-g_0 * dh / (R_ISA * T_b)),
+                                                 (T_std / T_b) ** (-g_0 / (numpy.where(lapse == 0.0, 1.0, lapse) *
+                                                                           R_ISA)))
+    T = T_std + dT
+    rho = p / (R_ISA * T)
+    a = numpy.sqrt(KAPPA_ISA * R_ISA * T)
+    if numpy.ndim(altitude) == 0:
+        return float(T), float(p), float(rho), float(a)
+    return T, p, rho, a
+
+
+## maximum number of grid nodes kept by getAmbient
+AMBIENT_CACHE_SIZE = 4096
+
+_ambientCache = collections.OrderedDict()
+
+## quantities of an ambient state returned by getAmbient
+AMBIENT_QUANTITIES = ("T_inf", "p_inf", "rho_inf", "a_inf", "kappa_inf", "c_0", "T_tinf", "p_tinf")
+
+
+## ambient and free stream state of flight conditions (altitude, flight Mach number)
+#
+# kappa_inf is the (static) kappa of air at T_inf (gas property mode dependent, see getKappa), the flight speed
+# c_0 and the free stream totals T_tinf, p_tinf use kappa_inf and R_inf like the engine models, so an engine
+# with these inputs flies at exactly Ma. Every node is computed once and kept in an LRU cache.
+# @param altitude, Ma
+#	scalars or arrays (broadcast against each other)
+# @return dictionary {quantity (see AMBIENT_QUANTITIES): array (float for scalar input)}
+def getAmbient(altitude, Ma, dT=0.0, R_inf=287.15):
+    scalar = numpy.ndim(altitude) == 0 and numpy.ndim(Ma) == 0
+    altitude, Ma = numpy.broadcast_arrays(numpy.asarray(altitude, dtype=float), numpy.asarray(Ma, dtype=float))
+    keys = [(h, m, float(dT), float(R_inf), helper_methods.getGasPropertyMode())
+            for h, m in zip(altitude.ravel().tolist(), Ma.ravel().tolist())]
+
+    nodes = {}
+    for key in set(keys):
+        node = _ambientCache.pop(key, None)
+        if node is not None:
+            nodes[key] = node
+
+    # fehlende Knoten gemeinsam berechnen
+    missing = sorted(set(keys) - set(nodes))
+    if missing:
+        h = numpy.array([key[0] for key in missing])
+        m = numpy.array([key[1] for key in missing])
+        T, p, rho, a = isa(h, dT)
+        kappa = helper_methods.getKappaArray(T, 0.0)
+        c_0 = m * numpy.sqrt(kappa * R_inf * T)
+        T_t = T * (1 + (kappa - 1) / 2 * m ** 2)
+        p_t = p * (1 + (kappa - 1) / 2 * m ** 2) ** (kappa / (kappa - 1))
+        for i, key in enumerate(missing):
+            nodes[key] = (T[i], p[i], rho[i], a[i], kappa[i], c_0[i], T_t[i], p_t[i])
+
+    for key in nodes:
+        _ambientCache[key] = nodes[key]
+    while len(_ambientCache) > AMBIENT_CACHE_SIZE:
+        _ambientCache.popitem(last=False)
+
+    values = numpy.array([nodes[key] for key in keys], dtype=float)
+    values = values.reshape(altitude.shape + (len(AMBIENT_QUANTITIES),))
+    if scalar:
+        return dict((name, float(values[..., i])) for i, name in enumerate(AMBIENT_QUANTITIES))
+    return dict((name, values[..., i]) for i, name in enumerate(AMBIENT_QUANTITIES))
+
+
+## sweep cases (see sweep.runSweep) for the altitude x Mach grid, altitude major
+#
+# Every case sets the engine inputs T_inf, p_inf, c_0 and kappa_inf of its grid node.
+def makeEnvelopeCases(altitudes, machs, dT=0.0, R_inf=287.15):
+    h, m = numpy.meshgrid(numpy.asarray(altitudes, dtype=float), numpy.asarray(machs, dtype=float), indexing="ij")
+    ambient = getAmbient(h.ravel(), m.ravel(), dT, R_inf)
+    return [dict((name, float(ambient[name][i])) for name in ("T_inf", "p_inf", "c_0", "kappa_inf"))
+            for i in range(h.size)]
+
+
+## evaluate an engine model over the flight envelope (altitude x flight Mach number) on a process pool
+#
+# The ambient state of every grid node is computed once (getAmbient) and passed to the engine as the inputs
+# T_inf, p_inf, c_0 and kappa_inf. The other arguments are the ones of sweep.runSweep.
+# @return structured array (see sweep.runSweep) with the additional fields "altitude" and "Ma_0", one row per
+#	grid node, altitude major
+def runEnvelope(engine, altitudes, machs, outputs=None, baseInputs=None, dT=0.0, processes=None, chunksize=None,
+                method="calcThermo"):
+    R_inf = _getR_inf(engine, baseInputs)
+    cases = makeEnvelopeCases(altitudes, machs, dT, R_inf)
+    table = sweep.runSweep(engine, cases, outputs=outputs, baseInputs=baseInputs, processes=processes,
+                           chunksize=chunksize, method=method)
+
+    h, m = numpy.meshgrid(numpy.asarray(altitudes, dtype=float), numpy.asarray(machs, dtype=float), indexing="ij")
+    deck = numpy.zeros(len(table), dtype=[("altitude", "f8"), ("Ma_0", "f8")] + table.dtype.descr)
+    deck["altitude"] = h.ravel()
+    deck["Ma_0"] = m.ravel()
+    for name in table.dtype.names:
+        deck[name] = table[name]
+    return deck
+
+
+## gas constant of the ambient air used by the engine model (R_inf, default 287.15)
+def _getR_inf(engine, baseInputs=None):
+    if baseInputs and "R_inf" in baseInputs:
+        return float(baseInputs["R_inf"])
+    return float(getattr(sweep.buildEngine(engine, {}, baseInputs), "R_inf", 287.15))
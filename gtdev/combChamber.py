@@ -15,6 +15,78 @@ import numpy
 from gtdev.abstract import *
 from gtdev.helper_methods import *
 from scipy.optimize import fsolve
+from gtdev.resultCache import cachedCalculation
+from gtdev.solvers import solveFixedPoint
+
+
+## energy balance of the combustion chamber, solved for beta and kappa_3 together
+#
+# Unknowns are the fuel to air ratio beta and the outlet kappa_3 (with the static outlet temperature
+# T_3 = T_t3 / (1 + (kappa_3 - 1) / 2 * Ma_outlet^2)):
+#	beta * H_f * eta_combc = cp(T_3, beta) * T_t3 - kappa_1 / (kappa_1 - 1) * R * T_t1
+#	kappa_3 = cp(T_3, beta) / (cp(T_3, beta) - R_ex(beta))
+# which is the formulation of the former fsolve residual (kappa_3 / (kappa_3 - 1) * R_ex = cp). The system is
+# solved by Newton's method with the analytic derivatives of the exhaust cp polynomials, all points at once.
+# Scalars and numpy arrays (broadcast against each other) are accepted.
+#
+# @param beta0, kappa0
+#	start values of the Newton iteration (e.g. the solution of a neighbouring operating point)
+# @return dictionary with "beta", "lambda_air", "kappa_1", "kappa_3", "R_ex", "deltaP", "mflow_f", "converged"
+#	and "iterations" (Newton iterations needed per point)
+def solveCombustion(T_t1, T_t3, mflow=1.0, H_f=43100000.0, eta_combc=0.95, Ma_inlet=0.2, Ma_outlet=0.4,
+                    tolerance=1e-12, maxIter=50, beta0=0.034, kappa0=1.33):
+    T_t1, T_t3, mflow, H_f, eta_combc, Ma_inlet, Ma_outlet = numpy.broadcast_arrays(
+        *[numpy.asarray(x, dtype=float) for x in (T_t1, T_t3, mflow, H_f, eta_combc, Ma_inlet, Ma_outlet)])
+    R = getR()
+    kappa_1 = getKappaArray(T_t1, Ma_inlet)
+    h_1 = kappa_1 / (kappa_1 - 1.) * R * T_t1
+    heat = H_f * eta_combc
+
+    beta = numpy.array(numpy.broadcast_to(beta0, T_t1.shape), dtype=float)
+    kappa_3 = numpy.array(numpy.broadcast_to(kappa0, T_t1.shape), dtype=float)
+    iterations = numpy.zeros(T_t1.shape, dtype=int)
+    active = numpy.ones(T_t1.shape, dtype=bool)
+    for i in range(maxIter):
+        b = beta[active]
+        k = kappa_3[active]
+        Tt = T_t3[active]
+        Ma2 = Ma_outlet[active] ** 2
+        T_3 = Tt / (1 + (k - 1) / 2 * Ma2)
+        dT_3 = -T_3 * (Ma2 / 2) / (1 + (k - 1) / 2 * Ma2)
+        cp, dcp_dT, dcp_dbeta = cpExhaustArray(T_3, b)
+        R_ex = 8314.472 * (0.034524 + b * 0.035645) / (1 + b)
+        dR_ex = 8314.472 * (0.035645 - 0.034524) / (1 + b) ** 2
+
+        # residuals and jacobian
+        g1 = b * heat[active] - (cp * Tt - h_1[active])
+        g2 = k * (cp - R_ex) - cp
+        j11 = heat[active] - Tt * dcp_dbeta
+        j12 = -Tt * dcp_dT * dT_3
+        j21 = k * (dcp_dbeta - dR_ex) - dcp_dbeta
+        j22 = (cp - R_ex) + (k - 1) * dcp_dT * dT_3
+        det = j11 * j22 - j12 * j21
+        db = (g1 * j22 - g2 * j12) / det
+        dk = (j11 * g2 - j21 * g1) / det
+
+        beta[active] = b - db
+        kappa_3[active] = k - dk
+        iterations[active] += 1
+        done = ~((numpy.abs(db) >= tolerance * numpy.abs(b)) | (numpy.abs(dk) >= tolerance * k))
+        active[active] = ~done
+        if not numpy.any(active):
+            break
+
+    R_ex = 8314.472 * (0.034524 + beta * 0.035645) / (1 + beta)
+    deltaP = mflow * (kappa_3 / (kappa_3 - 1.) * R_ex * T_t3 - h_1)
+    return {"beta": beta,
+            "lambda_air": 0.068 / beta,
+            "kappa_1": kappa_1,
+            "kappa_3": kappa_3,
+            "R_ex": R_ex,
+            "deltaP": deltaP,
+            "mflow_f": deltaP / heat,
+            "converged": ~active,
+            "iterations": iterations}
 
 
 # ===============================================================================
@@ -57,6 +129,9 @@ class CombChamber(AbstractTurbo):
         self.initialize(self.aeroInputParams)
         self.initialize(self.aeroOutputParams)
 
+        # Parameters proportional to the mass flow
+        self.massflowParams = ["mflow", "deltaP", "mflow_f"]
+
         # Standardwerte:
         self.H_f = 43100000.0  # J/kg
         self.kappa = 1.4  # *
@@ -67,53 +142,52 @@ class CombChamber(AbstractTurbo):
         self.p_t1 = 101325
         self.eta_combc = 0.95
 
+        # True: Newton-Iteration mit der Loesung der letzten Rechnung starten (Kontinuation, siehe continuation.py)
+        self.warmStart = False
+        self.solverStart = None
+
+    @cachedCalculation("thermo")
     def calcThermo(self):
         self.check(self.thermoInputParams)
 
         self.R = getR()
 
-        # Isentropic exponent inlet
-        self.kappa_1 = getKappa(Tt=self.T_t1, Ma=self.Ma_inlet)
-
-        # Totaltemperaturdifferenz:
-        deltaT_t = self.T_t3 - self.T_t1
-
-        def iterate_fun(beta):
-            kappa_3 = getKappa(Tt=self.T_t3, Ma=self.Ma_outlet, material="exhaust", beta=beta)
-
-            R_ex = 8314.472 * (0.034524 + beta * 0.035645) / (1 + beta)
+        # Energiebilanz: beta und kappa_3 gemeinsam (Newton, siehe solveCombustion)
+        start = {}
+        if self.warmStart and self.solverStart is not None:
+            start = self.solverStart
+        result = solveCombustion(self.T_t1, self.T_t3, mflow=self.mflow, H_f=self.H_f, eta_combc=self.eta_combc,
+                                 Ma_inlet=self.Ma_inlet, Ma_outlet=self.Ma_outlet, **start)
+        self.solverIterations = int(result["iterations"])
+        if not result["converged"]:
+            raise Exception("Max. Iteration exceeded -> Combustion Chamber energy balance did not converge.")
+        self.solverStart = {"beta0": float(result["beta"]), "kappa0": float(result["kappa_3"])}
 
-            # Zunahme der Enthalpie
-            deltaP = self.mflow * (
-                kappa_3 / (kappa_3 - 1.) * R_ex * self.T_t3 - self.kappa_1 / (self.kappa_1 - 1.) * self.R * self.T_t1)
-
-            # Brennstoffmassenstrom
-            mflow_f = deltaP / (self.H_f * self.eta_combc)
-
-            return beta - mflow_f / self.mflow
+        # Isentropic exponent inlet
+        self.kappa_1 = float(result["kappa_1"])
 
-        self.beta = float(fsolve(iterate_fun, [0.034]))
+        self.beta = float(result["beta"])
 
         self.lambda_air = 0.068 / self.beta  # kerosin only!
 
         # Isentropic exponent outlet
-        self.kappa_3 = getKappa(Tt=self.T_t3, Ma=self.Ma_outlet, material="exhaust", beta=self.beta)
+        self.kappa_3 = float(result["kappa_3"])
 
         # Gas constant outlet
-        self.R_ex = 8314.472 * (0.034524 + self.beta * 0.035645) / (1 + self.beta)
+        self.R_ex = float(result["R_ex"])
 
         # Heat insertion combustion chamber
-        self.deltaP = self.mflow * (self.kappa_3 / (self.kappa_3 - 1.) * self.R_ex * self.T_t3 - self.kappa_1 / (
-            self.kappa_1 - 1.) * self.R * self.T_t1)
+        self.deltaP = float(result["deltaP"])
 
         # Massflow fuel
-        self.mflow_f = self.deltaP / (self.H_f * self.eta_combc)
+        self.mflow_f = float(result["mflow_f"])
 
         # Total pressure outlet
         self.p_t3 = self.p_t1 * self.Pi_Combc_fr
 
         self.check(self.thermoOutputParams)
 
+    @cachedCalculation("aero")
     def calcAero(self):
         self.check(self.aeroInputParams)
 
@@ -140,18 +214,17 @@ class CombChamber(AbstractTurbo):
                 self.kappa_3 * self.T_t1 * (1.0 + (self.kappa_3 - 1.0) / 2.0 * self.Ma_3 ** 2.0)))
 
     def iterate_Ma_3(self):
-        maxIter = 100
-        convergence = False
-        tolerance = 0.001
+        def fkt(Ma_3):
+            self.Ma_3 = Ma_3
+            self.calcMa_3()
+            return self.Ma_3
+
         self.Ma_3 = self.Ma_1
         self.calcMa_3()
-        for i in range(maxIter):
-            origMa_3 = self.Ma_3
-            self.calcMa_3()
-            if i == (maxIter - 1):
-                raise Exception("Max. Iteration exceeded -> Combustion Chamber. Try using different entry conditions!")
-            if numpy.abs(self.Ma_3 - origMa_3) < tolerance:
-                break
+        result = solveFixedPoint(fkt, self.Ma_3, tolerance=0.001, maxIter=100)
+        if not numpy.all(result.converged):
+            raise Exception("Max. Iteration exceeded -> Combustion Chamber. Try using different entry conditions!")
+        self.Ma_3 = result.x
 
 
 def calcPi_Combc(self):
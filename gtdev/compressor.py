@@ -17,6 +17,70 @@ from scipy import optimize
 from numpy import linspace, zeros, matrix, ma
 from gtdev.abstract import *
 from gtdev.helper_methods import *
+from gtdev.resultCache import cachedCalculation
+from gtdev.solvers import solveFixedPoint
+
+
+## smallest prime number >= int(z) (blade numbers of the axial compressor)
+def nextPrime(z):
+    candidate = max(int(z), 2)
+    while any(candidate % d == 0 for d in range(2, int(candidate ** 0.5) + 1)):
+        candidate += 1
+    return candidate
+
+
+## profile of a blade row from the (relative) flow angles, circumferential and absolute velocities at the inlet (1)
+# and the outlet (2) of the row, scalars or arrays
+#
+# @return (lift coefficient, stagger angle, deviation angle, recalculated pitch ratio t/s, Gitterbelastungszahl)
+def calcProfile(alpha1, alpha2, cu1, cu2, c1, c2, nblades, s, r):  # relative schaufelwinkel!
+    delta_c_u = numpy.abs(cu1 - cu2)
+    c_inf = (c1 + c2) / 2.0
+
+    # Zur Ueberpruefung wird noch die Gitterbelastungszahl berechnet welche im Bereich von ca. 0.4 bis 2.5 liegen sollte:
+    gitterbelastung = 2.0 * delta_c_u / c_inf
+
+    # Berechnung der wahren t/s Verhaeltnisse mit den gewaehlten Prim-Schaufelzahlen
+    pitch_ratio_recalc = 2.0 * numpy.pi * r / (nblades * s)
+
+    # Minderumlenkung! > NACA 6510
+    deviation_angle = (0.23 * ((2.0 * 0.5) ** 2) + 0.1 * (alpha2 / 50.)) * (alpha1 - alpha2) * (
+        numpy.sqrt(pitch_ratio_recalc))
+    gamma = (alpha1 / 2.0) + ((alpha2 - deviation_angle) / 2.0) - 90.0
+
+    # Zur Ueberpruefung wird noch der sich aus Gitterbelastungszahl und Teilungsverhaeltnis ergebende Auftriebsbeiwert berechnet
+    c_a = gitterbelastung * pitch_ratio_recalc
+
+    return c_a, gamma, deviation_angle, pitch_ratio_recalc, gitterbelastung
+
+
+## total states at inlet and outlet of the stages of multistage axial compressors
+#
+# Pi, eta_pol, Ma_inlet and Ma_outlet have the shape (..., stages), e.g. (compressors, stages) to evaluate many
+# compressors at once, T_t1 and p_t1 are the inlet states (scalars or arrays of shape (...)). The outlet of a
+# stage is the inlet of the following one.
+# @return dictionary {"T_t1", "p_t1", "T_t3", "p_t3", "kappa_1", "kappa_3": arrays (..., stages)}
+def calcStageThermo(T_t1, p_t1, Pi, eta_pol, Ma_inlet, Ma_outlet):
+    Pi, eta_pol, Ma_inlet, Ma_outlet = numpy.broadcast_arrays(
+        *[numpy.asarray(x, dtype=float) for x in (Pi, eta_pol, Ma_inlet, Ma_outlet)])
+    inlet = numpy.broadcast_to(numpy.asarray(p_t1, dtype=float)[..., None], Pi.shape[:-1] + (1,))
+    states = {}
+    states["p_t3"] = inlet * numpy.cumprod(Pi, axis=-1)
+    states["p_t1"] = numpy.concatenate((inlet, states["p_t3"][..., :-1]), axis=-1)
+
+    # Stufe fuer Stufe (fuer alle Verdichter gemeinsam)
+    states["T_t1"] = numpy.zeros(Pi.shape)
+    states["T_t3"] = numpy.zeros(Pi.shape)
+    T = numpy.broadcast_to(numpy.asarray(T_t1, dtype=float), Pi.shape[:-1])
+    for k in range(Pi.shape[-1]):
+        states["T_t1"][..., k] = T
+        T = polytropeArray(eta_pol=eta_pol[..., k], T1=T, p1=states["p_t1"][..., k], p2=states["p_t3"][..., k],
+                           Ma=Ma_outlet[..., k])
+        states["T_t3"][..., k] = T
+
+    states["kappa_1"] = getKappaArray(Tt=states["T_t1"], Ma=Ma_inlet)
+    states["kappa_3"] = getKappaArray(Tt=states["T_t3"], Ma=Ma_outlet)
+    return states
 
 
 # ===============================================================================
@@ -122,6 +186,9 @@ class CompressorAxial(AbstractTurbo):
         self.initialize(self.aeroInputParams)
         self.initialize(self.aeroOutputParams)
 
+        # Parameters proportional to the mass flow
+        self.massflowParams = ["mflow", "deltaP"]
+
         # defaults:
         self.z_1 = 0.0
         self.p_t1 = 101325
@@ -136,9 +203,13 @@ class CompressorAxial(AbstractTurbo):
         self.radius_const = "rm"  # "casing" fuer konstanten Gehaeuseradius, "rm" für konstanten Mittelschnittsradius, "hub" für konstanten Nabenradius!
         self.rho_rotormaterial = 2800.0  # Dichte von Aluminium!
 
+        # Settings outside the parameter lists (see AbstractTurbo.cacheKeyParams)
+        self.cacheKeyParams = [[], ["radius_const"]]
+
     # ===========================================================================
     # Berechnungsmethode fuer thermodynamische Parameter
     # ===========================================================================
+    @cachedCalculation("thermo")
     def calcThermo(self):
         self.check(self.thermoInputParams)
 
@@ -166,6 +237,7 @@ class CompressorAxial(AbstractTurbo):
     # ===========================================================================
     # Berechnungsmethode fuer aerodynamische und geometrische Parameter der Stufe
     # ===========================================================================
+    @cachedCalculation("aero")
     def calcAero(self):
         self.check(self.aeroInputParams)
 
@@ -173,15 +245,9 @@ class CompressorAxial(AbstractTurbo):
         # Der mittlere Radius bestimmt sich aus der flaechengleichen Halbierung zwischen Nabe und Gehaeuse
         self.r_m1 = numpy.sqrt((self.r_h1 ** 2.0 + self.r_s1 ** 2.0) / 2.0)
 
-        def fkt(Ma_1):
-            F = self.mflow * numpy.sqrt(self.T_t1 * self.R) / (
-                self.p_t1 * A_1 * numpy.sin(numpy.radians(self.alpha_1))) - \
-                (numpy.sqrt(self.kappa) * Ma_1 * (1.0 + (self.kappa - 1.0) / 2.0 * (Ma_1 ** 2.0)) ** (
-                    -0.5 * (self.kappa + 1.0) / (self.kappa - 1.0)))
-
-            return F
-
-        self.Ma_1 = scipy.optimize.fsolve(fkt, 0.6)
+        # Machzahl aus der Durchflussfunktion (Unterschallast)
+        Q_1 = self.mflow * numpy.sqrt(self.T_t1 * self.R) / (self.p_t1 * A_1 * numpy.sin(numpy.radians(self.alpha_1)))
+        self.Ma_1 = float(machFromFlowFunction(Q_1, self.kappa))
 
         self.p_1 = self.p_t1 / (1.0 + (self.kappa - 1.0) / 2.0 * self.Ma_1 ** 2.0) ** (self.kappa / (self.kappa - 1.0))
         self.T_1 = self.T_t1 / (1.0 + (self.kappa - 1.0) / 2.0 * self.Ma_1 ** 2.0)
@@ -304,66 +370,7 @@ class CompressorAxial(AbstractTurbo):
 
         # Bestimmung von ganzzahligen Schaufelzahlen als Primzahlen
         def calcBladeNumbers(z_calculated):
-            upper_border = int(z_calculated) * 2
-            x = range(upper_border)
-            for i in range(0, upper_border):
-                x[i] = i
-
-            x[0] = -1
-            x[1] = -1
-
-            i = 2
-            while x[i] * x[i] <= x[upper_border - 1]:
-                if x[i] != -1:
-                    for j in range(x[i] * x[i], x[upper_border - 1], x[i]):
-                        x[j] = -1
-                i = i + 1
-
-            '''
-			# Zur Kontrolle: Gibt die Gesamtliste mit geloeschten Eintraegen aus
-			for i in range (0,upper_border):
-				print i, x[i]
-			'''
-
-            def counter(a, b):
-                count = 0
-                for i in range(a, b):
-                    if x[i] != -1:
-                        count = count + 1
-                return count
-
-            def create_primelists(a):
-                prime_list = range(0, a)
-                return prime_list
-
-            def primelist(primelist_border, scanborder_low, scanborder_up):
-                prime_list = range(0, primelist_border)
-                listcounter = 0
-                for i in range(scanborder_low, scanborder_up):
-                    if x[i] != -1:
-                        prime_list[listcounter] = x[i]
-                        listcounter = listcounter + 1
-                return prime_list
-
-            prime_counter_lower = counter(0, int(z_calculated))
-            prime_counter_upper = counter(int(z_calculated), upper_border)
-
-            prime_list_lower = primelist(prime_counter_lower, 0, int(z_calculated))
-            prime_list_upper = primelist(prime_counter_upper, int(z_calculated), upper_border)
-
-            '''
-			# Zur Kontrolle: Gibt die beiden Primzahllisten aus
-			for i in range (0, prime_counter_lower):
-			  print "Untere Liste:", prime_list_lower[i]
-
-			for i in range (0, prime_counter_upper):
-			  print "Obere Liste", prime_list_upper[i]
-
-			# Zur Kontrolle: Gibt die beiden naechstgelegenen Primzahlen zu z_calculated aus
-			print "Die naechste tiefer gelegene Primzahl zu", int(z_calculated),"ist", ma.maximum(prime_list_lower)
-			print "Die naechste hoeher gelegene Primzahl zu", int(z_calculated),"ist", ma.minimum(prime_list_upper)
-			'''
-            return ma.minimum(prime_list_upper)  # Es wird die naechst hoehere Primzahl gewaehlt
+            return nextPrime(z_calculated)  # Es wird die naechst hoehere Primzahl gewaehlt
 
         self.z_chosen_stator = calcBladeNumbers(self.z_calc_stator)
         self.z_chosen_rotor = calcBladeNumbers(self.z_calc_rotor)
@@ -851,25 +858,7 @@ class CompressorAxial(AbstractTurbo):
             # print dev,pitchr,gitterb
 
     def calculateProfile(self, alpha1, alpha2, cu1, cu2, c1, c2, nblades, s, r):  # relative schaufelwinkel!
-        # print alpha1,alpha2,cu1,cu2,c1,c2,nblades,s,r
-        delta_c_u = abs(cu1 - cu2)
-        c_inf = (c1 + c2) / 2.0
-
-        # Zur Ueberpruefung wird noch die Gitterbelastungszahl berechnet welche im Bereich von ca. 0.4 bis 2.5 liegen sollte:
-        gitterbelastung = 2.0 * delta_c_u / c_inf
-
-        # Berechnung der wahren t/s Verhaeltnisse mit den gewaehlten Prim-Schaufelzahlen
-        pitch_ratio_recalc = 2.0 * numpy.pi * r / (nblades * s)
-
-        # Minderumlenkung! > NACA 6510
-        deviation_angle = (0.23 * ((2.0 * 0.5) ** 2) + 0.1 * (alpha2 / 50.)) * (alpha1 - alpha2) * (
-            numpy.sqrt(pitch_ratio_recalc))
-        gamma = (alpha1 / 2.0) + ((alpha2 - deviation_angle) / 2.0) - 90.0
-
-        # Zur Ueberpruefung wird noch der sich aus Gitterbelastungszahl und Teilungsverhaeltnis ergebende Auftriebsbeiwert berechnet
-        c_a = gitterbelastung * pitch_ratio_recalc
-
-        return c_a, gamma, deviation_angle, pitch_ratio_recalc, gitterbelastung
+        return calcProfile(alpha1, alpha2, cu1, cu2, c1, c2, nblades, s, r)
 
     # Diese Funktion wird aus der BdXML Klasse aufgerufen und bekommt von dort das dom-xml-objekt. Außerdem wird die Stufennummer (bei 0 beginnend) übergeben.
     def writeXML(self, dom_object, stagenumber=0, z=0):
@@ -1016,6 +1005,396 @@ class CompressorAxial(AbstractTurbo):
                 # createElement(dom_object,"polyThickRBs",numpy.array2string(poly,separator=","))
 
 
+# ===============================================================================
+# Klasse zur Definition und Berechnung eines mehrstufigen Axialverdichters
+# ===============================================================================
+# Die Stufen sind keine einzelnen CompressorAxial-Objekte: die stufenweisen Eingaben (Pi, eta_pol, reaction, ...)
+# sind Arrays mit einem Wert je Stufe (ein Skalar gilt fuer alle Stufen), die Ergebnisse Arrays ueber die Stufen.
+# Nur die Kopplung der Stufen (T_t3 -> T_t1, r_h3/r_s3 -> r_h1/r_s1) wird Stufe fuer Stufe gerechnet, alle anderen
+# Groessen fuer alle Stufen (und Profilschnitte) gemeinsam.
+#
+# Example (see projects/multistage.py):
+#	comp = MultiStageAxialCompressor("Compressor", 6)
+#	comp.Pi = [1.20, 1.19, 1.18, 1.17, 1.16, 1.15]
+#	comp.b_to_s_rotor = [1.2, 1.2, 1.15, 1.1, 1.0, 0.9]
+#	...
+#	comp.calcThermo()
+#	comp.calcAero()
+#	comp.calcBladeGeom(cuts=5)
+#	comp.getStage(0).printStage()
+# As subcomponent (thermodynamics) of an engine:
+#	engine.replaceSubcomponent("hpc", MultiStageAxialCompressor("HPC", 6))
+class MultiStageAxialCompressor(AbstractTurbo):
+    def __init__(self, ident_, numberStages=1):
+        # Inheritation of AbstractTurbo
+        AbstractTurbo.__init__(self, ident_)
+
+        self.type = 'Multistage Axial Compressor'
+
+        self.thermoInputParams = [["T_t1", "K", "Total temperature at inlet"],
+                                  ["p_t1", "-", "Total pressure inlet"],
+                                  ["numberStages", "-", "Number of stages"],
+                                  ["Pi", "-", "Total pressure ratio of the stages (per stage)"],
+                                  ["eta_pol", "-", "Polytropic efficiency of the stages (per stage)"],
+                                  ["Ma_inlet", "-", "Approximate Mach number at stage inlet (per stage)"],
+                                  ["Ma_outlet", "-", "Approximate Mach number at stage outlet (per stage)"],
+                                  ["mflow", "kg/s", "Massflow"]]
+        self.thermoOutputParams = [["T_t3", "K", "Total temperature at outlet"],
+                                   ["p_t3", "-", "Total pressure outlet"],
+                                   ["Pi_total", "-", "Total pressure ratio of the compressor"],
+                                   ["R", "J/(mol kg)", "Specific gas constant"],
+                                   ["kappa", "-", "Mean isentropic exponent between inlet and outlet"],
+                                   ["deltaP", "W", "Power of the compressor"],
+                                   ["T_t3_stages", "K", "Total temperature at stage outlet (per stage)"],
+                                   ["p_t3_stages", "Pa", "Total pressure at stage outlet (per stage)"],
+                                   ["deltaP_stages", "W", "Power of the stages (per stage)"]]
+
+        self.aeroInputParams = [["p_t1", "Pa", "Stagnation pressure at inlet"],
+                                ["r_h1", "m", "Radius at Hub at inlet"],
+                                ["r_s1", "m", "Radius at Shroud at inlet"],
+                                ["z_1", "m", "z-Coordinate at inlet"],
+                                ["alpha_1", "deg", "Absolute flow angle at layer 1 (per stage)"],
+                                ["alpha_3", "deg", "Absolute flow angle at layer 3 (per stage)"],
+                                ["c_3toc_1", "", "Ratio of c_3 to c_1 (per stage)"],
+                                ["reaction", "-", "Degree of reaction (per stage)"],
+                                ["diffusion_rotor", "-", "Diffusionfactor according to Lieblein rotor (per stage)"],
+                                ["diffusion_stator", "-", "Diffusionfactor according to Lieblein stator (per stage)"],
+                                ["b_to_s_rotor", "-", "Ratio of blade length to chord length rotor (per stage)"],
+                                ["b_to_s_stator", "-", "Ratio of blade length to chord length stator (per stage)"],
+                                ["rho_rotormaterial", "kg/m^3", "Density of the rotorblade-material"],
+                                ["n", "1/min", ""]]
+        # Ergebnisse wie CompressorAxial, als Arrays ueber die Stufen
+        self.aeroOutputParams = [["r_h1_stages", "m", "Radius of hub at layer 1 (per stage)"],
+                                 ["r_s1_stages", "m", "Radius of shroud at layer 1 (per stage)"],
+                                 ["z_1_stages", "m", "z-Coordinate at layer 1 (per stage)"]] + \
+                                [[item[0], item[1], item[2] + " (per stage)"]
+                                 for item in CompressorAxial(ident_).aeroOutputParams if item[0] != "p_t3"]
+
+        self.initialize(self.thermoInputParams)
+        self.initialize(self.thermoOutputParams)
+        self.initialize(self.aeroInputParams)
+        self.initialize(self.aeroOutputParams)
+
+        # Parameters proportional to the mass flow
+        self.massflowParams = ["mflow", "deltaP", "deltaP_stages"]
+
+        # defaults (wie CompressorAxial, fuer alle Stufen):
+        self.numberStages = numberStages
+        self.z_1 = 0.0
+        self.p_t1 = 101325
+        self.Ma_inlet = 0.5
+        self.Ma_outlet = 0.5
+        self.alpha_1 = 90.0
+        self.alpha_3 = 90.0
+        self.c_3toc_1 = 1.0
+        self.reaction = 0.5
+        self.R = 287.15
+        self.kappa = 1.4
+        self.radius_const = "rm"  # "casing", "rm" oder "hub" fuer alle Stufen (siehe CompressorAxial)
+        self.rho_rotormaterial = 2700.0  # Dichte von Aluminium (Wert von CompressorAxial.calcAero)
+
+        # Settings outside the parameter lists (see AbstractTurbo.cacheKeyParams)
+        self.cacheKeyParams = [[], ["radius_const"]]
+
+    ## per stage values of a parameter as array of length numberStages (a scalar applies to all stages)
+    def getStageArray(self, name):
+        value = numpy.asarray(getattr(self, name), dtype=float)
+        stages = int(self.numberStages)
+        if value.ndim == 0:
+            return numpy.full(stages, float(value))
+        if value.shape != (stages,):
+            raise Exception(name + " of " + self.identification + " has " + str(value.size) +
+                            " values, expected one per stage (" + str(stages) + ")")
+        return value
+
+    # ===========================================================================
+    # Berechnungsmethode fuer thermodynamische Parameter
+    # ===========================================================================
+    @cachedCalculation("thermo")
+    def calcThermo(self):
+        self.check(self.thermoInputParams)
+
+        self.R = getR()
+        self.setStageThermo(calcStageThermo(self.T_t1, self.p_t1, *[self.getStageArray(name) for name in
+                                                                    ["Pi", "eta_pol", "Ma_inlet", "Ma_outlet"]]))
+
+        self.check(self.thermoOutputParams)
+
+    ## set the thermodynamic results from the states of the stages (one compressor of calcStageThermo)
+    def setStageThermo(self, states):
+        self.T_t1_stages = states["T_t1"]
+        self.p_t1_stages = states["p_t1"]
+        self.T_t3_stages = states["T_t3"]
+        self.p_t3_stages = states["p_t3"]
+        self.T_t2_stages = self.T_t3_stages  # Adiabate Leitraeder
+        self.kappa_stages = (states["kappa_1"] + states["kappa_3"]) / 2
+        self.deltaP_stages = self.mflow * self.kappa_stages / (self.kappa_stages - 1.) * self.R * (
+            self.T_t3_stages - self.T_t1_stages)
+
+        self.T_t3 = self.T_t3_stages[-1]
+        self.p_t3 = self.p_t3_stages[-1]
+        self.Pi_total = self.p_t3 / self.p_t1_stages[0]
+        self.kappa = (states["kappa_1"][0] + states["kappa_3"][-1]) / 2
+        self.deltaP = numpy.sum(self.deltaP_stages)
+
+    # ===========================================================================
+    # Berechnungsmethode fuer aerodynamische und geometrische Parameter aller Stufen
+    # ===========================================================================
+    @cachedCalculation("aero")
+    def calcAero(self):
+        self.check(self.aeroInputParams)
+        stages = int(self.numberStages)
+        x = dict((name, self.getStageArray(name)) for name in
+                 ["alpha_1", "alpha_3", "c_3toc_1", "reaction", "diffusion_rotor", "diffusion_stator",
+                  "b_to_s_rotor", "b_to_s_stator"])
+        self.omega = self.n * numpy.pi / 30.0
+
+        # Ringraum Stufe fuer Stufe: die Austrittsradien einer Stufe sind die Eintrittsradien der folgenden
+        self.r_h1_stages = numpy.zeros(stages)
+        self.r_s1_stages = numpy.zeros(stages)
+        r_h1, r_s1 = self.r_h1, self.r_s1
+        for k in range(stages):
+            self.r_h1_stages[k], self.r_s1_stages[k] = r_h1, r_s1
+            layer = self._calcLayers1And3(k, x, r_h1, r_s1)
+            r_h1, r_s1 = layer["r_h3"], layer["r_s3"]
+
+        # Ebene 1 und 3 aller Stufen
+        for name, value in self._calcLayers1And3(slice(None), x, self.r_h1_stages, self.r_s1_stages).items():
+            setattr(self, name, value)
+
+        # Ebene 2
+        kappa = self.kappa_stages
+        cp = kappa * self.R / (kappa - 1.0)
+        self.T_2 = x["reaction"] * (self.T_3 - self.T_1) + self.T_1
+        self.c_2 = numpy.sqrt(2.0 * cp * (self.T_t2_stages - self.T_2))
+        self.r_m2 = (self.r_m1 + self.r_m3) / 2.0
+        self.u_2 = self.n * numpy.pi / 30.0 * self.r_m2
+        self.c_u2 = (cp * (self.T_t2_stages - self.T_t1_stages) + self.c_u1 * self.u_1) / self.u_2
+        self.c_ax2 = numpy.sqrt(self.c_2 ** 2.0 - self.c_u2 ** 2.0)
+
+        self.w_u2 = self.c_u2 - self.u_2
+        self.w_ax2 = self.c_ax2
+        self.w_2 = numpy.sqrt(self.w_u2 ** 2.0 + self.w_ax2 ** 2.0)
+        self.Ma_2 = self.c_2 / numpy.sqrt(self.T_2 * kappa * self.R)
+
+        self.alpha_2 = numpy.degrees(numpy.arccos(self.c_u2 / self.c_2))
+        self.beta_2 = numpy.degrees(numpy.pi - numpy.arctan2(self.w_ax2, -1.0 * self.w_u2))
+
+        # Annahme des Druckverlustes über den Stator von 0.93
+        self.p_2 = self.p_t3_stages * 0.93 / (self.T_t2_stages / self.T_2) ** (kappa / (kappa - 1.))
+        A_2 = self.mflow / self.c_ax2 / (self.p_2 / (self.R * self.T_2))
+        self.r_m2, self.r_h2, self.r_s2 = self._calcRadii(A_2, self.r_m1, self.r_h1_stages, self.r_s1_stages)
+        self.b_2 = self.r_s2 - self.r_h2
+
+        # Gitterbelastungskriterien
+        self.DeHaller_rotor = self.w_2 / self.w_1
+        self.DeHaller_stator = self.c_3 / self.c_2
+        delta_w_u = numpy.abs(self.w_u1 - self.w_u2)
+        delta_c_u = numpy.abs(self.c_u2 - self.c_u3)
+        self.pitch_ratio_rotor = 2.0 * self.w_1 * (x["diffusion_rotor"] - 1.0 + self.w_2 / self.w_1) / delta_w_u
+        self.pitch_ratio_stator = 2.0 * self.c_2 * (x["diffusion_stator"] - 1.0 + self.c_3 / self.c_2) / delta_c_u
+
+        # Sehnenlaengen und Schaufelzahlen (naechst hoehere Primzahl)
+        self.s_rotor = self.b_2 / x["b_to_s_rotor"]
+        self.z_calc_rotor = 2.0 * self.r_m2 * numpy.pi / (self.pitch_ratio_rotor * self.s_rotor)
+        self.s_stator = self.b_3 / x["b_to_s_stator"]
+        self.z_calc_stator = 2.0 * self.r_m2 * numpy.pi / (self.pitch_ratio_stator * self.s_stator)
+        self.z_chosen_rotor = numpy.array([nextPrime(z) for z in self.z_calc_rotor])
+        self.z_chosen_stator = numpy.array([nextPrime(z) for z in self.z_calc_stator])
+
+        self.c_a_rotor, self.gamma_rotor, self.deviation_angle_rotor, self.pitch_ratio_recalc_rotor, \
+            self.gitterbelastung_rotor = calcProfile(self.beta_1, self.beta_2, self.w_u1, self.w_u2, self.w_1,
+                                                     self.w_2, self.z_chosen_rotor, self.s_rotor,
+                                                     (self.r_m1 + self.r_m2) / 2.0)
+        self.c_a_stator, self.gamma_stator, self.deviation_angle_stator, self.pitch_ratio_recalc_stator, \
+            self.gitterbelastung_stator = calcProfile(self.alpha_2, x["alpha_3"], self.c_u2, self.c_u3, self.c_2,
+                                                      self.c_3, self.z_chosen_stator, self.s_stator,
+                                                      (self.r_m2 + self.r_m3) / 2.0)
+
+        # Abschaetzung der Spannungen am Schaufelfuss durch die Zentrifugalkraft
+        self.sigma_z_bladeroot = (self.rho_rotormaterial * ((self.u_1 + self.u_2) * 0.5) ** 2.0 * self.b_2 / (
+            (self.r_m1 + self.r_m2) / 2.0)) / (1000.0 ** 2.0)
+
+        # z-Koordinaten (Ueberschlagsrechnung wie CompressorAxial), die Stufen schliessen aneinander an
+        self.z_1_stages = self.z_1 + numpy.concatenate(([0.0], numpy.cumsum(self.s_rotor + self.s_stator)[:-1]))
+        self.z_2 = self.z_1_stages + self.s_rotor
+        self.z_3 = self.z_2 + self.s_stator
+
+    ## flow state at layer 1 and 3 and outlet radii of the stages index (stage number or slice) for the given
+    # inlet radii (see CompressorAxial.calcAero)
+    def _calcLayers1And3(self, index, x, r_h1, r_s1):
+        kappa = self.kappa_stages[index]
+        R = self.R
+        alpha_1 = numpy.radians(x["alpha_1"][index])
+        alpha_3 = numpy.radians(x["alpha_3"][index])
+        layer = {}
+
+        A_1 = numpy.pi * (r_s1 ** 2.0 - r_h1 ** 2.0)
+        r_m1 = numpy.sqrt((r_h1 ** 2.0 + r_s1 ** 2.0) / 2.0)
+        layer["r_m1"] = r_m1
+
+        # Machzahl aus der Durchflussfunktion (Unterschallast)
+        Q_1 = self.mflow * numpy.sqrt(self.T_t1_stages[index] * R) / (
+            self.p_t1_stages[index] * A_1 * numpy.sin(alpha_1))
+        Ma_1 = machFromFlowFunction(Q_1, kappa)
+        layer["Ma_1"] = Ma_1
+        layer["p_1"] = self.p_t1_stages[index] / (1.0 + (kappa - 1.0) / 2.0 * Ma_1 ** 2.0) ** (kappa / (kappa - 1.0))
+        layer["T_1"] = self.T_t1_stages[index] / (1.0 + (kappa - 1.0) / 2.0 * Ma_1 ** 2.0)
+        layer["c_ax1"] = self.mflow / (A_1 * layer["p_1"] / (R * layer["T_1"]))
+        layer["c_1"] = layer["c_ax1"] / numpy.sin(alpha_1)
+        layer["c_u1"] = layer["c_1"] * numpy.cos(alpha_1)
+        layer["u_1"] = self.n * numpy.pi / 30.0 * r_m1
+        layer["w_u1"] = layer["c_u1"] - layer["u_1"]
+        layer["w_ax1"] = layer["c_ax1"]
+        layer["w_1"] = numpy.sqrt(layer["w_ax1"] ** 2.0 + layer["w_u1"] ** 2.0)
+        layer["beta_1"] = numpy.degrees(numpy.pi - numpy.arctan2(layer["w_ax1"], -1.0 * layer["w_u1"]))
+
+        # Ebene 3
+        c_3 = layer["c_1"] * x["c_3toc_1"][index]
+        T_3 = self.T_t3_stages[index] - c_3 ** 2.0 / (2.0 * kappa * R / (kappa - 1.0))
+        Ma_3 = c_3 / numpy.sqrt(T_3 * kappa * R)
+        p_3 = self.p_t3_stages[index] / (1.0 + (kappa - 1.0) / 2.0 * Ma_3 ** 2.0) ** (kappa / (kappa - 1.0))
+        layer["c_3"] = c_3
+        layer["c_ax3"] = numpy.sin(alpha_3) * c_3
+        layer["c_u3"] = numpy.cos(alpha_3) * c_3
+        layer["T_3"] = T_3
+        layer["Ma_3"] = Ma_3
+        layer["p_3"] = p_3
+
+        A_3 = self.mflow / (layer["c_ax3"] * p_3 / (R * T_3))
+        layer["r_m3"], layer["r_h3"], layer["r_s3"] = self._calcRadii(A_3, r_m1, r_h1, r_s1)
+        layer["b_3"] = layer["r_s3"] - layer["r_h3"]
+        return layer
+
+    ## mean, hub and shroud radius of a layer with the flow area A (radius_const, see CompressorAxial.calcAero)
+    def _calcRadii(self, A, r_m1, r_h1, r_s1):
+        if self.radius_const == "rm":
+            r_m = r_m1
+            r_s = numpy.sqrt(A / (2.0 * numpy.pi) + r_m ** 2.0)
+            r_h = numpy.sqrt(r_m ** 2.0 - A / (2.0 * numpy.pi))
+        elif self.radius_const == "casing":
+            r_s = r_s1
+            r_m = numpy.sqrt(r_s ** 2.0 - A / (2.0 * numpy.pi))
+            r_h = numpy.sqrt(r_m ** 2.0 - A / (2.0 * numpy.pi))
+        elif self.radius_const == "hub":
+            r_h = r_h1
+            r_m = numpy.sqrt(A / (2.0 * numpy.pi) - r_h ** 2.0)
+            r_s = numpy.sqrt(A / (2.0 * numpy.pi) + r_m ** 2.0)
+        else:
+            raise Exception("Unknown radius_const '" + str(self.radius_const) + "', use rm, casing or hub")
+        return r_m, r_h, r_s
+
+    # ===========================================================================
+    # Berechnungsmethode fuer Drallverteilung ueber Schaufelhoehe (alle Stufen)
+    # ===========================================================================
+    # Übergabeparameter (siehe CompressorAxial.calcBladeGeom):
+    # cuts Anzahl der Profilschnitte
+    # n_lay1/2/3 Exponent für die Verwindungsfunktion an der entsprechenden Schaufelebene (1=Festkörperrotation,-1=Potentialwirbel)
+    # Die Ergebnisse ArrayLayer1/2/3 haben die Form (Stufen, Schnitte, Spalten), Ebene 3 einer Stufe ist Ebene 1 der
+    # folgenden Stufe.
+    def calcBladeGeom(self, cuts=5, n_lay1=1, n_lay2=-1, n_lay3=1):
+        self.numberCuts = cuts
+        stages = int(self.numberStages)
+        alpha_1 = self.getStageArray("alpha_1")
+        alpha_3 = self.getStageArray("alpha_3")
+
+        self.ArrayLayer1 = zeros((stages, cuts, 13))
+        self.ArrayLayer2 = zeros((stages, cuts, 14))
+        self.ArrayLayer3 = zeros((stages, cuts, 13))
+
+        # Lineare Aufteilung des Radius ueber Schaufelhoehe, Form (Stufen, Schnitte)
+        r_1 = linspace(self.r_h1_stages, self.r_s1_stages, cuts, axis=1)
+        r_2 = linspace(self.r_h2, self.r_s2, cuts, axis=1)
+        r_3 = linspace(self.r_h3[-1], self.r_s3[-1], cuts)
+
+        # Ebene 1: erste Stufe homogen angestroemt, folgende Stufen nach der Verwindungsfunktion
+        c_1, c_ax1, c_u1, alph_1 = self._calcTwist(n_lay1, r_1, self.r_m1[:, None], self.c_u1[:, None],
+                                                   self.c_ax1[:, None], alpha_1[:, None])
+        c_1[0], c_ax1[0], c_u1[0], alph_1[0] = self.c_1[0], self.c_ax1[0], self.c_u1[0], alpha_1[0]
+        w_u1 = c_u1 - self.omega * r_1
+        w_1 = numpy.sqrt(c_ax1 ** 2 + w_u1 ** 2)
+        layer1 = self.ArrayLayer1
+        for j, value in enumerate([r_1, c_1, c_ax1, c_u1, alph_1, w_1, w_u1, numpy.degrees(numpy.arccos(w_u1 / w_1))]):
+            layer1[:, :, j] = value
+
+        # Ebene 2
+        c_2, c_ax2, c_u2, alph_2 = self._calcTwist(n_lay2, r_2, self.r_m2[:, None], self.c_u2[:, None],
+                                                   self.c_ax2[:, None], self.alpha_2[:, None])
+        w_u2 = c_u2 - self.omega * r_2
+        w_2 = numpy.sqrt(c_ax2 ** 2 + w_u2 ** 2)
+        beta_2 = numpy.degrees(numpy.arccos(w_u2 / w_2))
+        layer2 = self.ArrayLayer2
+        for j, value in enumerate([r_2, c_2, c_ax2, c_u2, alph_2, w_2, c_ax2, w_u2, beta_2, beta_2 - layer1[:, :, 7],
+                                   w_2 / layer1[:, :, 5]]):
+            layer2[:, :, j] = value
+        layer2[:, :, 11], layer2[:, :, 12], layer2[:, :, 13] = calcProfile(
+            layer1[:, :, 7], beta_2, layer1[:, :, 6], w_u2, layer1[:, :, 5], w_2, self.z_chosen_rotor[:, None],
+            self.s_rotor[:, None], r_2)[:3]
+
+        # Umlenkung der Statoren (Ebene 2 der vorherigen Stufe -> Ebene 1)
+        pre = layer2[:-1]
+        layer1[1:, :, 8] = layer1[1:, :, 4] - pre[:, :, 4]
+        layer1[1:, :, 9] = layer1[1:, :, 1] / pre[:, :, 1]
+        layer1[1:, :, 10], layer1[1:, :, 11], layer1[1:, :, 12] = calcProfile(
+            pre[:, :, 4], layer1[1:, :, 4], pre[:, :, 3], layer1[1:, :, 3], pre[:, :, 1], layer1[1:, :, 1],
+            self.z_chosen_stator[:-1, None], self.s_stator[:-1, None], r_1[1:])[:3]
+
+        # Ebene 3: Ebene 1 der folgenden Stufe, Austritt der letzten Stufe wie CompressorAxial.calcBladeGeomLayer3
+        self.ArrayLayer3[:-1] = layer1[1:]
+        last = layer2[-1]
+        if max(last[:, 1]) * 0.7 > self.c_ax3[-1]:  # Vorgabe eines DH-Kriteriums von 0.7
+            c_3, c_ax3, c_u3, alph_3 = self._calcTwist(n_lay3, r_3, self.r_m2[-1], self.c_u3[-1], self.c_ax3[-1],
+                                                       alpha_3[-1])
+        else:
+            c_3, c_ax3, c_u3, alph_3 = [numpy.full(cuts, value) for value in
+                                        (self.c_3[-1], self.c_ax3[-1], self.c_u3[-1], alpha_3[-1])]
+        layer3 = self.ArrayLayer3[-1]
+        for j, value in enumerate([r_3, c_3, c_ax3, c_u3, alph_3]):
+            layer3[:, j] = value
+        layer3[:, 8] = alph_3 - last[:, 4]
+        layer3[:, 9] = c_3 / last[:, 1]
+        layer3[:, 10], layer3[:, 11], layer3[:, 12] = calcProfile(
+            last[:, 4], alph_3, last[:, 3], c_u3, last[:, 1], c_3, self.z_chosen_rotor[-1], self.s_rotor[-1], r_3)[:3]
+
+    ## absolute velocity, axial and circumferential component and flow angle [deg] at the radii r of a layer with
+    # the mean values at r_m (n_law 1: Festkoerperrotation, -1: Potentialwirbel)
+    def _calcTwist(self, n_law, r, r_m, c_u, c_ax, alpha):
+        if n_law == -1:
+            c_u_r = c_u * r_m / r
+            alpha_r = numpy.degrees(numpy.arctan(numpy.tan(numpy.radians(alpha)) * r / r_m))
+            c_ax_r = c_u_r * numpy.tan(numpy.radians(alpha_r))
+            c_r = c_u_r / numpy.cos(numpy.radians(alpha_r))
+        elif n_law == 1:
+            c_u_r = c_u / r_m * r
+            c_ax_r = numpy.sqrt(c_ax ** 2 - 2 * (c_u_r ** 2 - c_u ** 2))
+            c_r = numpy.sqrt(c_ax_r ** 2 + c_u_r ** 2)
+            alpha_r = numpy.degrees(numpy.arccos(c_u_r / c_r))
+        else:
+            raise Exception("Unknown twist law n=" + str(n_law) + ", use 1 or -1")
+        return c_r, c_ax_r, c_u_r, alpha_r
+
+    ## stage k (0 ... numberStages - 1) as CompressorAxial object with the results of this compressor (e.g. for
+    # printStage or the BdXML export of bladeDesignerXML)
+    def getStage(self, k):
+        stage = CompressorAxial(self.identification + " " + str(k + 1))
+        names = [item[0] for item in stage.thermoInputParams + stage.thermoOutputParams + stage.aeroInputParams +
+                 stage.aeroOutputParams] + ["kappa", "T_t2", "omega", "r_m2", "r_m3", "c_ax1", "w_u1", "c_ax2",
+                                            "w_u2", "radius_const", "numberCuts", "ArrayLayer1", "ArrayLayer2",
+                                            "ArrayLayer3"]
+        for name in names:
+            value = getattr(self, name + "_stages", None)
+            if value is None:
+                value = getattr(self, name, None)
+            if numpy.ndim(value) > 0:
+                value = value[k]
+            setattr(stage, name, value)
+        return stage
+
+    ## all stages as CompressorAxial objects (see getStage)
+    def getStages(self):
+        return [self.getStage(k) for k in range(int(self.numberStages))]
+
+
 # ===============================================================================
 # Klasse zur Definition und Berechnung eines Radialverdichters
 # ===============================================================================
@@ -1087,6 +1466,9 @@ class CompressorRadial(AbstractTurbo):
         self.initialize(self.aeroInputParams)
         self.initialize(self.aeroOutputParams)
 
+        # Parameters proportional to the mass flow
+        self.massflowParams = ["mflow", "deltaP"]
+
         # Defaults:
         self.Pi_Verlust_Stator = 0.9
         self.phi_2 = 0.2
@@ -1094,7 +1476,12 @@ class CompressorRadial(AbstractTurbo):
         self.p_t1 = 101325
         self.Ma_inlet = 0.5
         self.Ma_outlet = 0.7
+        self.maxIter = 200  # Max. Iterationen fuer phi_2 und beta_2
 
+        # Settings outside the parameter lists (see AbstractTurbo.cacheKeyParams)
+        self.cacheKeyParams = [[], ["Pi_Verlust_Stator", "maxIter"]]
+
+    @cachedCalculation("thermo")
     def calcThermo(self):
         self.check(self.thermoInputParams)
 
@@ -1117,6 +1504,7 @@ class CompressorRadial(AbstractTurbo):
 
         self.check(self.thermoOutputParams)
 
+    @cachedCalculation("aero")
     def calcAero(self):
         self.check(self.aeroInputParams)
 
@@ -1153,24 +1541,26 @@ class CompressorRadial(AbstractTurbo):
 
     def iterateBeta(self):
         # print "IterateBeta"
-        convergence = False
-        tolerance = 0.00001
+        # Die Funktion Iterate Beta soll fogendes machen:
+        # 1. Es wird Epsilon berechnet mit calcEpsilon - Ergebnis ist Epsilon
+        # 2. Es wird mit dem eben berechneten Epsilon ein beta_2 berechnet, also den tatsaechlichen Stroemungswinkel
+        # Mit der Abfrage self.beta_2-origBeta2<Tolerance wird geprüft wie Beta von dem vorher angenommenen Beta (im 1. Schritt der Schaufelwinkel) abweicht
+        # Ist die Toleranze noch groeßer 0.00001 (Was sie beim ersten mal ganz sicher sein wird) wird mit dem eben errechneten beta_2 ein neues Epsilon berechnet
+        # Mit dem neu brechneten Epsilon wird dann wieder ein beta_2 berechnet bis beta_2 die gewollte Toleranz aufweist
+        # (beschleunigte Fixpunktiteration, siehe gtdev.solvers.solveFixedPoint; Arrays von Auslegungen werden gemeinsam iteriert)
+        def fkt(beta_2):
+            self.beta_2 = beta_2
+            self.calcEpsilon()
+            self.calcBeta()
+            return self.beta_2
+
         self.beta_2 = self.beta_2s
         self.calcEpsilon()
         self.calcBeta()
-        while convergence != True:
-            # print self.beta_2
-            origBeta2 = self.beta_2
-            self.calcEpsilon()
-            self.calcBeta()
-            if numpy.abs(self.beta_2 - origBeta2) < tolerance:
-                break
-                # Die Funktion Iterate Beta soll fogendes machen:
-                # 1. Es wird Epsilon berechnet mit calcEpsilon - Ergebnis ist Epsilon
-                # 2. Es wird mit dem eben berechneten Epsilon ein beta_2 berechnet, also den tatsaechlichen Stroemungswinkel
-                # Mit der Abfrage self.beta_2-origBeta2<Tolerance wird geprüft wie Beta von dem vorher angenommenen Beta (im 1. Schritt der Schaufelwinkel) abweicht
-                # Ist die Toleranze noch groeßer 0.00001 (Was sie beim ersten mal ganz sicher sein wird) wird mit dem eben errechneten beta_2 ein neues Epsilon berechnet
-                # Mit dem neu brechneten Epsilon wird dann wieder ein beta_2 berechnet bis beta_2 die gewollte Toleranz aufweist
+        result = solveFixedPoint(fkt, self.beta_2, tolerance=0.00001, maxIter=self.maxIter)
+        if not numpy.all(result.converged):
+            raise Exception("Max. Iteration exceeded -> Radial Compressor beta_2. Try using different entry conditions!")
+        self.beta_2 = result.x
 
     def calcPhi2(self):
         # print "calcPhi2"
@@ -1242,34 +1632,35 @@ class CompressorRadial(AbstractTurbo):
         self.A_2 = self.b_2 * self.d_2 * numpy.pi
 
     def Wislon_Cordalis(self):
-        self.verzoegerungsverhaeltnis_TF = False
-        self.durchmesserverhaeltnis_TF = False
         self.verzoegerungsverhaeltnis = (self.u_2 / self.u_1s) * (numpy.cos(numpy.pi - self.beta_1s) / (
             (1.0 / numpy.tan(self.alpha_2) - 1.0 / numpy.tan(self.beta_2)) * numpy.sin(self.beta_2)))
         self.durchmesserverhaeltnis = (1.0 / 0.8) * (numpy.cos(numpy.pi - self.beta_1s) / (
             (1.0 / numpy.tan(self.alpha_2) - 1.0 / numpy.tan(self.beta_2)) * numpy.sin(self.beta_2)))
-        if self.verzoegerungsverhaeltnis > 0.8:
-            self.verzoegerungsverhaeltnis_TF = True
-        if self.durchmesserverhaeltnis > self.d_1Goverd_2:
-            self.durchmesserverhaeltnis_TF = True
-            # Ueberpruefung des Verzoegerungsverhaeltnisses nach Wilso und Cordalis
+        # Ueberpruefung des Verzoegerungsverhaeltnisses nach Wilso und Cordalis (elementweise fuer Arrays von Auslegungen)
+        self.verzoegerungsverhaeltnis_TF = numpy.asarray(self.verzoegerungsverhaeltnis) > 0.8
+        self.durchmesserverhaeltnis_TF = numpy.asarray(self.durchmesserverhaeltnis) > self.d_1Goverd_2
+        if self.verzoegerungsverhaeltnis_TF.ndim == 0:
+            self.verzoegerungsverhaeltnis_TF = bool(self.verzoegerungsverhaeltnis_TF)
+            self.durchmesserverhaeltnis_TF = bool(self.durchmesserverhaeltnis_TF)
 
     def iteratePhi2(self):
-        convergence = False
-        tolerance = 0.00001
-        origphi_2 = self.phi_2
-        self.iterateBeta()
-        self.calcPhi2()
-        while convergence != True:
-            origphi_2 = self.phi_2
+        # Diese Funktion ist die erste die aufgerufen wird und beinhaltet sowohl calcPhi als auch iterateBeta
+        # In der Schleife wird zuerst Beta iteriert, anschließend mit dem neuen beta_2 Phi_2 neu berechnet
+        # Ist Phi zwei nicht in der entsprechenden Toleranz wird mit dem neuen Phi_2 wieder Beta iteriert (bis doch die gewuenschte Genauigkeit erreicht wurde;siehe IterateBeta)
+        # Und anschliessend mit dem neuen beta_2 wieder Phi2 berechnet
+        # Erst wenn Phi2 die gewuente Genauigkeit erreicht hat bricht die Schleife ab und CalcAero wird aufgerufen
+        def fkt(phi_2):
+            self.phi_2 = phi_2
             self.iterateBeta()
             self.calcPhi2()
-            if numpy.abs(self.phi_2 - origphi_2) < tolerance:
-                break
-                # Diese Funktion ist die erste die aufgerufen wird und beinhaltet sowohl calcPhi als auch iterateBeta
-                # In der Schleife wird zuerst Beta iteriert, anschließend mit dem neuen beta_2 Phi_2 neu berechnet
-                # Ist Phi zwei nicht in der entsprechenden Toleranz wird mit dem neuen Phi_2 wieder Beta iteriert (bis doch die gewuenschte Genauigkeit erreicht wurde;siehe IterateBeta)
-                # Und anschliessend mit dem neuen beta_2 wieder Phi2 berechnet
-                # Erst wenn Phi2 die gewuente Genauigkeit erreicht hat bricht die Schleife ab und CalcAero wird aufgerufen
-                # Der mittlere Radius bestimmt sich aus der flaechengleichen Halbierung zwischen Nabe und Geh�use
-                # self.r_m1=numpy.sqrt(((self.d_1h/2)**2.0+self.r_s1**2.0)/2.0)
+            return self.phi_2
+
+        self.iterateBeta()
+        self.calcPhi2()
+        result = solveFixedPoint(fkt, self.phi_2, tolerance=0.00001, maxIter=self.maxIter)
+        self.iterationHistory = result.residuals
+        if not numpy.all(result.converged):
+            raise Exception("Max. Iteration exceeded -> Radial Compressor phi_2. Try using different entry conditions!")
+        self.phi_2 = result.x
+        # Der mittlere Radius bestimmt sich aus der flaechengleichen Halbierung zwischen Nabe und Geh�use
+        # self.r_m1=numpy.sqrt(((self.d_1h/2)**2.0+self.r_s1**2.0)/2.0)
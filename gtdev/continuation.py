@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# continuation.py
+# Operating lines and throttle sweeps of one engine object (e.g. turbofan.Turbofan_Recalc), point after point.
+# The component solvers (CombChamber, Turbine) start from a prediction out of the last converged points
+# instead of their fixed start values, the step between two points is subdivided when convergence degrades.
+#
+# Example:
+#	points = [{"combc.T_t3": T} for T in numpy.linspace(1500., 1250., 26)]
+#	line = runContinuation(engine, points, outputs=["F", "SFC"])
+#	[point.evaluations for point in line]
+# imports:
+import numpy
+
+from gtdev import helper_methods, sweep
+
+
+## result of one operating point of runContinuation
+#
+# iterations: {component path: solver iterations summed over all sub-steps (incl. failed ones)}
+# evaluations: number of cycle calculations, steps: accepted sub-steps (1 if the point was reached directly)
+class ContinuationPoint(object):
+    def __init__(self, inputs, success, outputs, iterations, evaluations, steps):
+        self.inputs = inputs
+        self.success = success
+        self.outputs = outputs
+        self.iterations = iterations
+        self.evaluations = evaluations
+        self.steps = steps
+
+    ## total solver iterations of the point
+    def getEffort(self):
+        return sum(self.iterations.values())
+
+
+## dotted paths of all components with warm startable solvers (attribute warmStart, e.g. combc, hpt, lpt)
+def getSolverComponents(engine, prefix=""):
+    paths = []
+    if hasattr(engine, "warmStart"):
+        paths.append(prefix.rstrip("."))
+    for component in engine.subcomponentList:
+        paths += getSolverComponents(getattr(engine, component[0]), prefix + component[0] + ".")
+    return paths
+
+
+## walk an ordered sequence of operating points with one engine object
+#
+# Every point is reached from the last converged point. The solver start values are extrapolated linearly
+# from the last two converged states (predictor), the cycle calculation is the corrector. A failed step is
+# retried with half the length, a step needing more than twice the solver iterations of the first point halves
+# the following steps. The step grows again (up to the full step) when the iterations are back to normal.
+# @param engine
+#	configured engine object, its current inputs are the start of the sequence
+# @param points
+#	list of dictionaries {dotted input path: value} (see sweep.makeGrid), in the order to be walked
+# @param outputs
+#	dotted paths stored for every point, default: all thermodynamic outputs
+# @param warmStart
+#	False: every solver starts from its fixed start values (reference for the solver effort)
+# @param minStep
+#	smallest fraction of a step before a point is given up (success False, the next point starts from the
+#	last converged point)
+def runContinuation(engine, points, outputs=None, warmStart=True, minStep=1. / 16., method="calcThermo"):
+    if outputs is None:
+        outputs = engine.getThermoOutputPaths()
+    solvers = getSolverComponents(engine)
+    for path in solvers:
+        engine.getParameter(path).warmStart = warmStart
+
+    # zuletzt konvergierte Eingaben, Loeserzustaende (Praediktor) und Zustand des Triebwerks
+    converged = engine.takeSnapshot()
+    current = {}
+    history = []
+    reference = None
+    step = 1.0
+    results = []
+    for target in points:
+        for path in target:
+            if path not in current:
+                current[path] = engine.getParameter(path)
+        start = dict((path, current[path]) for path in target)
+        iterations = dict((path, 0) for path in solvers)
+        evaluations = 0
+        steps = 0
+        position = 0.0
+        success = True
+        while position < 1.0:
+            h = min(step, 1.0 - position)
+            inputs = dict((path, start[path] + (position + h) * (target[path] - start[path])) for path in target)
+            for path in inputs:
+                engine.setParameter(path, inputs[path])
+            if warmStart:
+                _predict(engine, solvers, history, _distance(current, inputs))
+
+            for path in solvers:
+                engine.getParameter(path).solverIterations = 0
+            evaluations += 1
+            try:
+                getattr(engine, method)()
+                success = True
+            except Exception as detail:
+                helper_methods.logger.debug("Continuation step " + str(inputs) + " failed: " + str(detail))
+                success = False
+            effort = 0
+            for path in solvers:
+                count = getattr(engine.getParameter(path), "solverIterations", None) or 0
+                iterations[path] += count
+                effort = max(effort, count)
+
+            if success:
+                converged = engine.takeSnapshot()
+                if reference is None:
+                    reference = effort
+                history = (history + [(_distance(current, inputs), _solverStates(engine, solvers))])[-2:]
+                current.update(inputs)
+                position += h
+                steps += 1
+                if effort > 2 * reference:
+                    step = max(minStep, h / 2.0)
+                elif effort <= reference:
+                    step = min(1.0, 2.0 * step)
+            else:
+                # fehlgeschlagener Schritt: zurueck zum letzten konvergierten Zustand
+                engine.restoreSnapshot(converged)
+                if h / 2.0 >= minStep:
+                    step = h / 2.0
+                    success = True
+                else:
+                    break
+
+        if not success:
+            # mit dem naechsten Punkt vom letzten konvergierten Zustand aus weiter
+            step = 1.0
+        values = dict((path, sweep.toFloat(engine.getParameter(path)) if success else float("nan"))
+                      for path in outputs)
+        results.append(ContinuationPoint(dict(target), success, values, iterations, evaluations, steps))
+    return results
+
+
+## solver states (solverStart dictionaries) of the solver components
+def _solverStates(engine, solvers):
+    return dict((path, dict(engine.getParameter(path).solverStart or {})) for path in solvers)
+
+
+## linear extrapolation of the solver start values to a step of the given length
+def _predict(engine, solvers, history, distance):
+    if len(history) < 2 or history[-1][0] <= 0.0:
+        return
+    factor = distance / history[-1][0]
+    for path in solvers:
+        last = history[-1][1][path]
+        previous = history[-2][1][path]
+        if last and sorted(last) == sorted(previous):
+            engine.getParameter(path).solverStart = dict(
+                (name, last[name] + factor * (last[name] - previous[name])) for name in last)
+
+
+## relative distance between two sets of inputs
+def _distance(old, new):
+    return float(numpy.sqrt(sum(((new[path] - old[path]) / (abs(old[path]) or 1.0)) ** 2 for path in new)))
+
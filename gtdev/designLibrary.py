@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# designLibrary.py
+# Many engine designs (with their subcomponents) in one JSON file. The parameters keep their types (float, int,
+# string, None, arrays as lists), a library of hundreds of designs is read with one json.load instead of one
+# ConfigParser per design. INI files saved by AbstractTurbo.saveObject are imported with importIniFiles.
+#
+# Example:
+#	designs = importIniFiles(["projects/Tj67", "projects/Tf01"])
+#	saveDesigns("library.json", designs)
+#	for engine in loadDesigns("library.json"):
+#		engine.calcThermo()
+# imports:
+import json
+import os
+
+import numpy
+
+from gtdev import combChamber, compressor, nozzle, turbine, turbofan, turbojet
+
+## format version of a design file
+DESIGN_FORMAT = 1
+
+## classes of the design types {AbstractTurbo.type: class}, the constructors take the identification
+DESIGN_TYPES = {"Turbofan": turbofan.Turbofan,
+                "Turbofan_Recalc": turbofan.Turbofan_Recalc,
+                "Turbojet": turbojet.Turbojet,
+                "Axial Compressor": compressor.CompressorAxial,
+                "Radial Compressor": compressor.CompressorRadial,
+                "Multistage Axial Compressor": compressor.MultiStageAxialCompressor,
+                "Combustion Chamber": combChamber.CombChamber,
+                "Axial Turbine": turbine.Turbine,
+                "Nozzle": nozzle.Nozzle}
+
+
+## design of obj as dictionary {"type", "identification", "parameters": {name: value}, "components": {name: design}}
+# with the values of all parameter lists of obj and its subcomponents
+def getDesign(obj):
+    parameters = {}
+    for item in obj.thermoInputParams + obj.thermoOutputParams + obj.aeroInputParams + obj.aeroOutputParams:
+        parameters[item[0]] = _encodeValue(getattr(obj, item[0], None))
+    return {"type": obj.type, "identification": obj.identification, "parameters": parameters,
+            "components": dict((component[0], getDesign(component[1])) for component in obj.subcomponentList)}
+
+
+## set the parameters of a design (see getDesign) on obj and its subcomponents, subcomponents of another type than
+# in the design are replaced (AbstractTurbo.replaceSubcomponent)
+def setDesign(obj, design, types=None):
+    for name, value in design["parameters"].items():
+        setattr(obj, name, _decodeValue(value))
+    for name, component in design["components"].items():
+        if component["type"] != getattr(obj, name).type:
+            obj.replaceSubcomponent(name, buildDesign(component, types))
+        else:
+            setDesign(getattr(obj, name), component, types)
+
+
+## new object of the design type with the parameters of the design
+#
+# @param types
+#	dictionary {type: class} (default: DESIGN_TYPES)
+def buildDesign(design, types=None):
+    if types is None:
+        types = DESIGN_TYPES
+    if design["type"] not in types:
+        raise Exception("Unknown design type '" + str(design["type"]) + "', use one of " + str(sorted(types)))
+    obj = types[design["type"]](design["identification"])
+    setDesign(obj, design, types)
+    return obj
+
+
+## save objects (or designs, see getDesign) to one design file
+def saveDesigns(filename, objects):
+    designs = [obj if isinstance(obj, dict) else getDesign(obj) for obj in objects]
+    temp = filename + ".tmp"
+    with open(temp, "w") as f:
+        json.dump({"format": DESIGN_FORMAT, "designs": designs}, f, indent=1)
+    os.replace(temp, filename)
+
+
+## designs of a design file (dictionaries, see getDesign)
+def readDesigns(filename):
+    with open(filename) as f:
+        library = json.load(f)
+    if library.get("format") != DESIGN_FORMAT:
+        raise Exception("Design file format " + str(library.get("format")) + " of " + filename + " is not supported")
+    return library["designs"]
+
+
+## objects of all designs of a design file (see buildDesign)
+def loadDesigns(filename, types=None):
+    return [buildDesign(design, types) for design in readDesigns(filename)]
+
+
+## objects of INI files saved by AbstractTurbo.saveObject (type and identification from the section "general")
+def importIniFiles(filenames, types=None):
+    if types is None:
+        types = DESIGN_TYPES
+    objects = []
+    for filename in filenames:
+        general = _readGeneralSection(filename)
+        if general.get("type") not in types:
+            raise Exception("Unknown design type '" + str(general.get("type")) + "' in " + filename)
+        obj = types[general["type"]](general.get("identification", os.path.basename(filename)))
+        obj.loadObject(filename)
+        objects.append(obj)
+    return objects
+
+
+# numpy Werte als JSON Typen (Arrays als Listen)
+def _encodeValue(value):
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    if isinstance(value, numpy.generic):
+        return value.item()
+    return value
+
+
+# Listen werden wieder zu Arrays
+def _decodeValue(value):
+    if isinstance(value, list):
+        return numpy.array(value)
+    return value
+
+
+# Abschnitt "general" einer INI Datei (ohne ConfigParser: nur type und identification werden gebraucht)
+def _readGeneralSection(filename):
+    values = {}
+    section = None
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("[") and line.endswith("]"):
+                if section == "general":
+                    break
+                section = line[1:-1]
+            elif section == "general" and "=" in line:
+                key, value = line.split("=", 1)
+                values[key.strip()] = value.strip()
+    return values
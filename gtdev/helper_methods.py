@@ -16,6 +16,10 @@ from scipy.optimize import fsolve
 import numpy
 import logging
 import sys
+import collections
+import contextlib
+import functools
+import threading
 
 # TODO derive own logging class
 logger = logging.getLogger()
@@ -69,9 +73,350 @@ def getR(material="Air", beta=0.0):
             return 8314.472 * (0.034524 + beta * 0.035645) / (1 + beta)
 
 
+## coefficients of the static kappa(T) correlation for air (pressure of the standard atmosphere)
+KAPPA_AIR_COEFFS = (2.764495554e-020, -1.588301666e-016, 2.93836602 * 0.0000000000001, -1.177356679 * 0.0000000001,
+                    -1.667416736 * 0.0000001, 5.973962506 * 0.00001, 1.398176676 * 1)
+
+## coefficients of the cp(T) polynomials for exhaust gas (NASA style, valid above/below 1000 K)
+#
+# cp = 1 / (1 + beta) * (air part + beta * fuel part), each part is a 4th order polynomial in T
+CP_EXHAUST_HIGH = ((863.29014498, 405.39409798e-3, -153.82359960e-6, 27.94176815e-9, -1.92639216e-12),
+                   (1000.10332581, 2994.47427116e-3, -1076.165307870e-6, 175.24619645e-9, -10.62294583e-12))
+CP_EXHAUST_LOW = ((1057.99590453, -449.19800335e-3, 1109.19492375e-6, -717.44852819e-9, 140.33180754e-12),
+                  (443.41673618, 7367.21480416e-3, -10617.04784788e-6, 8418.76668056e-9, -2529.31551918e-12))
+
+## temperature [K] separating the two branches of the exhaust cp polynomials
+T_EXHAUST_SPLIT = 1000.0
+
+
+## static kappa [-] of air as a function of the static temperature T [K]
+def kappaAir(T):
+    a, b, c, d, e, f, g = KAPPA_AIR_COEFFS
+    return a * T ** 6 + b * T ** 5 + c * T ** 4 + d * T ** 3 + e * T ** 2 + f * T ** 1 + g * T ** 0
+
+
+## evaluate one 4th order part of the exhaust cp polynomials
+def cpPolynomial(coeffs, T):
+    a, b, c, d, e = coeffs
+    return a + b * T + c * T ** 2 + d * T ** 3 + e * T ** 4
+
+
+## specific heat capacity cp [J/(kgK)] of exhaust gas for static temperature T [K] and fuel to air ratio beta
+def cpExhaust(T, beta=0.0):
+    if T >= T_EXHAUST_SPLIT:
+        air, fuel = CP_EXHAUST_HIGH
+    else:
+        air, fuel = CP_EXHAUST_LOW
+    return 1 / (1 + beta) * (cpPolynomial(air, T) + beta * cpPolynomial(fuel, T))
+
+
+## static kappa [-] for static temperature T [K]
+#
+# @param material
+#	identifier for the fluid under consideration (currently only "Air" and "exhaust" are supported)
+# @param beta
+#	fuel to air ratio (only used for "exhaust")
+def kappaStatic(T, material="Air", beta=0.0):
+    if material == "Air" and beta == 0:
+        return kappaAir(T)
+    if material == "exhaust":
+        cp = cpExhaust(T, beta)
+        return cp / (cp - getR(material=material, beta=beta))
+    raise ValueError("Unknown material '" + str(material) + "' (beta=" + str(beta) + ")")
+
+
+## backends for getKappa
+#
+# "fsolve": reference implementation, solves kappa(T_t, Ma) with scipy.optimize.fsolve on the exact correlations
+# "table": linear interpolation in precomputed kappa(T) / cp(T) tables (see KappaTable), built once per process
+GAS_PROPERTY_MODES = ("fsolve", "table")
+
+_gasPropertyMode = "fsolve"
+
+
+## select the backend used by getKappa (see GAS_PROPERTY_MODES)
+def setGasPropertyMode(mode):
+    global _gasPropertyMode
+    if mode not in GAS_PROPERTY_MODES:
+        raise ValueError("Unknown gas property mode '" + str(mode) + "', use one of " + str(GAS_PROPERTY_MODES))
+    _gasPropertyMode = mode
+
+
+## return the backend currently used by getKappa
+def getGasPropertyMode():
+    return _gasPropertyMode
+
+
+## tabulated gas properties on an equidistant static temperature grid
+#
+# Air is tabulated as kappa(T). For exhaust gas the air and fuel parts of cp(T) are tabulated separately
+# for both polynomial branches, so kappa(T, beta) = cp / (cp - R(beta)) is available for any beta without
+# a table per fuel to air ratio. Outside of [Tmin, Tmax] the exact correlations are used.
+#
+# The linear interpolation error is measured on the cell midpoints when the table is built and stored in
+# errorBound (maximum absolute error of the static kappa, exhaust gas checked for 0 <= beta <= 0.1).
+# kappa(T_t, Ma) is found by fixed point iteration on the table; since d(kappa)/d(T) is tiny the iteration
+# contracts by more than a factor of 20 per step, so the deviation from the fsolve path stays below
+# 1.1 * errorBound plus the fsolve tolerance (1.5e-8 relative).
+class KappaTable(object):
+    def __init__(self, Tmin=150.0, Tmax=3000.0, dT=0.5):
+        self.Tmin = Tmin
+        self.Tmax = Tmax
+        self.dT = dT
+        n = int(round((Tmax - Tmin) / dT)) + 1
+        self.T = Tmin + dT * numpy.arange(n)
+
+        self.kappaAir = kappaAir(self.T)
+
+        # Both branches are tabulated over the whole grid, the branch is selected at lookup time
+        self.cpAirLow = cpPolynomial(CP_EXHAUST_LOW[0], self.T)
+        self.cpFuelLow = cpPolynomial(CP_EXHAUST_LOW[1], self.T)
+        self.cpAirHigh = cpPolynomial(CP_EXHAUST_HIGH[0], self.T)
+        self.cpFuelHigh = cpPolynomial(CP_EXHAUST_HIGH[1], self.T)
+
+        # Plain lists are much faster than numpy arrays for scalar element access
+        self._lists = dict((name, getattr(self, name).tolist()) for name in
+                           ["kappaAir", "cpAirLow", "cpFuelLow", "cpAirHigh", "cpFuelHigh"])
+
+        self.errorBound = self.calcErrorBound()
+
+    # index and weight of the grid cell containing T (T inside the table range)
+    def _cell(self, T):
+        x = (T - self.Tmin) / self.dT
+        i = int(x)
+        if i >= len(self.T) - 1:
+            i = len(self.T) - 2
+        return i, x - i
+
+    ## interpolated static kappa for a scalar static temperature T [K]
+    def kappaStatic(self, T, material="Air", beta=0.0):
+        if not self.Tmin <= T <= self.Tmax:
+            return kappaStatic(T, material=material, beta=beta)
+        i, w = self._cell(T)
+        if material == "Air" and beta == 0:
+            k = self._lists["kappaAir"]
+            return k[i] + w * (k[i + 1] - k[i])
+        if material == "exhaust":
+            if T >= T_EXHAUST_SPLIT:
+                air, fuel = self._lists["cpAirHigh"], self._lists["cpFuelHigh"]
+            else:
+                air, fuel = self._lists["cpAirLow"], self._lists["cpFuelLow"]
+            cpAir = air[i] + w * (air[i + 1] - air[i])
+            cpFuel = fuel[i] + w * (fuel[i + 1] - fuel[i])
+            cp = 1 / (1 + beta) * (cpAir + beta * cpFuel)
+            return cp / (cp - getR(material=material, beta=beta))
+        raise ValueError("Unknown material '" + str(material) + "' (beta=" + str(beta) + ")")
+
+    ## interpolated static kappa for an array of static temperatures T [K] (beta may be an array too)
+    def kappaStaticArray(self, T, material="Air", beta=0.0):
+        T, beta = numpy.broadcast_arrays(numpy.asarray(T, dtype=float), numpy.asarray(beta, dtype=float))
+        inside = (T >= self.Tmin) & (T <= self.Tmax)
+        # Equidistant grid: the cell index follows directly from T
+        x = (numpy.clip(T, self.Tmin, self.Tmax) - self.Tmin) / self.dT
+        i = numpy.minimum(x.astype(int), len(self.T) - 2)
+        w = x - i
+
+        def interp(table):
+            return table[i] + w * (table[i + 1] - table[i])
+
+        if material == "Air":
+            if numpy.any(beta != 0):
+                raise ValueError("Material 'Air' requires beta=0")
+            kappa = interp(self.kappaAir)
+        elif material == "exhaust":
+            high = T >= T_EXHAUST_SPLIT
+            cpAir = numpy.where(high, interp(self.cpAirHigh), interp(self.cpAirLow))
+            cpFuel = numpy.where(high, interp(self.cpFuelHigh), interp(self.cpFuelLow))
+            cp = 1 / (1 + beta) * (cpAir + beta * cpFuel)
+            kappa = cp / (cp - getRArray(material=material, beta=beta))
+        else:
+            raise ValueError("Unknown material '" + str(material) + "'")
+        if not numpy.all(inside):
+            kappa = numpy.where(inside, kappa, kappaStaticArray(T, material=material, beta=beta))
+        return kappa
+
+    ## kappa for total temperature Tt [K] and mach number Ma [-] (same definition as getKappa)
+    def kappa(self, Tt, Ma=0.0, material="Air", beta=0.0, tolerance=1e-12, maxIter=50):
+        Tt = float(Tt)
+        Ma = float(Ma)
+        kappa = 1.4
+        for i in range(maxIter):
+            T = Tt / (1 + (kappa - 1) / 2 * Ma ** 2)
+            kappa_new = self.kappaStatic(T, material=material, beta=beta)
+            if abs(kappa_new - kappa) < tolerance:
+                return kappa_new
+            kappa = kappa_new
+        return kappa
+
+    ## maximum interpolation error of the static kappa on the cell midpoints
+    def calcErrorBound(self):
+        Tm = self.T[:-1] + 0.5 * self.dT
+        bound = {"Air": float(numpy.max(numpy.abs(0.5 * (self.kappaAir[:-1] + self.kappaAir[1:]) - kappaAir(Tm))))}
+        error = 0.0
+        for beta in numpy.linspace(0.0, 0.1, 11):
+            for T in Tm[::7]:
+                error = max(error, abs(self.kappaStatic(T, "exhaust", beta) - kappaStatic(T, "exhaust", beta)))
+        bound["exhaust"] = error
+        return bound
+
+
+_kappaTable = None
+
+
+## return the process wide KappaTable (built on first use)
+def getKappaTable():
+    global _kappaTable
+    if _kappaTable is None:
+        _kappaTable = KappaTable()
+    return _kappaTable
+
+
+## methods used by isentrope and polytrope (and their array versions)
+#
+# "march": reference implementation, 10 pressure or temperature steps with kappa of the step start
+# "entropy": single inverse lookup in the entropy function phi(T) = int cp(T)/T dT (see EntropyTable)
+PROCESS_MODES = ("march", "entropy")
+
+_processMode = "march"
+
+
+## select the method used by isentrope and polytrope (see PROCESS_MODES)
+def setProcessMode(mode):
+    global _processMode
+    if mode not in PROCESS_MODES:
+        raise ValueError("Unknown process mode '" + str(mode) + "', use one of " + str(PROCESS_MODES))
+    _processMode = mode
+
+
+## return the method currently used by isentrope and polytrope
+def getProcessMode():
+    return _processMode
+
+
+# ===============================================================================
+# Memoization of the scalar gas property functions
+# ===============================================================================
+
+## bounded LRU cache of the results of getKappa, isentrope and polytrope
+#
+# The key is the function, the gas property and process modes and the arguments. With digits None the
+# arguments are used exactly (results identical to uncached calls). With digits = n the float arguments are
+# rounded to n significant digits and the function is evaluated at the rounded arguments, so neighbouring calls
+# share an entry (the results do not depend on the call order). Calls with array arguments are not cached.
+# The entries are guarded by a lock, so one cache can be used by several threads (the functions are evaluated
+# outside of the lock).
+# The memoization is off by default, it is switched on for a block with propertyCache or for the process with
+# setPropertyCache.
+# @param maxSize
+#	maximum number of entries, the least recently used ones are dropped (counted in evictions)
+class PropertyCache(object):
+    def __init__(self, maxSize=100000, digits=None):
+        self.maxSize = maxSize
+        self.digits = digits
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    ## call function with the arguments (rounded, see digits), the result is taken from the cache if possible
+    def call(self, function, args, kwargs):
+        if self.digits is not None:
+            args = tuple(self.quantize(value) for value in args)
+            kwargs = dict((name, self.quantize(value)) for name, value in kwargs.items())
+        key = (function.__name__, _gasPropertyMode, _processMode, args, tuple(sorted(kwargs.items())))
+        try:
+            with self.lock:
+                result = self.entries[key]
+                self.entries.move_to_end(key)
+                self.hits += 1
+            return result
+        except TypeError:  # Arrays
+            return function(*args, **kwargs)
+        except KeyError:
+            pass
+        result = function(*args, **kwargs)
+        with self.lock:
+            self.misses += 1
+            if key not in self.entries and len(self.entries) >= self.maxSize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self.entries[key] = result
+        return result
+
+    ## float value rounded to digits significant digits (other values unchanged)
+    def quantize(self, value):
+        if type(value) in (float, numpy.float64):
+            return float("%.*g" % (self.digits, value))
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    ## share of the calls answered from the cache
+    def getHitRate(self):
+        calls = self.hits + self.misses
+        return self.hits / float(calls) if calls else 0.0
+
+    ## counters as dictionary
+    def getStatistics(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.entries),
+                "hitRate": self.getHitRate()}
+
+
+# Memoization aus, bis propertyCache oder setPropertyCache einen Cache setzt
+_propertyCache = None
+
+
+## return the process wide PropertyCache (None: memoization switched off)
+def getPropertyCache():
+    return _propertyCache
+
+
+## replace the process wide PropertyCache (None switches the memoization off)
+def setPropertyCache(cache):
+    global _propertyCache
+    _propertyCache = cache
+
+
+## empty the process wide PropertyCache
+def clearPropertyCache():
+    if _propertyCache is not None:
+        _propertyCache.clear()
+
+
+## context manager: a fresh PropertyCache (or none with enabled False) for the block, the previous one is restored
+# afterwards, e.g.
+#	with propertyCache(digits=8) as cache:
+#	    engine.calcThermo()
+#	cache.getStatistics()
+@contextlib.contextmanager
+def propertyCache(maxSize=100000, digits=None, enabled=True):
+    previous = _propertyCache
+    cache = PropertyCache(maxSize, digits) if enabled else None
+    setPropertyCache(cache)
+    try:
+        yield cache
+    finally:
+        setPropertyCache(previous)
+
+
+## decorator memoizing a scalar gas property function in the process wide PropertyCache
+def memoizedProperty(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _propertyCache is None:
+            return function(*args, **kwargs)
+        return _propertyCache.call(function, args, kwargs)
+
+    return wrapper
+
+
 ## return specific heat coefficent kappa [-] for selectable fluid and conditions
 #
 # calculates kappa for a given total temperature, mach-number iteratively
+# The backend is selected with setGasPropertyMode ("fsolve" is the reference, "table" uses KappaTable).
 # @param Tt
 #	total temperature [K]
 # @param Ma
@@ -80,47 +425,20 @@ def getR(material="Air", beta=0.0):
 #	identifier for the fluid under consideration (currently only "Air" and "exhaust" are supported)
 # @param beta
 #	?
+@memoizedProperty
 def getKappa(Tt=288.15, Ma=0.0, material="Air", beta=0.0):
+    if _gasPropertyMode == "table":
+        return getKappaTable().kappa(Tt, Ma, material=material, beta=beta)
+
     # Funktion für die Korrelation zwischen kappa und T (Druck Standardatmosphaere)
     if material == "Air" and beta == 0:
         def kappa_fun(T):
-            # Koeffizienten für kappa
-            a = 2.764495554e-020
-            b = -1.588301666e-016
-            c = 2.93836602 * 0.0000000000001
-            d = -1.177356679 * 0.0000000001
-            e = -1.667416736 * 0.0000001
-            f = 5.973962506 * 0.00001
-            g = 1.398176676 * 1
-            return a * T ** 6 + b * T ** 5 + c * T ** 4 + d * T ** 3 + e * T ** 2 + f * T ** 1 + g * T ** 0
+            return kappaAir(T)
 
     if material == "exhaust":
         def kappa_fun(T):
             R = getR(material=material, beta=beta)
-            if T >= 1000:
-                a = 863.29014498
-                b = 405.39409798e-3
-                c = -153.82359960e-6
-                d = 27.94176815e-9
-                e = -1.92639216e-12
-                f = 1000.10332581
-                g = 2994.47427116e-3
-                h = -1076.165307870e-6
-                i = 175.24619645e-9
-                j = -10.62294583e-12
-            elif T < 1000:
-                a = 1057.99590453
-                b = -449.19800335e-3
-                c = 1109.19492375e-6
-                d = -717.44852819e-9
-                e = 140.33180754e-12
-                f = 443.41673618
-                g = 7367.21480416e-3
-                h = -10617.04784788e-6
-                i = 8418.76668056e-9
-                j = -2529.31551918e-12
-            cp = 1 / (1 + beta) * (a + b * T + c * T ** 2 + d * T ** 3 + e * T ** 4 + beta * (
-                f + g * T + h * T ** 2 + i * T ** 3 + j * T ** 4))
+            cp = cpExhaust(T, beta)
             return cp / (cp - R)
 
     # Funktion für fsolve
@@ -157,7 +475,10 @@ def getKappa(Tt=288.15, Ma=0.0, material="Air", beta=0.0):
 #	identifier for the fluid under consideration (currently only "Air" and "exhaust" are supported)
 # @param beta
 #	?
+@memoizedProperty
 def isentrope(T1=None, T2=None, p1=None, p2=None, Ma=0.0, material="Air", beta=0.0):
+    if _processMode == "entropy":
+        return float(entropyProcess(T1=T1, T2=T2, p1=p1, p2=p2, Ma=Ma, material=material, beta=beta))
     if p2 != None and T2 == None:
         pi_alt = p1
         T = T1
@@ -202,7 +523,11 @@ def isentrope(T1=None, T2=None, p1=None, p2=None, Ma=0.0, material="Air", beta=0
 #	identifier for the fluid under consideration (currently only "Air" and "exhaust" are supported)
 # @param beta
 #	?	
+@memoizedProperty
 def polytrope(eta_pol=None, T1=None, T2=None, p1=None, p2=None, Ma=0.0, material="Air", beta=0.0):
+    if _processMode == "entropy":
+        return float(entropyProcess(eta_pol=eta_pol, T1=T1, T2=T2, p1=p1, p2=p2, Ma=Ma, material=material,
+                                    beta=beta))
     R = getR(material=material, beta=beta)
 
     if p2 != None and T2 == None:
@@ -242,6 +567,359 @@ def polytrope(eta_pol=None, T1=None, T2=None, p1=None, p2=None, Ma=0.0, material
         # r=1.007588401*1000
         # return l*T**6+m*T**5+n*T**4+o*T**3+p*T**2+q*T**1+r*T**0
 
+# ===============================================================================
+# Entropy function tables
+# ===============================================================================
+
+## entropy function phi(T) = int cp(T) / T dT [J/(kgK)] of one gas on an equidistant temperature grid
+#
+# cp is taken from kappa(T, Ma) exactly as the marching isentrope/polytrope do (T treated as the
+# temperature passed to getKappa, corrected with Ma). Integration uses the trapezoidal rule, the
+# inverse phi -> T is a linear interpolation. Outside of [Tmin, Tmax] cp is frozen at the border value.
+# For the default grid the end temperature is exact to about 1e-4 K.
+class EntropyTable(object):
+    def __init__(self, material="Air", beta=0.0, Ma=0.0, Tmin=150.0, Tmax=3000.0, dT=0.5):
+        self.material = material
+        self.beta = beta
+        self.Ma = Ma
+        self.R = getR(material=material, beta=beta)
+        self.Tmin = Tmin
+        self.Tmax = Tmax
+        self.dT = dT
+        n = int(round((Tmax - Tmin) / dT)) + 1
+        self.T = Tmin + dT * numpy.arange(n)
+
+        kappa = getKappaArray(self.T, Ma, material=material, beta=beta)
+        self.cp = kappa * self.R / (kappa - 1.0)
+        f = self.cp / self.T
+        self.phi = numpy.concatenate(([0.0], numpy.cumsum(0.5 * (f[1:] + f[:-1]) * dT)))
+
+    ## phi(T) for scalars or arrays of T [K]
+    def phiOf(self, T):
+        T = numpy.asarray(T, dtype=float)
+        x = (numpy.clip(T, self.Tmin, self.Tmax) - self.Tmin) / self.dT
+        i = numpy.minimum(x.astype(int), len(self.T) - 2)
+        w = x - i
+        phi = self.phi[i] + w * (self.phi[i + 1] - self.phi[i])
+        # frozen cp outside of the table
+        phi = numpy.where(T < self.Tmin, self.phi[0] + self.cp[0] * numpy.log(T / self.Tmin), phi)
+        phi = numpy.where(T > self.Tmax, self.phi[-1] + self.cp[-1] * numpy.log(T / self.Tmax), phi)
+        return phi
+
+    ## inverse of phiOf
+    def temperatureOf(self, phi):
+        phi = numpy.asarray(phi, dtype=float)
+        T = numpy.interp(phi, self.phi, self.T)
+        T = numpy.where(phi < self.phi[0], self.Tmin * numpy.exp((phi - self.phi[0]) / self.cp[0]), T)
+        T = numpy.where(phi > self.phi[-1], self.Tmax * numpy.exp((phi - self.phi[-1]) / self.cp[-1]), T)
+        return T
+
+
+## maximum number of EntropyTables kept by getEntropyTable
+ENTROPY_TABLE_CACHE_SIZE = 64
+
+_entropyTables = collections.OrderedDict()
+
+
+## return the cached EntropyTable for a gas (least recently used tables are dropped)
+def getEntropyTable(material="Air", beta=0.0, Ma=0.0):
+    key = (material, float(beta), float(Ma), _gasPropertyMode)
+    table = _entropyTables.pop(key, None)
+    if table is None:
+        table = EntropyTable(material=material, beta=float(beta), Ma=float(Ma))
+        if len(_entropyTables) >= ENTROPY_TABLE_CACHE_SIZE:
+            _entropyTables.popitem(last=False)
+    _entropyTables[key] = table
+    return table
+
+
+## end state of an isentropic (eta_pol=None) or polytropic process from the entropy function
+#
+# Along the process cp dT / T = R / eta dp / p (compression) or R * eta dp / p (expansion), so
+# phi(T2) - phi(T1) = R / eta * ln(p2 / p1) resp. R * eta * ln(p2 / p1). Either T2 or p2 has to be given,
+# the missing one is returned. Accepts scalars or arrays, points are grouped by their (beta, Ma) gas.
+def entropyProcess(eta_pol=None, T1=None, T2=None, p1=None, p2=None, Ma=0.0, material="Air", beta=0.0):
+    if eta_pol is None:
+        eta_pol = 1.0
+    givenP2 = p2 is not None and T2 is None
+    if not givenP2 and (p2 is not None or T2 is None):
+        raise ValueError("Either T2 or p2 has to be given")
+    end = p2 if givenP2 else T2
+    eta_pol, T1, p1, end, Ma, beta = numpy.broadcast_arrays(
+        *[numpy.asarray(x, dtype=float) for x in (eta_pol, T1, p1, end, Ma, beta)])
+    result = numpy.empty(T1.shape)
+
+    gases = numpy.unique(numpy.stack((beta.ravel(), Ma.ravel()), axis=1), axis=0)
+    for gasBeta, gasMa in gases:
+        mask = (beta == gasBeta) & (Ma == gasMa)
+        table = getEntropyTable(material=material, beta=gasBeta, Ma=gasMa)
+        phi1 = table.phiOf(T1[mask])
+        if givenP2:
+            ratio = end[mask] / p1[mask]
+            eta = numpy.where(ratio < 1.0, 1.0 / eta_pol[mask], eta_pol[mask])
+            result[mask] = table.temperatureOf(phi1 + table.R / eta * numpy.log(ratio))
+        else:
+            T2m = end[mask]
+            eta = numpy.where(T2m < T1[mask], 1.0 / eta_pol[mask], eta_pol[mask])
+            result[mask] = p1[mask] * numpy.exp(eta * (table.phiOf(T2m) - phi1) / table.R)
+    return result
+
+
+# ===============================================================================
+# Array versions of the gas property functions
+#
+# All functions below accept scalars or numpy arrays (broadcast against each other) and
+# return numpy arrays. They evaluate all points in one vectorized pass and give the same
+# results as their scalar counterparts.
+# ===============================================================================
+
+## specific gas constant [J/kgK] for arrays of beta (see getR)
+def getRArray(material="Air", beta=0.0):
+    beta = numpy.asarray(beta, dtype=float)
+    if material == "Air":
+        return numpy.full(beta.shape, 287.15)
+    if material == "exhaust":
+        return numpy.where(beta == 0.0, 287.15, 8314.472 * (0.034524 + beta * 0.035645) / (1 + beta))
+    raise ValueError("Unknown material '" + str(material) + "'")
+
+
+## static kappa [-] for arrays of static temperatures T [K] and beta (exact correlations, see kappaStatic)
+#
+# The exhaust branches (T >= 1000 K and T < 1000 K) are selected with masks.
+def kappaStaticArray(T, material="Air", beta=0.0):
+    T, beta = numpy.broadcast_arrays(numpy.asarray(T, dtype=float), numpy.asarray(beta, dtype=float))
+    if material == "Air":
+        if numpy.any(beta != 0):
+            raise ValueError("Material 'Air' requires beta=0")
+        return kappaAir(T)
+    if material == "exhaust":
+        high = T >= T_EXHAUST_SPLIT
+        cpAir = numpy.where(high, cpPolynomial(CP_EXHAUST_HIGH[0], T), cpPolynomial(CP_EXHAUST_LOW[0], T))
+        cpFuel = numpy.where(high, cpPolynomial(CP_EXHAUST_HIGH[1], T), cpPolynomial(CP_EXHAUST_LOW[1], T))
+        cp = 1 / (1 + beta) * (cpAir + beta * cpFuel)
+        return cp / (cp - getRArray(material=material, beta=beta))
+    raise ValueError("Unknown material '" + str(material) + "'")
+
+
+## derivative d(cp)/dT of one part of the exhaust cp polynomials
+def cpPolynomialDerivative(coeffs, T):
+    a, b, c, d, e = coeffs
+    return b + 2 * c * T + 3 * d * T ** 2 + 4 * e * T ** 3
+
+
+## exhaust gas cp [J/(kgK)] and its partial derivatives d(cp)/dT and d(cp)/d(beta) for arrays of T [K] and beta
+#
+# returns the tuple (cp, dcp_dT, dcp_dbeta), used by Newton solvers that need analytic derivatives
+def cpExhaustArray(T, beta=0.0):
+    T, beta = numpy.broadcast_arrays(numpy.asarray(T, dtype=float), numpy.asarray(beta, dtype=float))
+    high = T >= T_EXHAUST_SPLIT
+    cpAir = numpy.where(high, cpPolynomial(CP_EXHAUST_HIGH[0], T), cpPolynomial(CP_EXHAUST_LOW[0], T))
+    cpFuel = numpy.where(high, cpPolynomial(CP_EXHAUST_HIGH[1], T), cpPolynomial(CP_EXHAUST_LOW[1], T))
+    dcpAir = numpy.where(high, cpPolynomialDerivative(CP_EXHAUST_HIGH[0], T),
+                         cpPolynomialDerivative(CP_EXHAUST_LOW[0], T))
+    dcpFuel = numpy.where(high, cpPolynomialDerivative(CP_EXHAUST_HIGH[1], T),
+                          cpPolynomialDerivative(CP_EXHAUST_LOW[1], T))
+    cp = (cpAir + beta * cpFuel) / (1 + beta)
+    dcp_dT = (dcpAir + beta * dcpFuel) / (1 + beta)
+    dcp_dbeta = (cpFuel - cpAir) / (1 + beta) ** 2
+    return cp, dcp_dT, dcp_dbeta
+
+
+## kappa [-] for arrays of total temperature Tt [K], mach number Ma [-] and beta (see getKappa)
+#
+# Solves kappa = kappa_static(Tt / (1 + (kappa - 1) / 2 * Ma^2)) by fixed point iteration for all
+# points at once, points that have converged are not updated anymore. In "table" mode the static
+# kappa is interpolated in the KappaTable, otherwise the exact correlations are used. kappa0 is an optional
+# start value (e.g. the kappa of a neighbouring state), the iteration starts at 1.4 otherwise.
+def getKappaArray(Tt=288.15, Ma=0.0, material="Air", beta=0.0, tolerance=1e-12, maxIter=50, kappa0=None):
+    Tt, Ma, beta = numpy.broadcast_arrays(numpy.asarray(Tt, dtype=float), numpy.asarray(Ma, dtype=float),
+                                          numpy.asarray(beta, dtype=float))
+    if _gasPropertyMode == "table":
+        kappa_fun = getKappaTable().kappaStaticArray
+    else:
+        kappa_fun = kappaStaticArray
+
+    if kappa0 is None:
+        kappa = numpy.full(Tt.shape, 1.4)
+    else:
+        kappa = numpy.array(numpy.broadcast_to(kappa0, Tt.shape), dtype=float)
+    active = numpy.ones(Tt.shape, dtype=bool)
+    for i in range(maxIter):
+        T = Tt[active] / (1 + (kappa[active] - 1) / 2 * Ma[active] ** 2)
+        kappa_new = kappa_fun(T, material=material, beta=beta[active])
+        done = ~(numpy.abs(kappa_new - kappa[active]) >= tolerance)
+        kappa[active] = kappa_new
+        active[active] = ~done
+        if not numpy.any(active):
+            break
+    return kappa
+
+
+## end state of an isentropic process for arrays of states (see isentrope)
+#
+# Either T2 or p2 has to be given, the 10 step march of isentrope is carried out for all points at once.
+def isentropeArray(T1=None, T2=None, p1=None, p2=None, Ma=0.0, material="Air", beta=0.0):
+    if _processMode == "entropy":
+        return entropyProcess(T1=T1, T2=T2, p1=p1, p2=p2, Ma=Ma, material=material, beta=beta)
+    if p2 is not None and T2 is None:
+        T1, p1, p2 = numpy.broadcast_arrays(*[numpy.asarray(x, dtype=float) for x in (T1, p1, p2)])
+        kappa = None
+        pi_alt = p1
+        T = T1
+        for pi in numpy.linspace(p1, p2, 10):
+            kappa = getKappaArray(T, Ma, material=material, beta=beta, kappa0=kappa)
+            T = T * (pi / pi_alt) ** ((kappa - 1.0) / kappa)
+            pi_alt = pi
+        return T
+    if p2 is None and T2 is not None:
+        T1, T2, p1 = numpy.broadcast_arrays(*[numpy.asarray(x, dtype=float) for x in (T1, T2, p1)])
+        kappa = None
+        Ti_alt = T1
+        p = p1
+        for Ti in numpy.linspace(T1, T2, 10):
+            kappa = getKappaArray(Ti, Ma, material=material, beta=beta, kappa0=kappa)
+            p = p * (Ti / Ti_alt) ** (kappa / (kappa - 1))
+            Ti_alt = Ti
+        return p
+
+
+## end state of a polytropic process for arrays of states and efficiencies (see polytrope)
+#
+# Either T2 or p2 has to be given. Expansion points (p2 < p1 or T2 < T1) are detected per point.
+def polytropeArray(eta_pol=None, T1=None, T2=None, p1=None, p2=None, Ma=0.0, material="Air", beta=0.0):
+    if _processMode == "entropy":
+        return entropyProcess(eta_pol=eta_pol, T1=T1, T2=T2, p1=p1, p2=p2, Ma=Ma, material=material, beta=beta)
+    if p2 is not None and T2 is None:
+        eta_pol, T1, p1, p2 = numpy.broadcast_arrays(*[numpy.asarray(x, dtype=float) for x in (eta_pol, T1, p1, p2)])
+        eta_pol = numpy.where(p2 < p1, 1.0 / eta_pol, eta_pol)
+        kappa = None
+        pi_alt = p1
+        T = T1
+        for pi in numpy.linspace(p1, p2, 10):
+            kappa = getKappaArray(T, Ma, material=material, beta=beta, kappa0=kappa)
+            T = T * (pi / pi_alt) ** ((kappa - 1.0) / kappa / eta_pol)
+            pi_alt = pi
+        return T
+    if p2 is None and T2 is not None:
+        eta_pol, T1, T2, p1 = numpy.broadcast_arrays(*[numpy.asarray(x, dtype=float) for x in (eta_pol, T1, T2, p1)])
+        eta_pol = numpy.where(T2 < T1, 1.0 / eta_pol, eta_pol)
+        kappa = None
+        p = p1
+        T_alt = T1
+        for Ti in numpy.linspace(T1, T2, 10):
+            kappa = getKappaArray(T_alt, Ma, material=material, beta=beta, kappa0=kappa)
+            p = p * (Ti / T_alt) ** (kappa * eta_pol / (kappa - 1.0))
+            T_alt = Ti
+        return p
+
+
+# ===============================================================================
+# Compressible mass flow function
+# ===============================================================================
+
+## mass flow function Q = mflow * sqrt(R * T_t) / (p_t * A) [-] for Mach number Ma and kappa (scalars or arrays)
+def flowFunction(Ma, kappa):
+    Ma = numpy.asarray(Ma, dtype=float)
+    kappa = numpy.asarray(kappa, dtype=float)
+    return numpy.sqrt(kappa) * Ma * (1.0 + (kappa - 1.0) / 2.0 * Ma ** 2) ** (-0.5 * (kappa + 1.0) / (kappa - 1.0))
+
+
+## maximum (critical, Ma = 1) value of the mass flow function for kappa
+def flowFunctionMax(kappa):
+    return flowFunction(1.0, kappa)
+
+
+## inverse of the mass flow function, tabulated for a start value
+#
+# The table is built over kappa and s = sqrt(1 - Q / Q*) (equidistant in both), which removes the square root
+# behaviour of Ma(Q) at the critical point. Subsonic and supersonic branch are stored separately, the
+# supersonic branch reaches up to Ma = MaMax.
+class FlowFunctionTable(object):
+    def __init__(self, kappaMin=1.1, kappaMax=1.7, dKappa=0.01, nS=401, MaMax=10.0):
+        self.kappaMin = kappaMin
+        self.dKappa = dKappa
+        self.kappa = kappaMin + dKappa * numpy.arange(int(round((kappaMax - kappaMin) / dKappa)) + 1)
+        self.nS = nS
+        s = numpy.linspace(0.0, 1.0, nS)
+
+        MaSub = numpy.linspace(0.0, 1.0, 20001)
+        MaSup = numpy.concatenate((numpy.linspace(1.0, 3.0, 20001), numpy.linspace(3.0, MaMax, 20001)[1:]))
+        self.MaSub = numpy.empty((len(self.kappa), nS))
+        self.MaSup = numpy.empty((len(self.kappa), nS))
+        for i, kappa in enumerate(self.kappa):
+            Qmax = flowFunctionMax(kappa)
+            sSub = numpy.sqrt(numpy.maximum(1.0 - flowFunction(MaSub, kappa) / Qmax, 0.0))
+            sSup = numpy.sqrt(numpy.maximum(1.0 - flowFunction(MaSup, kappa) / Qmax, 0.0))
+            # s decreases along the subsonic and increases along the supersonic branch
+            self.MaSub[i] = numpy.interp(s, sSub[::-1], MaSub[::-1])
+            self.MaSup[i] = numpy.interp(s, sSup, MaSup)
+
+    ## start value of the Mach number for flow function values Q and kappa (arrays)
+    def lookup(self, Q, kappa, supersonic=False):
+        table = self.MaSup if supersonic else self.MaSub
+        x = numpy.clip((kappa - self.kappaMin) / self.dKappa, 0.0, len(self.kappa) - 1.0)
+        i = numpy.minimum(x.astype(int), len(self.kappa) - 2)
+        wk = x - i
+        y = numpy.sqrt(numpy.clip(1.0 - Q / flowFunctionMax(kappa), 0.0, 1.0)) * (self.nS - 1)
+        j = numpy.minimum(y.astype(int), self.nS - 2)
+        ws = y - j
+        return (1 - wk) * ((1 - ws) * table[i, j] + ws * table[i, j + 1]) + \
+            wk * ((1 - ws) * table[i + 1, j] + ws * table[i + 1, j + 1])
+
+
+_flowFunctionTable = None
+
+
+## return the process wide FlowFunctionTable (built on first use)
+def getFlowFunctionTable():
+    global _flowFunctionTable
+    if _flowFunctionTable is None:
+        _flowFunctionTable = FlowFunctionTable()
+    return _flowFunctionTable
+
+
+## Mach number [-] for given values of the mass flow function Q [-] and kappa [-] (scalars or arrays)
+#
+# Start value from the FlowFunctionTable, then newtonSteps Newton steps on Q(Ma) - Q = 0 on the selected
+# branch. Points with Q above the critical value Q* have no solution (choked flow) and return nan.
+# @param supersonic
+#	False: subsonic branch (Ma <= 1), True: supersonic branch (Ma >= 1)
+def machFromFlowFunction(Q, kappa, supersonic=False, newtonSteps=3):
+    if numpy.ndim(Q) == 0 and numpy.ndim(kappa) == 0:
+        return _machFromFlowFunctionScalar(float(Q), float(kappa), supersonic, newtonSteps)
+    Q, kappa = numpy.broadcast_arrays(numpy.asarray(Q, dtype=float), numpy.asarray(kappa, dtype=float))
+    Ma = getFlowFunctionTable().lookup(Q, kappa, supersonic=supersonic)
+    for i in range(newtonSteps):
+        Qi = flowFunction(Ma, kappa)
+        # no step at the critical point (dQ/dMa = 0) and at Ma = 0
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            dQ = Qi * (1.0 - Ma ** 2) / (Ma * (1.0 + (kappa - 1.0) / 2.0 * Ma ** 2))
+            step = numpy.where(numpy.abs(dQ) > 1e-12, (Qi - Q) / dQ, 0.0)
+        Ma = Ma - step
+        if supersonic:
+            Ma = numpy.maximum(Ma, 1.0)
+        else:
+            Ma = numpy.clip(Ma, 0.0, 1.0)
+    return numpy.where((Q > flowFunctionMax(kappa)) | (Q < 0.0), numpy.nan, Ma)
+
+
+## single point version of machFromFlowFunction on python floats
+def _machFromFlowFunctionScalar(Q, kappa, supersonic, newtonSteps):
+    exponent = -0.5 * (kappa + 1.0) / (kappa - 1.0)
+    Qmax = math.sqrt(kappa) * ((kappa + 1.0) / 2.0) ** exponent
+    if Q > Qmax or Q < 0.0:
+        return float("nan")
+    Ma = float(getFlowFunctionTable().lookup(Q, kappa, supersonic=supersonic))
+    for i in range(newtonSteps):
+        f = 1.0 + (kappa - 1.0) / 2.0 * Ma ** 2
+        Qi = math.sqrt(kappa) * Ma * f ** exponent
+        dQ = Qi * (1.0 - Ma ** 2) / (Ma * f) if Ma > 0.0 else 0.0
+        if abs(dQ) > 1e-12:
+            Ma -= (Qi - Q) / dQ
+        Ma = max(Ma, 1.0) if supersonic else min(max(Ma, 0.0), 1.0)
+    return Ma
+
+
 # print getKappa(Tt=1100,Ma=0.4)
 
 # print getKappa(Tt=1100,Ma=10,material="exhaust",beta=0.034)
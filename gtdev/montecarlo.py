@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# montecarlo.py
+# Monte Carlo propagation of uncertain inputs (efficiencies, pressure losses) through the engine models.
+# Samples are drawn and evaluated batch by batch, only running statistics are kept.
+#
+# Example:
+#	distributions = {"hpc.eta_pol": Distribution("normal", 0.75, 0.01),
+#	                 "combc.Pi_Combc_fr": Distribution("uniform", 0.93, 0.97)}
+#	stats = runMonteCarlo(turbojet.Turbojet, distributions, ["SFC", "hpt.T_t3"], samples=10 ** 6,
+#	                      baseInputs=tj70Inputs, sampling="lhs")
+#	stats["SFC"].mean, stats["SFC"].getPercentile(95.)
+# imports:
+import numpy
+from scipy import stats
+
+from gtdev import sweep
+
+## sampling methods of runMonteCarlo
+SAMPLING_METHODS = ("random", "lhs")
+
+
+## distribution of an uncertain input
+#
+# "normal": (mean, standard deviation), "uniform": (lower, upper), "triangular": (lower, mode, upper)
+class Distribution(object):
+    def __init__(self, kind, *args):
+        if kind == "normal":
+            self.dist = stats.norm(loc=args[0], scale=args[1])
+        elif kind == "uniform":
+            self.dist = stats.uniform(loc=args[0], scale=args[1] - args[0])
+        elif kind == "triangular":
+            self.dist = stats.triang((args[1] - args[0]) / float(args[2] - args[0]), loc=args[0],
+                                     scale=args[2] - args[0])
+        else:
+            raise ValueError("Unknown distribution '" + str(kind) + "', use normal, uniform or triangular")
+        self.kind = kind
+        self.args = args
+
+    ## values for probabilities u (inverse cumulative distribution function)
+    def ppf(self, u):
+        return self.dist.ppf(u)
+
+
+## running statistics of a stream of values in constant memory
+#
+# Mean, variance, minimum and maximum are exact (Welford's algorithm, combined batch by batch), percentiles
+# are estimated from a uniform random sample of at most reservoirSize values (reservoir sampling).
+class RunningStatistics(object):
+    def __init__(self, reservoirSize=100000, seed=None):
+        self.count = 0
+        self.invalid = 0
+        self.mean = numpy.nan
+        self.m2 = 0.0
+        self.min = numpy.nan
+        self.max = numpy.nan
+        self.reservoir = numpy.empty(reservoirSize)
+        self.rng = numpy.random.default_rng(seed)
+
+    ## add a batch of values (nan values are counted as invalid)
+    def update(self, values):
+        values = numpy.asarray(values, dtype=float).ravel()
+        valid = numpy.isfinite(values)
+        self.invalid += int(numpy.sum(~valid))
+        values = values[valid]
+        n = len(values)
+        if n == 0:
+            return
+
+        # Mittelwert und Varianz (paarweise Kombination nach Chan et al.)
+        mean = float(numpy.mean(values))
+        m2 = float(numpy.sum((values - mean) ** 2))
+        if self.count == 0:
+            self.mean, self.m2 = mean, m2
+            self.min, self.max = float(numpy.min(values)), float(numpy.max(values))
+        else:
+            total = self.count + n
+            delta = mean - self.mean
+            self.mean += delta * n / total
+            self.m2 += m2 + delta ** 2 * self.count * n / total
+            self.min = min(self.min, float(numpy.min(values)))
+            self.max = max(self.max, float(numpy.max(values)))
+
+        # Reservoir: erst auffuellen, danach ersetzt der i-te Wert mit Wahrscheinlichkeit k / (i + 1)
+        k = len(self.reservoir)
+        fill = max(0, min(n, k - self.count))
+        self.reservoir[self.count:self.count + fill] = values[:fill]
+        if fill < n:
+            index = numpy.arange(self.count + fill, self.count + n)
+            slots = (self.rng.random(len(index)) * (index + 1)).astype(int)
+            replace = slots < k
+            self.reservoir[slots[replace]] = values[fill:][replace]
+        self.count += n
+
+    ## sample variance
+    def getVariance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else numpy.nan
+
+    def getStd(self):
+        return numpy.sqrt(self.getVariance())
+
+    ## estimated percentile(s) q [0 ... 100]
+    def getPercentile(self, q):
+        if self.count == 0:
+            return numpy.nan * numpy.asarray(q, dtype=float)
+        return numpy.percentile(self.reservoir[:min(self.count, len(self.reservoir))], q)
+
+
+## probabilities for n samples of d inputs, "random" or "lhs" (Latin hypercube: every input has exactly one
+# sample in each of the n equal probability strata)
+def sampleUnitCube(n, d, sampling="random", rng=None):
+    if rng is None:
+        rng = numpy.random.default_rng()
+    if sampling == "random":
+        return rng.random((n, d))
+    if sampling == "lhs":
+        u = (numpy.arange(n)[:, None] + rng.random((n, d))) / n
+        for j in range(d):
+            u[:, j] = u[rng.permutation(n), j]
+        return u
+    raise ValueError("Unknown sampling '" + str(sampling) + "', use one of " + str(SAMPLING_METHODS))
+
+
+## propagate uncertain inputs through an engine model
+#
+# The samples are drawn and evaluated in batches of batchSize. Engines with a batch mode (calcThermoBatch,
+# e.g. turbojet.Turbojet) evaluate a batch vectorized in this process, the others evaluate it on the sweep process
+# pool (one engine object per sample). Only the running statistics of the outputs are kept. With "lhs" every
+# batch is a Latin hypercube of its own.
+# @param distributions
+#	dictionary {dotted input path: Distribution}
+# @param outputs
+#	dotted output paths, e.g. ["F", "SFC", "hpt.T_t3"]
+# @param batch
+#	None: use calcThermoBatch if the engine has one, False: always use the process pool
+# @return dictionary {output path: RunningStatistics}, failed samples are counted in RunningStatistics.invalid
+def runMonteCarlo(engine, distributions, outputs, samples=100000, batchSize=10000, baseInputs=None,
+                  sampling="random", seed=None, processes=None, batch=None, reservoirSize=100000):
+    rng = numpy.random.default_rng(seed)
+    paths = sorted(distributions)
+    statistics = dict((path, RunningStatistics(reservoirSize, rng.integers(2 ** 31))) for path in outputs)
+
+    obj = sweep.buildEngine(engine, {}, baseInputs)
+    if batch is None:
+        batch = hasattr(obj, "calcThermoBatch")
+
+    done = 0
+    while done < samples:
+        n = min(batchSize, samples - done)
+        u = sampleUnitCube(n, len(paths), sampling, rng)
+        values = dict((path, distributions[path].ppf(u[:, j])) for j, path in enumerate(paths))
+        if batch:
+            results = obj.calcThermoBatch(**values)
+            for path in outputs:
+                statistics[path].update(results[path])
+        else:
+            cases = [dict((path, float(values[path][i])) for path in paths) for i in range(n)]
+            table = sweep.runSweep(engine, cases, outputs=outputs, baseInputs=baseInputs, processes=processes)
+            for path in outputs:
+                statistics[path].update(numpy.where(table["success"], table[path], numpy.nan))
+        done += n
+    return statistics
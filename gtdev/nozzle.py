@@ -14,6 +14,7 @@
 import numpy
 from gtdev.abstract import *
 from gtdev.helper_methods import *
+from gtdev.resultCache import cachedCalculation
 
 
 # ===============================================================================
@@ -53,10 +54,14 @@ class Nozzle(AbstractTurbo):
         self.initialize(self.aeroInputParams)
         self.initialize(self.aeroOutputParams)
 
+        # Parameters proportional to the mass flow
+        self.massflowParams = ["mflow"]
+
         # Default Values
         self.kappa = 1.3
         self.beta = 0.0
 
+    @cachedCalculation("thermo")
     def calcThermo(self):
         self.check(self.thermoInputParams)
 
@@ -69,6 +74,7 @@ class Nozzle(AbstractTurbo):
 
         self.check(self.thermoOutputParams)
 
+    @cachedCalculation("aero")
     def calcAero(self):
         self.check(self.aeroInputParams)
 
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# optimization.py
+# Gradient based cycle optimization (scipy SLSQP) of the engine models over their thermodynamic inputs.
+#
+# Example (minimum SFC of the TJ-70 at its fixed thrust):
+#	opt = CycleOptimizer(turbojet.Turbojet, baseInputs=tj70Inputs, processes=4)
+#	opt.addDesignVariable("hpc.Pi", 2.5, 6.0)
+#	opt.addDesignVariable("combc.T_t3", 900., 1200.)
+#	opt.setObjective("SFC")
+#	opt.addConstraint("hpt.T_t3", upper=900.)
+#	result = opt.optimize()
+# imports:
+import numpy
+from scipy import optimize
+
+from gtdev import helper_methods, sweep
+
+
+## result of CycleOptimizer.optimize
+#
+# x: {design variable path: value}, objective: objective value, outputs: {output path: value} at x,
+# evaluations: cycle calculations, cacheHits: requested points found in the cache. If SLSQP is aborted by a failed
+# cycle calculation, success is False and x is the last completed iterate (None, objective nan and no outputs if
+# the first iteration failed).
+class OptimizationResult(object):
+    def __init__(self, x, objective, outputs, success, message, iterations, evaluations, cacheHits):
+        self.x = x
+        self.objective = objective
+        self.outputs = outputs
+        self.success = success
+        self.message = message
+        self.iterations = iterations
+        self.evaluations = evaluations
+        self.cacheHits = cacheHits
+
+
+# ===============================================================================
+# Optimierung eines Kreisprozesses
+# ===============================================================================
+class CycleOptimizer(object):
+    ## @param engine
+    #	AbstractTurbo subclass or picklable callable returning a configured engine (see sweep.runSweep)
+    # @param baseInputs
+    #	dictionary {dotted input path: value} of the fixed inputs (e.g. "thrust")
+    # @param processes
+    #	worker processes for the gradient evaluations (1: no pool)
+    # @param relativeStep
+    #	central difference step relative to the range of the design variable (one-sided at the bounds)
+    def __init__(self, engine, baseInputs=None, processes=None, relativeStep=1e-5, method="calcThermo"):
+        self.engine = engine
+        self.baseInputs = dict(baseInputs or {})
+        self.processes = processes
+        self.relativeStep = relativeStep
+        self.method = method
+
+        self.designVariables = []  # [path, lower, upper]
+        self.objective = None  # [path, sign]
+        self.constraints = []  # [path, lower, upper]
+
+        # ausgewertete Punkte {tuple of design variable values: (success, output values)}
+        self.cache = {}
+        self.evaluations = 0
+        self.cacheHits = 0
+
+        design = sweep.buildEngine(engine, {}, self.baseInputs)
+        self.inputPaths = design.getThermoInputPaths()
+        self.outputPaths = design.getThermoOutputPaths()
+
+    ## add a bounded design variable, path has to be a thermodynamic input (thermoInputParams)
+    def addDesignVariable(self, path, lower, upper):
+        if path not in self.inputPaths:
+            raise Exception("'" + path + "' is no thermodynamic input, use one of " + str(self.inputPaths))
+        if not lower < upper:
+            raise Exception("Lower bound of '" + path + "' has to be smaller than the upper bound")
+        self.designVariables.append([path, float(lower), float(upper)])
+        self.cache = {}
+
+    ## set the objective, path has to be a thermodynamic output (thermoOutputParams)
+    def setObjective(self, path, minimize=True):
+        self._checkOutput(path)
+        self.objective = [path, 1.0 if minimize else -1.0]
+
+    ## add the constraint lower <= output <= upper (either bound may be None)
+    def addConstraint(self, path, lower=None, upper=None):
+        self._checkOutput(path)
+        if lower is None and upper is None:
+            raise Exception("Constraint on '" + path + "' needs a lower or an upper bound")
+        self.constraints.append([path, lower, upper])
+
+    ## outputs of the cycle at the design variable values x (cached)
+    #
+    # @return (success, {output path: value})
+    def evaluate(self, x):
+        key = tuple(float(value) for value in x)
+        if key in self.cache:
+            self.cacheHits += 1
+        else:
+            self.evaluations += 1
+            self.cache[key] = sweep.evaluateCase(self.engine, self._case(key), self.outputPaths, self.baseInputs,
+                                                 self.method)
+        success, values = self.cache[key]
+        return success, dict(zip(self.outputPaths, values))
+
+    ## evaluate all points missing in the cache on the process pool
+    def evaluateMany(self, points):
+        keys = [tuple(float(value) for value in x) for x in points]
+        missing = sorted(set(key for key in keys if key not in self.cache))
+        self.cacheHits += len(keys) - len(missing)
+        if missing:
+            self.evaluations += len(missing)
+            table = sweep.runSweep(self.engine, [self._case(key) for key in missing], outputs=self.outputPaths,
+                                   baseInputs=self.baseInputs, processes=self.processes, method=self.method)
+            for i, key in enumerate(missing):
+                self.cache[key] = (bool(table["success"][i]), [float(table[path][i]) for path in self.outputPaths])
+
+    ## run SLSQP from x0 (dictionary {path: value}, default: the middle of the bounds)
+    def optimize(self, x0=None, tolerance=1e-8, maxIter=100):
+        if not self.designVariables:
+            raise Exception("No design variables defined")
+        if self.objective is None:
+            raise Exception("No objective defined")
+        lower = numpy.array([variable[1] for variable in self.designVariables])
+        upper = numpy.array([variable[2] for variable in self.designVariables])
+        if x0 is None:
+            x0 = (lower + upper) / 2.
+        else:
+            x0 = numpy.array([float(x0[variable[0]]) for variable in self.designVariables])
+        success, outputs = self.evaluate(x0)
+        if not success:
+            raise Exception("Cycle calculation failed at the start point " + str(self._case(x0)))
+
+        # Skalierung: Variablen auf [0, 1], Ziel und Nebenbedingungen auf ihren Startwert
+        span = upper - lower
+        scales = {}
+        for path in [self.objective[0]] + [constraint[0] for constraint in self.constraints]:
+            scales[path] = abs(outputs[path]) or 1.0
+        h = self.relativeStep
+
+        def physical(u):
+            return lower + numpy.asarray(u) * span
+
+        def value(u, path):
+            success, outputs = self.evaluate(physical(u))
+            if not success:
+                raise Exception("Cycle calculation failed at " + str(self._case(physical(u))))
+            return outputs[path] / scales[path]
+
+        def gradient(u, path):
+            u = numpy.asarray(u, dtype=float)
+            points = []
+            steps = numpy.zeros(len(u))
+            for j in range(len(u)):
+                # Stuetzstellen innerhalb der Grenzen (einseitige Differenz an einer aktiven Grenze)
+                up = numpy.array(u)
+                down = numpy.array(u)
+                up[j] = min(u[j] + h, 1.0)
+                down[j] = max(u[j] - h, 0.0)
+                steps[j] = up[j] - down[j]
+                points += [physical(up), physical(down)]
+            self.evaluateMany(points)
+            grad = numpy.zeros(len(u))
+            for j in range(len(u)):
+                plus = self.evaluate(points[2 * j])
+                minus = self.evaluate(points[2 * j + 1])
+                if not (plus[0] and minus[0]):
+                    raise Exception("Cycle calculation failed near " + str(self._case(physical(u))))
+                grad[j] = (plus[1][path] - minus[1][path]) / steps[j] / scales[path]
+            return grad
+
+        sign = self.objective[1]
+        constraints = []
+        for path, low, up in self.constraints:
+            if low is not None:
+                constraints.append({"type": "ineq",
+                                    "fun": lambda u, path=path, low=low: value(u, path) - low / scales[path],
+                                    "jac": lambda u, path=path: gradient(u, path)})
+            if up is not None:
+                constraints.append({"type": "ineq",
+                                    "fun": lambda u, path=path, up=up: up / scales[path] - value(u, path),
+                                    "jac": lambda u, path=path: -gradient(u, path)})
+
+        u0 = (x0 - lower) / span
+        iterates = []
+        try:
+            result = optimize.minimize(lambda u: sign * value(u, self.objective[0]), u0,
+                                       jac=lambda u: sign * gradient(u, self.objective[0]), method="SLSQP",
+                                       bounds=[(0.0, 1.0)] * len(u0), constraints=constraints,
+                                       callback=lambda u: iterates.append(numpy.array(u)),
+                                       options={"ftol": tolerance, "maxiter": maxIter})
+            u = numpy.clip(result.x, 0.0, 1.0)
+            success, message, iterations = result.success, result.message, result.nit
+        except Exception as detail:
+            helper_methods.logger.error("Optimization aborted after " + str(len(iterates)) + " iterations: " +
+                                        str(detail))
+            if not iterates:
+                return OptimizationResult(None, numpy.nan, {}, False, str(detail), 0, self.evaluations,
+                                          self.cacheHits)
+            u = numpy.clip(iterates[-1], 0.0, 1.0)
+            success, message, iterations = False, str(detail), len(iterates)
+
+        x = physical(u)
+        outputs = self.evaluate(x)[1]
+        return OptimizationResult(self._case(x), outputs[self.objective[0]], outputs, success, message, iterations,
+                                  self.evaluations, self.cacheHits)
+
+    ## case dictionary {design variable path: value} of the values x
+    def _case(self, x):
+        return dict((variable[0], float(value)) for variable, value in zip(self.designVariables, x))
+
+    def _checkOutput(self, path):
+        if path not in self.outputPaths:
+            raise Exception("'" + path + "' is no thermodynamic output, use one of " + str(self.outputPaths))
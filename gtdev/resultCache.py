@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# resultCache.py
+# Persistent cache of the results of calcThermo and calcAero on disk. An entry is addressed by a hash of the
+# type of the object, the library version, the process wide settings (see getSettings) and the values of its input
+# parameters (and those of its subcomponents), it holds all attributes changed by the calculation. Entries are
+# written atomically (one file per entry), so several processes (e.g. the sweep workers) can share a cache
+# directory. The least recently used entries are removed when the cache exceeds its size.
+#
+# Example:
+#	turbo.setResultCache(ResultCache("~/.gtdev/cache"))
+#	turbo.calcThermo()  # calculated and stored, instant on the next run with the same inputs
+#	turbo.resultCache.hits, turbo.resultCache.misses
+# imports:
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+
+from gtdev import helper_methods
+
+## version of the calculation methods, part of every key (entries of other versions are never used)
+VERSION = "0.93"
+
+## kinds of cached calculations
+CALCULATION_KINDS = ("thermo", "aero")
+
+# Dateiendung der Eintraege
+ENTRY_SUFFIX = ".pkl"
+
+# Attribute, die nicht mit den Ergebnissen gespeichert werden (Parameter store, Zaehler, Cache)
+UNCACHED_ATTRIBUTES = ("_values", "_kinds", "resultCache", "thermoCalculations", "thermoReuses")
+
+
+## cache directory on disk
+#
+# @param directory
+#	cache directory (created if missing), "~" is expanded
+# @param maxSize
+#	maximum size of all entries [bytes], the least recently used entries are removed down to 90 % of maxSize
+class ResultCache(object):
+    def __init__(self, directory, maxSize=256 * 1024 ** 2, version=VERSION):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.maxSize = maxSize
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                if not os.path.isdir(self.directory):  # von einem anderen Prozess angelegt
+                    raise
+        self.size = self.getSize()
+
+    # the cache is shared by copies of an engine (AbstractTurbo.clone, snapshots)
+    def __copy__(self):
+        return self
+
+    ## key of a calculation of obj ("thermo" or "aero") with its current inputs and the process wide settings
+    def getKey(self, obj, kind):
+        key = hashlib.sha256(pickle.dumps((self.version, kind) + getSettings(), 2))
+        for item in getInputState(obj, kind):
+            key.update(pickle.dumps(item, 2))  # einzeln: gleiche Objekte unter mehreren Namen aendern den Hash nicht
+        return key.hexdigest()
+
+    ## stored values {component path: {attribute: value}} of key, None if there is no (readable) entry
+    def load(self, key):
+        path = self._getPath(key)
+        try:
+            with open(path, "rb") as f:
+                values = pickle.load(f)
+            os.utime(path, None)  # zuletzt benutzt
+        except (IOError, OSError, EOFError, pickle.UnpicklingError) as detail:
+            if os.path.exists(path):
+                helper_methods.logger.debug("Cache entry " + key + " not readable: " + str(detail))
+            self.misses += 1
+            return None
+        self.hits += 1
+        return values
+
+    ## store the values of key (atomic: written to a temporary file and renamed)
+    def store(self, key, values):
+        path = self._getPath(key)
+        folder = os.path.dirname(path)
+        if not os.path.isdir(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:
+                pass
+        handle, temp = tempfile.mkstemp(suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(handle, "wb") as f:
+                pickle.dump(values, f, pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(temp)
+            os.replace(temp, path)
+        except Exception:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        self.stores += 1
+        self.size += size
+        if self.size > self.maxSize:
+            self.evict()
+
+    ## remove the least recently used entries down to 90 % of maxSize
+    def evict(self):
+        entries = []
+        for path in self._getEntries():
+            try:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                pass  # von einem anderen Prozess entfernt
+        self.size = sum(entry[1] for entry in entries)
+        for mtime, size, path in sorted(entries):
+            if self.size <= 0.9 * self.maxSize:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass
+            self.size -= size
+
+    ## remove all entries
+    def clear(self):
+        for path in self._getEntries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.size = 0
+
+    ## size of all entries [bytes]
+    def getSize(self):
+        size = 0
+        for path in self._getEntries():
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    ## counters as dictionary
+    def getStatistics(self):
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores, "evictions": self.evictions,
+                "size": self.size}
+
+    def _getPath(self, key):
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    def _getEntries(self):
+        for folder, dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(ENTRY_SUFFIX):
+                    yield os.path.join(folder, name)
+
+
+## decorator for calcThermo ("thermo") and calcAero ("aero") of AbstractTurbo classes: with a result cache set
+# (AbstractTurbo.setResultCache) the stored results are used, otherwise the method is called and its results stored
+def cachedCalculation(kind):
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            cache = self.resultCache
+            if cache is None:
+                return method(self)
+            try:
+                key = cache.getKey(self, kind)
+            except Exception as detail:  # nicht serialisierbare Eingaben
+                helper_methods.logger.debug("No cache key for " + str(self.identification) + ": " + str(detail))
+                return method(self)
+            values = cache.load(key)
+            if values is not None:
+                setChangedState(self, values)
+                return None
+            before = getAttributeState(self)
+            result = method(self)
+            try:
+                cache.store(key, getChangedState(self, before))
+            except Exception as detail:
+                helper_methods.logger.debug("Result of " + str(self.identification) + " not cached: " + str(detail))
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+## process wide settings that change the results (part of every key): gas property mode, process mode and the
+# rounding of the memoized gas properties (see helper_methods.PropertyCache, None: exact or no memoization)
+def getSettings():
+    cache = helper_methods.getPropertyCache()
+    return (helper_methods.getGasPropertyMode(), helper_methods.getProcessMode(),
+            None if cache is None else cache.digits)
+
+
+## values of the input parameters of obj and its subcomponents [(path, type or value), ...] (key of a calculation)
+#
+# "thermo": thermoInputParams and the parameters computed by the parent (see removeComputedParams), "aero": the
+# aerodynamic inputs and all thermodynamic parameters. The settings of cacheKeyParams (e.g. radius_const) are
+# included the same way, other attributes outside the parameter lists (solver start values) are not part of the key.
+def getInputState(obj, kind, prefix=""):
+    if kind == "thermo":
+        names = [param[0] for param in obj.thermoInputParams] + obj.computedParams[0] + obj.cacheKeyParams[0]
+    elif kind == "aero":
+        names = [param[0] for param in obj.aeroInputParams + obj.thermoInputParams + obj.thermoOutputParams] + \
+                obj.computedParams[0] + obj.computedParams[1] + obj.cacheKeyParams[0] + obj.cacheKeyParams[1]
+    else:
+        raise ValueError("Unknown calculation '" + str(kind) + "', use one of " + str(CALCULATION_KINDS))
+    state = [(prefix, type(obj).__module__ + "." + type(obj).__name__)]
+    state += [(prefix + name, getattr(obj, name, None)) for name in sorted(set(names))]
+    for component in obj.subcomponentList:
+        state += getInputState(component[1], kind, prefix + component[0] + ".")
+    return state
+
+
+## attributes of obj and its subcomponents {component path: {attribute: value}} (references, no copies)
+def getAttributeState(obj, prefix=""):
+    state = {prefix: dict(obj.__dict__)}
+    for component in obj.subcomponentList:
+        state.update(getAttributeState(component[1], prefix + component[0] + "."))
+    return state
+
+
+## attributes changed since getAttributeState (new objects, subcomponents and methods are left out)
+def getChangedState(obj, before, prefix=""):
+    names = [component[0] for component in obj.subcomponentList]
+    old = before.get(prefix, {})
+    state = {prefix: dict((key, value) for key, value in obj.__dict__.items()
+                          if (key not in old or value is not old[key]) and key not in names and
+                          key not in UNCACHED_ATTRIBUTES and not callable(value))}
+    for component in obj.subcomponentList:
+        state.update(getChangedState(component[1], before, prefix + component[0] + "."))
+    return state
+
+
+## set the stored attributes {component path: {attribute: value}} on obj and its subcomponents
+def setChangedState(obj, state, prefix=""):
+    for key, value in state.get(prefix, {}).items():
+        setattr(obj, key, value)
+    for component in obj.subcomponentList:
+        setChangedState(component[1], state, prefix + component[0] + ".")
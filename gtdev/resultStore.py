@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# resultStore.py
+# Columnar binary store for large result sets (sweeps with 10^5 - 10^6 designs). A store is a directory with
+# one raw float64 file per column (little endian, one value per design) and a schema file (columns with unit and
+# description from the parameter lists, number of rows). Rows are appended chunk by chunk, columns are read as
+# memory maps, so only the columns (and pages) actually used are loaded.
+#
+# Example:
+#	store = runSweepToStore(turbojet.Turbojet, cases, "results/tj70", outputs=["SFC", "F", "hpt.T_t3"])
+#	store = ResultStore("results/tj70")
+#	sfc = store.getColumn("SFC")[store.getColumn("success") == 1.0]
+# imports:
+import json
+import multiprocessing
+import os
+
+import numpy
+
+from gtdev import sweep
+
+## name of the schema file of a store
+SCHEMA_FILE = "schema.json"
+
+## format version of the store (schema and column files)
+STORE_FORMAT = 1
+
+# Datentyp der Spalten
+COLUMN_DTYPE = numpy.dtype("<f8")
+
+
+## columnar result store in a directory
+#
+# A new store is created with the column names (and optionally their units and descriptions, see getColumnSchema),
+# an existing store is opened with the directory only. The number of rows in the schema is updated after the
+# column files of an append are written, readers only see complete rows.
+class ResultStore(object):
+    def __init__(self, directory, columns=None, units=None, descriptions=None):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        schemaFile = os.path.join(self.directory, SCHEMA_FILE)
+        if columns is None:
+            if not os.path.exists(schemaFile):
+                raise Exception("No result store in " + self.directory)
+            with open(schemaFile) as f:
+                schema = json.load(f)
+            if schema["format"] != STORE_FORMAT:
+                raise Exception("Result store format " + str(schema["format"]) + " is not supported")
+            self.columns = [column["name"] for column in schema["columns"]]
+            self.units = dict((column["name"], column["unit"]) for column in schema["columns"])
+            self.descriptions = dict((column["name"], column["description"]) for column in schema["columns"])
+            self.rows = schema["rows"]
+        else:
+            if os.path.exists(schemaFile):
+                raise Exception("Result store " + self.directory + " exists already")
+            if len(set(columns)) != len(columns):
+                raise Exception("Column names of a result store have to be unique")
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            self.columns = list(columns)
+            self.units = dict((name, (units or {}).get(name, "")) for name in self.columns)
+            self.descriptions = dict((name, (descriptions or {}).get(name, "")) for name in self.columns)
+            self.rows = 0
+            for name in self.columns:
+                open(self._getPath(name), "wb").close()
+            self._writeSchema()
+
+    def __len__(self):
+        return self.rows
+
+    ## append rows, data is a numpy structured array (e.g. a sweep.runSweep table) or a dictionary
+    # {column: array}, columns missing in data are filled with nan
+    def append(self, data):
+        names = data.dtype.names if isinstance(data, numpy.ndarray) else list(data)
+        unknown = [name for name in names if name not in self.columns]
+        if unknown:
+            raise Exception("Unknown columns " + str(unknown) + " for result store " + self.directory)
+        n = len(data[names[0]]) if names else 0
+        if n == 0:
+            return
+        for name in self.columns:
+            values = numpy.asarray(data[name], dtype=COLUMN_DTYPE) if name in names else numpy.full(n, numpy.nan,
+                                                                                                     COLUMN_DTYPE)
+            if values.shape != (n,):
+                raise Exception("Column '" + name + "' has " + str(values.shape) + " values, expected " + str(n))
+            with open(self._getPath(name), "r+b") as f:
+                # ab der letzten vollstaendigen Zeile schreiben (Reste eines abgebrochenen append ueberschreiben)
+                f.seek(self.rows * COLUMN_DTYPE.itemsize)
+                f.write(values.tobytes())
+                f.truncate()
+        self.rows += n
+        self._writeSchema()
+
+    ## memory map (read only) of one column
+    def getColumn(self, name):
+        if name not in self.columns:
+            raise Exception("No column '" + str(name) + "' in result store " + self.directory)
+        if self.rows == 0:
+            return numpy.zeros(0, COLUMN_DTYPE)
+        return numpy.memmap(self._getPath(name), dtype=COLUMN_DTYPE, mode="r", shape=(self.rows,))
+
+    ## memory maps of the columns as dictionary {column: array} (default: all columns)
+    def getColumns(self, names=None):
+        return dict((name, self.getColumn(name)) for name in (self.columns if names is None else names))
+
+    ## columns as numpy structured array (copied into memory), rows selects a slice or index array
+    def load(self, names=None, rows=None):
+        names = self.columns if names is None else list(names)
+        columns = self.getColumns(names)
+        n = self.rows if rows is None else len(numpy.arange(self.rows)[rows])
+        table = numpy.zeros(n, dtype=[(name, COLUMN_DTYPE) for name in names])
+        for name in names:
+            table[name] = columns[name] if rows is None else columns[name][rows]
+        return table
+
+    def _getPath(self, name):
+        return os.path.join(self.directory, name + ".f8")
+
+    # Schema atomar schreiben (Leser sehen nur vollstaendige Zeilen)
+    def _writeSchema(self):
+        schema = {"format": STORE_FORMAT, "rows": self.rows,
+                  "columns": [{"name": name, "unit": self.units[name], "description": self.descriptions[name]}
+                              for name in self.columns]}
+        path = os.path.join(self.directory, SCHEMA_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(schema, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+
+## units and descriptions of dotted parameter paths of an engine, taken from its parameter lists
+#
+# @return (units, descriptions) as dictionaries {path: string}
+def getColumnSchema(engine, paths):
+    units = {}
+    descriptions = {}
+    for path in paths:
+        try:
+            definition = engine.getParameterDefinition(path)
+        except AttributeError:
+            definition = None
+        if definition is not None:
+            units[path] = definition[1]
+            descriptions[path] = definition[2]
+    return units, descriptions
+
+
+## evaluate cases like sweep.runSweep and append the results chunk by chunk to a new result store
+#
+# The cases may be a generator (they are consumed chunk by chunk), all cases have to set the same inputs as the
+# first one. Only the rows of the current chunks are kept in memory. The columns are the inputs of the first case,
+# the outputs and "success" (1.0 or 0.0).
+# @param directory
+#	directory of the new result store
+def runSweepToStore(engine, cases, directory, outputs=None, baseInputs=None, processes=None, chunksize=100,
+                    method="calcThermo", cacheDirectory=None):
+    cases = iter(cases)
+    first = next(cases, None)
+    if first is None:
+        raise Exception("No cases given")
+    design = sweep.buildEngine(engine, {}, baseInputs)
+    if outputs is None:
+        outputs = design.getThermoOutputPaths()
+    inputs = sorted(set(first) - set(outputs))
+    units, descriptions = getColumnSchema(design, inputs + list(outputs))
+    units["success"], descriptions["success"] = "-", "1: case evaluated, 0: failed (nan outputs)"
+    store = ResultStore(directory, inputs + list(outputs) + ["success"], units, descriptions)
+
+    def chunks():
+        chunk = [first]
+        for case in cases:
+            if len(chunk) == chunksize:
+                yield chunk
+                chunk = []
+            chunk.append(case)
+        yield chunk
+
+    tasks = ((engine, chunk, outputs, baseInputs, method, cacheDirectory) for chunk in chunks())
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes == 1:
+        _appendResults(store, (_evaluateChunk(task) for task in tasks), outputs)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            _appendResults(store, pool.imap(_evaluateChunk, tasks), outputs)
+        finally:
+            pool.close()
+            pool.join()
+    return store
+
+
+# Ergebnisse der Teilpakete der Reihe nach an den Store anhaengen
+def _appendResults(store, results, outputs):
+    for chunk, rows in results:
+        for case in chunk:
+            if sorted(set(case) - set(outputs)) != sorted(set(store.columns) - set(outputs) - {"success"}):
+                raise Exception("Case " + str(case) + " does not set the inputs of the first case")
+        table = sweep.makeTable(chunk, outputs, rows)
+        store.append(dict((name, table[name]) for name in table.dtype.names))
+
+
+## worker: evaluate a chunk of cases, returns the chunk with its rows
+def _evaluateChunk(args):
+    engine, chunk, outputs, baseInputs, method, cacheDirectory = args
+    return chunk, [sweep.evaluateCase(engine, case, outputs, baseInputs, method, cacheDirectory) for case in chunk]
+
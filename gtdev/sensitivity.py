@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# sensitivity.py
+# Jacobian of the thermodynamic outputs of an engine model with respect to chosen inputs around a design point,
+# by central differences evaluated on the sweep process pool.
+#
+# Example:
+#	jac = calcJacobian(turbojet.Turbojet, ["hpc.Pi", "combc.T_t3"], baseInputs=tj70Inputs, outputs=["SFC", "F"])
+#	jac.getDerivative("SFC", "hpc.Pi")
+# imports:
+import numpy
+
+from gtdev import continuation, sweep
+
+
+## Jacobian d(outputs)/d(inputs) at a design point (result of calcJacobian)
+#
+# values[i, j] = d outputs[i] / d inputs[j], errors holds the estimated truncation errors (nan without
+# Richardson extrapolation), base the outputs and point the inputs at the design point, steps the (adapted) step
+# width per input and adaptations the number of step changes per input. Derivatives with failed perturbed
+# evaluations are nan.
+class Jacobian(object):
+    def __init__(self, inputs, outputs, point, base, values, errors, steps, adaptations=None):
+        self.inputs = inputs
+        self.outputs = outputs
+        self.point = point
+        self.base = base
+        self.values = values
+        self.errors = errors
+        self.steps = steps
+        self.adaptations = numpy.zeros(len(inputs), dtype=int) if adaptations is None else adaptations
+
+    ## derivative of one output with respect to one input
+    #
+    # @param relative
+    #	True: normalised sensitivity (dy / y) / (dx / x)
+    def getDerivative(self, output, input, relative=False):
+        i = self.outputs.index(output)
+        j = self.inputs.index(input)
+        if relative:
+            return self.values[i, j] * self.point[j] / self.base[i]
+        return self.values[i, j]
+
+    ## all derivatives as dictionary {(output, input): value}
+    def getDict(self, relative=False):
+        return dict(((output, input), self.getDerivative(output, input, relative))
+                    for output in self.outputs for input in self.inputs)
+
+
+## Jacobian of the outputs of an engine model with respect to the given inputs
+#
+# The design point is evaluated once in this process. Every input x is perturbed to x +- h (and x +- h/2
+# with Richardson extrapolation, D = D(h/2) + (D(h/2) - D(h)) / 3 with the error estimate |D(h/2) - D(h)| / 3)
+# and the perturbed points of all inputs are evaluated in parallel with sweep.runSweep.
+# With Richardson extrapolation the step of every input is adapted: while the largest relative error estimate of
+# its column (see getRelativeError) is above tolerance, the step is divided by stepFactor (truncation error).
+# If a smaller step gives a larger error, the step is multiplied by stepFactor from the best step instead (the
+# error is dominated by the solver noise), a second increase of the error ends the search (noise floor).
+# Failed perturbed evaluations (nan derivatives) shrink the step as well. The column with the smallest error is
+# kept, each round evaluates the inputs still adapting together.
+# @param engine
+#	AbstractTurbo subclass or picklable callable returning a configured engine (see sweep.runSweep)
+# @param inputs
+#	dotted input paths, e.g. ["hpc.Pi", "hpc.eta_pol", "combc.T_t3"]
+# @param outputs
+#	dotted output paths, default: all thermodynamic outputs (thermoOutputParams of the engine and its components)
+# @param relativeStep
+#	initial step width relative to the input value (absoluteStep for inputs equal to zero)
+# @param tolerance
+#	relative error estimate accepted without step adaptation
+# @param maxAdaptations
+#	maximum number of step changes per input (0: fixed steps)
+# @param warmStart
+#	True: the perturbed evaluations start the component solvers from the converged state of the design point
+#	(see continuation.getSolverComponents)
+def calcJacobian(engine, inputs, outputs=None, baseInputs=None, relativeStep=1e-4, absoluteStep=1e-6,
+                 richardson=True, tolerance=1e-6, maxAdaptations=3, stepFactor=4.0, warmStart=True, processes=None,
+                 method="calcThermo"):
+    baseInputs = dict(baseInputs or {})
+    design = sweep.buildEngine(engine, {}, baseInputs)
+    getattr(design, method)()
+    if outputs is None:
+        outputs = design.getThermoOutputPaths()
+    base = numpy.array([sweep.toFloat(design.getParameter(path)) for path in outputs])
+    point = numpy.array([sweep.toFloat(design.getParameter(path)) for path in inputs])
+
+    if warmStart:
+        for path in continuation.getSolverComponents(design):
+            component = design.getParameter(path)
+            if component.solverStart is not None:
+                baseInputs[path + ".warmStart"] = True
+                baseInputs[path + ".solverStart"] = dict(component.solverStart)
+
+    trial = numpy.where(point != 0.0, relativeStep * numpy.abs(point), absoluteStep)
+    steps = numpy.array(trial)
+    values = numpy.full((len(outputs), len(inputs)), numpy.nan)
+    errors = numpy.full((len(outputs), len(inputs)), numpy.nan)
+    adaptations = numpy.zeros(len(inputs), dtype=int)
+    best = [numpy.inf] * len(inputs)  # kleinster relativer Fehler je Eingang
+    grow = [False] * len(inputs)  # Rauschen: Schritt vergroessern statt verkleinern
+    pending = list(range(len(inputs)))
+    while pending:
+        # Schrittweiten exakt darstellbar: x + h - x == h
+        trial[pending] = (point[pending] + trial[pending]) - point[pending]
+        columns = _calcDifferences(engine, inputs, outputs, baseInputs, point, trial, pending, richardson,
+                                   processes, method)
+        adapting = []
+        for j in pending:
+            derivative, error = columns[j]
+            failed = bool(numpy.any(numpy.isnan(derivative) & ~numpy.isnan(base)))
+            measure = numpy.inf if failed else getRelativeError(derivative, error, base, point[j])
+            if measure < best[j] or adaptations[j] == 0:
+                best[j] = measure
+                steps[j] = trial[j]
+                values[:, j] = derivative
+                errors[:, j] = error
+            elif not numpy.isinf(best[j]):
+                if grow[j]:
+                    continue  # Rauschgrenze erreicht
+                grow[j] = True
+            if not richardson or best[j] <= tolerance or adaptations[j] >= maxAdaptations:
+                continue
+            adaptations[j] += 1
+            trial[j] = steps[j] * stepFactor if grow[j] else trial[j] / stepFactor
+            adapting.append(j)
+        pending = adapting
+    return Jacobian(list(inputs), list(outputs), point, base, values, errors, steps, adaptations)
+
+
+## largest error estimate of a Jacobian column relative to the derivatives, derivatives below the normalised
+# sensitivity (dy / y) / (dx / x) = 1 are measured against |y / x| (0 without error estimates)
+def getRelativeError(derivative, error, base, x):
+    scale = numpy.maximum(numpy.abs(derivative), numpy.abs(base) / (abs(x) or 1.0))
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        ratio = error / scale
+    ratio = ratio[numpy.isfinite(ratio)]
+    return float(numpy.max(ratio)) if len(ratio) else 0.0
+
+
+## central differences (and Richardson extrapolation) of the inputs given by index with the steps
+#
+# @return dictionary {index: (derivatives of the outputs, error estimates)}
+def _calcDifferences(engine, inputs, outputs, baseInputs, point, steps, index, richardson, processes, method):
+    factors = (1.0, 0.5) if richardson else (1.0,)
+    cases = []
+    for j in index:
+        for factor in factors:
+            cases.append({inputs[j]: point[j] + factor * steps[j]})
+            cases.append({inputs[j]: point[j] - factor * steps[j]})
+
+    table = sweep.runSweep(engine, cases, outputs=outputs, baseInputs=baseInputs, processes=processes,
+                           method=method)
+    results = numpy.array([table[path] for path in outputs]).T
+    results[~table["success"]] = numpy.nan
+
+    # zentrale Differenzen
+    n = 2 * len(factors)
+    columns = {}
+    for k, j in enumerate(index):
+        rows = results[k * n:(k + 1) * n]
+        derivative = (rows[0] - rows[1]) / (2.0 * steps[j])
+        error = numpy.full(len(outputs), numpy.nan)
+        if richardson:
+            half = (rows[2] - rows[3]) / steps[j]
+            error = numpy.abs(half - derivative) / 3.0
+            derivative = half + (half - derivative) / 3.0
+        columns[j] = (derivative, error)
+    return columns
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# solvers.py
+# imports:
+import numpy
+
+## accelerations available in solveFixedPoint
+#
+# "none": plain substitution x = g(x)
+# "aitken": per element Aitken/Irons-Tuck extrapolation from the last two substitution steps
+# "anderson": Anderson mixing over the last `depth` steps, x is treated as one coupled system
+FIXED_POINT_ACCELERATIONS = ("none", "aitken", "anderson")
+
+
+## result of solveFixedPoint
+#
+# x, converged and iterations are floats/bools/ints for scalar start values and arrays otherwise.
+# residuals holds the largest |g(x) - x| of the iterated points for every iteration.
+class FixedPointResult(object):
+    def __init__(self, x, converged, iterations, residuals):
+        self.x = x
+        self.converged = converged
+        self.iterations = iterations
+        self.residuals = residuals
+
+
+## solve x = fun(x) by (accelerated) fixed point iteration
+#
+# A scalar x0 is iterated as one problem. An array x0 is iterated as independent problems, one per element
+# (e.g. a whole array of component designs): every element converges on its own, converged elements are
+# frozen and their later values of fun are ignored. Elements turning nan are frozen as not converged.
+# With acceleration "anderson" the array is one coupled system and converges as a whole.
+# @param fun
+#	fixed point function, called with an array shaped like x0 (or a float for scalar x0)
+# @param tolerance
+#	absolute tolerance on |fun(x) - x|
+# @param maxIter
+#	maximum number of evaluations of fun, not converged points are reported in converged
+def solveFixedPoint(fun, x0, tolerance=1e-5, maxIter=100, acceleration="aitken", depth=3):
+    if acceleration not in FIXED_POINT_ACCELERATIONS:
+        raise ValueError("Unknown acceleration '" + str(acceleration) + "', use one of " +
+                         str(FIXED_POINT_ACCELERATIONS))
+    scalar = numpy.ndim(x0) == 0
+    x = numpy.array(x0, dtype=float, ndmin=1)
+    converged = numpy.zeros(x.shape, dtype=bool)
+    active = numpy.ones(x.shape, dtype=bool)
+    iterations = numpy.zeros(x.shape, dtype=int)
+    residuals = []
+
+    xOld = None
+    rOld = None
+    dG = []
+    dF = []
+    for i in range(maxIter):
+        g = numpy.array(fun(float(x[0]) if scalar else x.copy()), dtype=float, ndmin=1)
+        r = g - x
+        iterations[active] += 1
+        residuals.append(float(numpy.max(numpy.abs(r[active]))) if numpy.any(active) else 0.0)
+
+        if acceleration == "anderson":
+            done = numpy.all(numpy.abs(r[active]) < tolerance)
+            if done or not numpy.all(numpy.isfinite(r[active])):
+                converged[active] = done
+                x[active] = g[active]
+                active[:] = False
+                break
+        else:
+            failed = active & ~numpy.isfinite(r)
+            done = active & (numpy.abs(r) < tolerance)
+            converged |= done
+            x[done] = g[done]
+            active &= ~(done | failed)
+            if not numpy.any(active):
+                break
+
+        # next point
+        xNew = g.copy()
+        if acceleration == "aitken" and xOld is not None:
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                xAcc = x - r * (x - xOld) / (r - rOld)
+            use = active & numpy.isfinite(xAcc) & (numpy.abs(r - rOld) > 1e-300)
+            xNew[use] = xAcc[use]
+        elif acceleration == "anderson" and rOld is not None:
+            dF.append(r - rOld)
+            dG.append(g - (xOld + rOld))
+            del dF[:-depth], dG[:-depth]
+            F = numpy.array(dF).T
+            gamma = numpy.linalg.lstsq(F, r, rcond=None)[0]
+            xNew = g - numpy.array(dG).T.dot(gamma)
+        xOld = x.copy()
+        rOld = r
+        x[active] = xNew[active]
+
+    if scalar:
+        return FixedPointResult(float(x[0]), bool(converged[0]), int(iterations[0]), residuals)
+    return FixedPointResult(x, converged, iterations, residuals)
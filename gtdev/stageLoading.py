@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# stageLoading.py
+# Distribution of the stage pressure ratios and reactions of a multistage axial compressor
+# (compressor.MultiStageAxialCompressor) for a given overall pressure ratio. The loading limits (De Haller,
+# Gitterbelastungszahl, blade root stress) are checked for every candidate, the number of stages (or the axial
+# length) is minimized. The candidates of a search round are evaluated together on a process pool.
+#
+# Example (compressor of projects/multistage.py):
+#	baseInputs = {"T_t1": 293.15, "p_t1": 101325., "mflow": 0.28, "n": 90000., "eta_pol": 0.85, "r_h1": 0.015,
+#	              "r_s1": 0.03, "radius_const": "casing", "diffusion_rotor": 0.4, "diffusion_stator": 0.45,
+#	              "b_to_s_rotor": 1.1, "b_to_s_stator": 1.4}
+#	result = optimizeStageLoading(2.7, baseInputs, minStages=3, maxStages=8)
+#	result.best.stages, result.best.Pi, result.best.reaction
+# imports:
+import math
+import multiprocessing
+
+import numpy
+
+from gtdev import compressor, helper_methods
+from gtdev.helper_methods import getR
+
+## default loading limits {output: (lower, upper)} (per stage, None: no limit)
+#
+# De Haller number w_2/w_1 and c_3/c_2 above 0.72, Gitterbelastungszahl between 0.4 and 2.5 (see
+# CompressorAxial.calculateProfile), centrifugal stress at the blade root below 150 N/mm^2 (aluminium)
+LOADING_LIMITS = {"DeHaller_rotor": (0.72, None),
+                  "DeHaller_stator": (0.72, None),
+                  "gitterbelastung_rotor": (0.4, 2.5),
+                  "gitterbelastung_stator": (0.4, 2.5),
+                  "sigma_z_bladeroot": (None, 150.0)}
+
+## objectives of optimizeStageLoading
+LOADING_OBJECTIVES = ("stages", "length")
+
+
+## evaluated loading distribution
+#
+# violation: sum of the relative limit violations of all stages (0: feasible, inf: calculation failed),
+# length: axial length of the blading [m], values: {limited output: array over the stages}
+class LoadingCandidate(object):
+    def __init__(self, Pi, reaction, success, violation, length, values):
+        self.stages = len(Pi)
+        self.Pi = Pi
+        self.reaction = reaction
+        self.success = success
+        self.violation = violation
+        self.length = length
+        self.values = values
+
+    def isFeasible(self):
+        return self.success and self.violation == 0.0
+
+
+## result of optimizeStageLoading
+#
+# best: best candidate (the least violating one if no candidate is feasible), candidates: all evaluated candidates
+class StageLoadingResult(object):
+    def __init__(self, best, candidates):
+        self.best = best
+        self.feasible = best is not None and best.isFeasible()
+        self.candidates = candidates
+        self.evaluations = len(candidates)
+
+
+## stage pressure ratios with the product Pi_total
+#
+# The logarithmic pressure ratios fall linearly from the first to the last stage, slope 0 loads all stages
+# equally, slope > 0 loads the front stages more (|slope| < 1).
+def distributePressureRatio(Pi_total, stages, slope=0.0):
+    if stages == 1:
+        return numpy.array([float(Pi_total)])
+    weights = 1.0 + slope * (1.0 - 2.0 * numpy.arange(stages) / (stages - 1.0))
+    return float(Pi_total) ** (weights / numpy.sum(weights))
+
+
+## stage reactions, linear from the first to the last stage
+def distributeReaction(stages, first, last):
+    return numpy.linspace(first, last, stages)
+
+
+## relative violation of the limits by the values {output: array over the stages}
+def getViolation(values, limits):
+    violation = 0.0
+    for name in limits:
+        value = numpy.asarray(values[name], dtype=float)
+        if not numpy.all(numpy.isfinite(value)):
+            return float("inf")
+        lower, upper = limits[name]
+        if lower is not None:
+            violation += float(numpy.sum(numpy.maximum(0.0, lower - value))) / abs(lower)
+        if upper is not None:
+            violation += float(numpy.sum(numpy.maximum(0.0, value - upper))) / abs(upper)
+    return violation
+
+
+## evaluate loading distributions on a process pool
+#
+# @param baseInputs
+#	dictionary {parameter: value} of the MultiStageAxialCompressor (everything but Pi and reaction), per stage
+#	inputs as scalars (or arrays if all candidates have the same number of stages)
+# @param candidates
+#	list of (stage pressure ratios, stage reactions)
+# @param processes
+#	number of worker processes (default: number of CPUs), 1 evaluates in this process without a pool
+# @return list of LoadingCandidate (same order)
+def evaluateCandidates(baseInputs, candidates, limits=None, processes=None, chunksize=None):
+    if limits is None:
+        limits = LOADING_LIMITS
+    candidates = [(numpy.asarray(Pi, dtype=float), numpy.asarray(reaction, dtype=float))
+                  for Pi, reaction in candidates]
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = max(1, min(processes, len(candidates)))
+    if chunksize is None:
+        chunksize = max(1, int(math.ceil(len(candidates) / (4.0 * processes))))
+
+    chunks = [(baseInputs, candidates[i:i + chunksize], limits) for i in range(0, len(candidates), chunksize)]
+    if processes == 1:
+        results = [_evaluateChunk(chunk) for chunk in chunks]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(_evaluateChunk, chunks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    return [candidate for chunk in results for candidate in chunk]
+
+
+## search the stage pressure ratios and reactions for the overall pressure ratio Pi_total
+#
+# For every number of stages the distributions are parametrized by the slope of the pressure ratio distribution
+# (see distributePressureRatio) and the reactions of the first and the last stage. A grid of these three
+# parameters is evaluated at once (evaluateCandidates), then refined around the best candidate (half the grid
+# width per refinement). The best candidate is the feasible one with the shortest blading, or the least
+# violating one if none is feasible.
+# @param objective
+#	"stages": the smallest number of stages with a feasible distribution (stops at the first one),
+#	"length": the shortest blading over all numbers of stages
+# @param slopes, reactions
+#	bounds of the slope (|slope| < 1) and of the stage reactions
+# @param gridPoints
+#	grid points per parameter and search round
+def optimizeStageLoading(Pi_total, baseInputs, minStages=1, maxStages=10, limits=None, objective="stages",
+                         slopes=(-0.6, 0.6), reactions=(0.5, 0.9), gridPoints=7, refinements=2, processes=None):
+    if objective not in LOADING_OBJECTIVES:
+        raise ValueError("Unknown objective '" + str(objective) + "', use one of " + str(LOADING_OBJECTIVES))
+    if limits is None:
+        limits = LOADING_LIMITS
+    lower = numpy.array([slopes[0], reactions[0], reactions[0]], dtype=float)
+    upper = numpy.array([slopes[1], reactions[1], reactions[1]], dtype=float)
+
+    best = None
+    candidates = []
+    for stages in range(minStages, maxStages + 1):
+        center = (lower + upper) / 2.0
+        width = (upper - lower) / 2.0
+        bestStages = None
+        for refinement in range(refinements + 1):
+            axes = [numpy.unique(numpy.clip(center[j] + width[j] * numpy.linspace(-1.0, 1.0, gridPoints),
+                                            lower[j], upper[j])) for j in range(3)]
+            if stages == 1:
+                axes = [axes[0][:1], axes[1], axes[2][:1]]  # Einstufig: keine Verteilung
+            parameters = [(slope, first, last) for slope in axes[0] for first in axes[1] for last in axes[2]]
+            grid = [(distributePressureRatio(Pi_total, stages, slope), distributeReaction(stages, first, last))
+                    for slope, first, last in parameters]
+            evaluated = evaluateCandidates(baseInputs, grid, limits, processes)
+            candidates += evaluated
+
+            i = min(range(len(evaluated)), key=lambda i: _rank(evaluated[i]))
+            if bestStages is None or _rank(evaluated[i]) < _rank(bestStages):
+                bestStages = evaluated[i]
+                center = numpy.array(parameters[i])
+            width = width / 2.0
+
+        if best is None or _rank(bestStages) < _rank(best):
+            best = bestStages
+        if objective == "stages" and best.isFeasible():
+            break
+    return StageLoadingResult(best, candidates)
+
+
+## sort key of a candidate: feasible ones by length, the others by violation
+def _rank(candidate):
+    if candidate.isFeasible():
+        return (0, candidate.length)
+    return (1, candidate.violation)
+
+
+## worker: evaluate a chunk of candidates
+#
+# The thermodynamics of all candidates with the same number of stages are calculated at once
+# (compressor.calcStageThermo), the meanline aerodynamics candidate by candidate.
+def _evaluateChunk(args):
+    baseInputs, candidates, limits = args
+    results = [None] * len(candidates)
+    for stages in sorted(set(len(Pi) for Pi, reaction in candidates)):
+        index = [i for i, candidate in enumerate(candidates) if len(candidate[0]) == stages]
+        comp = compressor.MultiStageAxialCompressor("loading", stages)
+        for name in sorted(baseInputs):
+            comp.setParameter(name, baseInputs[name])
+        comp.Pi = candidates[index[0]][0]
+        comp.check(comp.thermoInputParams)
+        comp.R = getR()
+
+        with numpy.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            states = compressor.calcStageThermo(comp.T_t1, comp.p_t1, [candidates[i][0] for i in index],
+                                                *[comp.getStageArray(name) for name in
+                                                  ["eta_pol", "Ma_inlet", "Ma_outlet"]])
+        for j, i in enumerate(index):
+            results[i] = _evaluateCandidate(comp, candidates[i][0], candidates[i][1],
+                                            dict((name, states[name][j]) for name in states), limits)
+    return results
+
+
+## meanline aerodynamics of one loading distribution
+def _evaluateCandidate(comp, Pi, reaction, states, limits):
+    comp.Pi = Pi
+    comp.reaction = reaction
+    try:
+        with numpy.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            comp.setStageThermo(states)
+            comp.calcAero()
+    except Exception as detail:
+        helper_methods.logger.debug("Loading " + str(list(Pi)) + " failed: " + str(detail))
+        return LoadingCandidate(Pi, reaction, False, float("inf"), float("nan"), {})
+    values = dict((name, numpy.array(getattr(comp, name), dtype=float)) for name in limits)
+    return LoadingCandidate(Pi, reaction, True, getViolation(values, limits), float(comp.z_3[-1] - comp.z_1),
+                            values)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# sweep.py
+# Parameter studies of complete engines (Turbojet, Turbofan, Turbofan_Recalc) on a process pool.
+#
+# Example:
+#	cases = makeGrid({"hpc.Pi": numpy.linspace(3., 5., 21), "combc.T_t3": [1000., 1100., 1200.]})
+#	table = runSweep(turbojet.Turbojet, cases, baseInputs=tj70Inputs, processes=32)
+#	table["SFC"][table["success"]]
+# imports:
+import itertools
+import math
+import multiprocessing
+
+import numpy
+
+from gtdev import helper_methods, resultCache
+
+# Ergebniscaches der Prozesse {Verzeichnis: resultCache.ResultCache}
+_caches = {}
+
+
+## list of case dictionaries for the cartesian product of the given axes
+#
+# @param axes
+#	dictionary {dotted parameter path: list of values}, e.g. {"hpc.Pi": [3.5, 4.0], "combc.T_t3": [1000., 1100.]}
+def makeGrid(axes):
+    paths = sorted(axes)
+    return [dict(zip(paths, values)) for values in itertools.product(*[list(axes[path]) for path in paths])]
+
+
+## build an engine and set the base inputs and the case inputs (dotted paths, see AbstractTurbo.setParameter)
+#
+# @param engine
+#	AbstractTurbo subclass (e.g. turbojet.Turbojet) or a callable taking the identification and returning
+#	a configured engine object
+def buildEngine(engine, case, baseInputs=None):
+    obj = engine("sweep")
+    for inputs in (baseInputs or {}, case):
+        for path in sorted(inputs):
+            obj.setParameter(path, inputs[path])
+    return obj
+
+
+## evaluate one case, returns (success, list of output values)
+#
+# Failing cases (exceptions in calcThermo) return success False and nan outputs instead of raising.
+# @param cacheDirectory
+#	directory of a result cache shared by all processes (see resultCache.ResultCache), None: no cache
+def evaluateCase(engine, case, outputs, baseInputs=None, method="calcThermo", cacheDirectory=None):
+    try:
+        obj = buildEngine(engine, case, baseInputs)
+        if cacheDirectory is not None:
+            obj.setResultCache(getResultCache(cacheDirectory))
+        getattr(obj, method)()
+        return True, [toFloat(obj.getParameter(path)) for path in outputs]
+    except Exception as detail:
+        helper_methods.logger.debug("Sweep case " + str(case) + " failed: " + str(detail))
+        return False, [float("nan")] * len(outputs)
+
+
+## result cache of this process for a cache directory
+def getResultCache(directory):
+    if directory not in _caches:
+        _caches[directory] = resultCache.ResultCache(directory)
+    return _caches[directory]
+
+
+## default outputs of a sweep: all thermodynamic outputs of the engine and its subcomponents
+def getDefaultOutputs(engine, baseInputs=None):
+    return buildEngine(engine, {}, baseInputs).getThermoOutputPaths()
+
+
+## evaluate a list of cases on a process pool
+#
+# The cases are split into chunks that are distributed over the workers (one engine object per case).
+# The result is a numpy structured array with one row per case (same order) and one field per input path,
+# per output path and the field "success". Failed cases have nan outputs.
+# @param engine
+#	AbstractTurbo subclass or picklable (module level) callable returning a configured engine
+# @param cases
+#	list of dictionaries {dotted parameter path: value} (see makeGrid)
+# @param outputs
+#	dotted paths of the results, default: all thermodynamic outputs (see getDefaultOutputs)
+# @param baseInputs
+#	dictionary of inputs applied to every case before the case inputs
+# @param processes
+#	number of worker processes (default: number of CPUs), 1 evaluates in this process without a pool
+# @param chunksize
+#	cases per task, default: about four tasks per worker
+# @param cacheDirectory
+#	directory of a result cache shared by the workers (repeated cases are read from the cache), None: no cache
+def runSweep(engine, cases, outputs=None, baseInputs=None, processes=None, chunksize=None, method="calcThermo",
+             cacheDirectory=None):
+    cases = list(cases)
+    if outputs is None:
+        outputs = getDefaultOutputs(engine, baseInputs)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = max(1, min(processes, len(cases)))
+    if chunksize is None:
+        chunksize = max(1, int(math.ceil(len(cases) / (4.0 * processes))))
+
+    chunks = [(engine, cases[i:i + chunksize], outputs, baseInputs, method, cacheDirectory)
+              for i in range(0, len(cases), chunksize)]
+    if processes == 1:
+        results = [_evaluateChunk(chunk) for chunk in chunks]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(_evaluateChunk, chunks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    return makeTable(cases, outputs, [row for chunk in results for row in chunk])
+
+
+## structured array for cases and evaluated rows [(success, output values), ...]
+#
+# Inputs that are outputs as well (e.g. mflow of Turbofan_Recalc) get the evaluated value.
+def makeTable(cases, outputs, rows):
+    inputs = sorted(set(path for case in cases for path in case) - set(outputs))
+    dtype = [(path, "f8") for path in inputs] + [(path, "f8") for path in outputs] + [("success", "?")]
+    table = numpy.zeros(len(cases), dtype=dtype)
+    for path in inputs:
+        table[path] = [toFloat(case.get(path, float("nan"))) for case in cases]
+    for j, path in enumerate(outputs):
+        table[path] = [row[1][j] for row in rows]
+    table["success"] = [row[0] for row in rows]
+    return table
+
+
+## worker: evaluate a chunk of cases
+def _evaluateChunk(args):
+    engine, cases, outputs, baseInputs, method, cacheDirectory = args
+    return [evaluateCase(engine, case, outputs, baseInputs, method, cacheDirectory) for case in cases]
+
+
+## numeric value of a parameter for the result table (nan for missing or non numeric values)
+def toFloat(value):
+    try:
+        return float(numpy.squeeze(value))
+    except (TypeError, ValueError):
+        return float("nan")
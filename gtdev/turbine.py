@@ -14,6 +14,89 @@
 import numpy
 from gtdev.abstract import *
 from gtdev.helper_methods import *
+from gtdev.resultCache import cachedCalculation
+
+
+## turbine work extraction: outlet state for a given enthalpy drop, free of side effects
+#
+# T_t3 = T_t1 - deltaP / mflow / R * (kappa - 1) / kappa with kappa the mean of the inlet and outlet kappa,
+# solved by fixed point iteration for all points at once (d(kappa)/dT is small, the iteration contracts
+# quickly). p_t3 follows from the polytropic expansion. Scalars and numpy arrays (broadcast against each
+# other) are accepted, nothing is stored, so the function can be used for batches and from worker threads.
+# Pure scalar input is evaluated with the scalar gas property functions, which are faster for single points.
+#
+# @param T0
+#	start value for T_t3 (e.g. the solution of a neighbouring operating point), default T_t1
+# @return dictionary with "T_t3", "p_t3", "kappa", "kappa_1", "kappa_3", "R", "converged" and "iterations"
+def solveTurbineWork(deltaP, mflow, T_t1, p_t1, beta, eta_pol, Ma_inlet=0.4, Ma_outlet=0.4, tolerance=1e-10,
+                     maxIter=50, T0=None):
+    if all(numpy.ndim(x) == 0 for x in (deltaP, mflow, T_t1, p_t1, beta, eta_pol, Ma_inlet, Ma_outlet, T0)):
+        return _solveTurbineWorkScalar(deltaP, mflow, T_t1, p_t1, beta, eta_pol, Ma_inlet, Ma_outlet, tolerance,
+                                       maxIter, T0)
+
+    deltaP, mflow, T_t1, p_t1, beta, eta_pol, Ma_inlet, Ma_outlet = numpy.broadcast_arrays(
+        *[numpy.asarray(x, dtype=float) for x in (deltaP, mflow, T_t1, p_t1, beta, eta_pol, Ma_inlet, Ma_outlet)])
+    R = getRArray(material="exhaust", beta=beta)
+    kappa_1 = getKappaArray(T_t1, Ma_inlet, material="exhaust", beta=beta)
+    work = deltaP / mflow / R
+
+    if T0 is None:
+        T_t3 = T_t1.copy()
+    else:
+        T_t3 = numpy.array(numpy.broadcast_to(T0, T_t1.shape), dtype=float)
+    kappa_3 = kappa_1.copy()
+    iterations = numpy.zeros(T_t1.shape, dtype=int)
+    active = numpy.ones(T_t1.shape, dtype=bool)
+    for i in range(maxIter):
+        kappa_3[active] = getKappaArray(T_t3[active], Ma_outlet[active], material="exhaust", beta=beta[active],
+                                        kappa0=kappa_3[active])
+        kappa = (kappa_1[active] + kappa_3[active]) / 2.
+        T_new = T_t1[active] - work[active] / kappa * (kappa - 1)
+        done = ~(numpy.abs(T_new - T_t3[active]) >= tolerance * T_new)
+        T_t3[active] = T_new
+        iterations[active] += 1
+        active[active] = ~done
+        if not numpy.any(active):
+            break
+
+    p_t3 = polytropeArray(eta_pol=eta_pol, T1=T_t1, T2=T_t3, p1=p_t1, Ma=Ma_outlet, material="exhaust", beta=beta)
+    return {"T_t3": T_t3,
+            "p_t3": p_t3,
+            "kappa": (kappa_1 + kappa_3) / 2.,
+            "kappa_1": kappa_1,
+            "kappa_3": kappa_3,
+            "R": R,
+            "converged": ~active,
+            "iterations": iterations}
+
+
+## single point version of solveTurbineWork (same iteration on getKappa and polytrope)
+def _solveTurbineWorkScalar(deltaP, mflow, T_t1, p_t1, beta, eta_pol, Ma_inlet, Ma_outlet, tolerance, maxIter,
+                            T0=None):
+    R = getR(material="exhaust", beta=beta)
+    kappa_1 = getKappa(Tt=T_t1, Ma=Ma_inlet, material="exhaust", beta=beta)
+    work = deltaP / mflow / R
+
+    T_t3 = T_t1 if T0 is None else T0
+    converged = False
+    for i in range(maxIter):
+        kappa_3 = getKappa(Tt=T_t3, Ma=Ma_outlet, material="exhaust", beta=beta)
+        kappa = (kappa_1 + kappa_3) / 2.
+        T_new = T_t1 - work / kappa * (kappa - 1)
+        converged = abs(T_new - T_t3) < tolerance * T_new
+        T_t3 = T_new
+        if converged:
+            break
+
+    p_t3 = polytrope(eta_pol=eta_pol, T1=T_t1, T2=T_t3, p1=p_t1, Ma=Ma_outlet, material="exhaust", beta=beta)
+    return {"T_t3": T_t3,
+            "p_t3": p_t3,
+            "kappa": kappa,
+            "kappa_1": kappa_1,
+            "kappa_3": kappa_3,
+            "R": R,
+            "converged": converged,
+            "iterations": i + 1}
 
 
 # ===============================================================================
@@ -100,6 +183,9 @@ class Turbine(AbstractTurbo):
         self.initialize(self.aeroInputParams)
         self.initialize(self.aeroOutputParams)
 
+        # Parameters proportional to the mass flow
+        self.massflowParams = ["mflow", "deltaP"]
+
         # Default Values
         self.T_t1 = 1000.0
         self.p_t1 = 101325
@@ -115,31 +201,38 @@ class Turbine(AbstractTurbo):
         self.Ma_inlet = 0.4
         self.Ma_outlet = 0.4
 
+        # True: Iteration mit der Loesung der letzten Rechnung starten (Kontinuation, siehe continuation.py)
+        self.warmStart = False
+        self.solverStart = None
+
+    @cachedCalculation("thermo")
     def calcThermo(self):
         self.check(self.thermoInputParams)
 
-        self.R = getR(material="exhaust", beta=self.beta)
-
-        kappa_1 = getKappa(Tt=self.T_t1, Ma=self.Ma_inlet, material="exhaust", beta=self.beta)
-
-        # Diese Iteration ist nötig um das kappa am Austritt entsprechend der Totaltemperatur am Austritt zu berechnen
-        def iterate_fun(T_t3):
-            kappa_3 = getKappa(Tt=T_t3, Ma=self.Ma_outlet, material="exhaust", beta=self.beta)
-            self.kappa = (kappa_1 + kappa_3) / 2.
-
-            self.T_t3 = self.T_t1 - self.deltaP / self.mflow / self.R / self.kappa * (self.kappa - 1)
-
-            return T_t3 - self.T_t3
-
-        self.T_t3 = float(fsolve(iterate_fun, [self.T_t1]))
+        # Austrittszustand inkl. kappa am Austritt (Iteration ueber T_t3, siehe solveTurbineWork)
+        start = {}
+        if self.warmStart and self.solverStart is not None:
+            start = self.solverStart
+        result = solveTurbineWork(self.deltaP, self.mflow, self.T_t1, self.p_t1, self.beta, self.eta_pol,
+                                  Ma_inlet=self.Ma_inlet, Ma_outlet=self.Ma_outlet, **start)
+        self.solverIterations = int(result["iterations"])
+        if not result["converged"]:
+            raise Exception("Max. Iteration exceeded -> Turbine outlet temperature did not converge.")
+        self.solverStart = {"T0": float(result["T_t3"])}
+
+        self.R = float(result["R"])
+        self.kappa_1 = float(result["kappa_1"])
+        self.kappa_3 = float(result["kappa_3"])
+        self.kappa = float(result["kappa"])
+        self.T_t3 = float(result["T_t3"])
 
         self.T_t2 = self.T_t1  # Adiabates Leitrad
 
-        self.p_t3 = polytrope(eta_pol=self.eta_pol, T1=self.T_t1, T2=self.T_t3, p1=self.p_t1, Ma=self.Ma_outlet,
-                              material="exhaust", beta=self.beta)
+        self.p_t3 = float(result["p_t3"])
 
         self.check(self.thermoOutputParams)
 
+    @cachedCalculation("aero")
     def calcAero(self):
         self.check(self.aeroInputParams)
 
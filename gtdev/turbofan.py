@@ -14,6 +14,7 @@ import numpy
 from .abstract import *
 import gtdev.compressor, gtdev.turbine, gtdev.combChamber, gtdev.nozzle
 from .helper_methods import *
+from .resultCache import cachedCalculation
 import sys
 
 
@@ -100,6 +101,16 @@ class Turbofan(AbstractTurbo):
         self.Pi_splitter = 0.95
         self.Pi_inlet = 0.95
 
+        # True: Kreisprozess einmal fuer 1 kg/s rechnen und skalieren, False: Iteration des Massenstroms mit fsolve
+        self.useSpecificCycle = True
+
+        # Parameters proportional to the mass flow
+        self.massflowParams = ["mflow", "mflow_h", "mflow_c", "mflow_f", "F_fan", "F_main", "F"]
+
+        # Settings outside the parameter lists (see AbstractTurbo.cacheKeyParams)
+        self.cacheKeyParams = [["kappa_inf", "R_inf", "useSpecificCycle"], []]
+
+    @cachedCalculation("thermo")
     def calcThermo(self):
         """Diese Methode berechnet die Eckdaten des Kreisprozesses"""
 
@@ -124,154 +135,168 @@ class Turbofan(AbstractTurbo):
         # Total pressure inlet engine
         self.p_tinf = self.p_inf * (1 + (self.kappa_inf - 1) / 2 * Ma_0 ** 2) ** (self.kappa_inf / (self.kappa_inf - 1))
 
-        # Totaltemperaturverhältnis der Brennkammer (dim.loses T_t4)
-        tau_lambda = self.combc.T_t3 / self.T_inf
-
-        # Totaltemperaturverhältnis der Anströmung
-        tau_0 = 1.0 + (self.kappa_inf - 1.0) / 2.0 * Ma_0 ** 2.0
-
-        # Fantemperatur (dimensionslos), berechnet über das vorgegebene Druckverhältnis
-        tau_Fan = self.fan.Pi ** ((self.fan.kappa - 1.0) / self.fan.kappa)
-
-        # Totaltemperaturverh. des Verdichters
-        tau_Comp = (self.fan.Pi * self.hpc.Pi) ** ((self.hpc.kappa - 1.0) / self.hpc.kappa)
-
-        # Spezifischer Schub
-        F_s = a_0 / (1.0 + self.bypassRatio) * \
-              (numpy.sqrt(2.0 / (self.kappa_inf - 1.0) * (
-                  (tau_lambda - tau_0 * ((tau_Comp - 1.0) + self.bypassRatio * (tau_Fan - 1.0))) - (
-                      tau_lambda / tau_0 / tau_Comp))) \
-               + self.bypassRatio * numpy.sqrt(2.0 / (self.kappa_inf - 1.0) * (tau_0 * tau_Fan - 1.0)) \
-               - Ma_0 * (1.0 + self.bypassRatio))
-
-        # Heissmassenstrom
-        self.mflow_h = self.thrust / F_s / (1.0 + self.bypassRatio)
-
-        # Kaltmassenstrom
-        self.mflow_c = self.mflow_h * self.bypassRatio
+        if self.useSpecificCycle:
+            # Spezifischer Kreisprozess: Komponentenkette fuer 1 kg/s rechnen und auf den Schub skalieren
+            self.mflow = 1.0
+            self.calcCycle()
+            self.checkThrust()
+            self.scaleMassflow(self.thrust / self.F)
+        else:
+            # Totaltemperaturverhältnis der Brennkammer (dim.loses T_t4)
+            tau_lambda = self.combc.T_t3 / self.T_inf
+
+            # Totaltemperaturverhältnis der Anströmung
+            tau_0 = 1.0 + (self.kappa_inf - 1.0) / 2.0 * Ma_0 ** 2.0
+
+            # Fantemperatur (dimensionslos), berechnet über das vorgegebene Druckverhältnis (Produkt der Stufen bei
+            # mehrstufigen Verdichtern)
+            tau_Fan = numpy.prod(self.fan.Pi) ** ((self.fan.kappa - 1.0) / self.fan.kappa)
+
+            # Totaltemperaturverh. des Verdichters
+            tau_Comp = (numpy.prod(self.fan.Pi) * numpy.prod(self.hpc.Pi)) ** ((self.hpc.kappa - 1.0) / self.hpc.kappa)
+
+            # Spezifischer Schub
+            F_s = a_0 / (1.0 + self.bypassRatio) * \
+                  (numpy.sqrt(2.0 / (self.kappa_inf - 1.0) * (
+                      (tau_lambda - tau_0 * ((tau_Comp - 1.0) + self.bypassRatio * (tau_Fan - 1.0))) - (
+                          tau_lambda / tau_0 / tau_Comp))) \
+                   + self.bypassRatio * numpy.sqrt(2.0 / (self.kappa_inf - 1.0) * (tau_0 * tau_Fan - 1.0)) \
+                   - Ma_0 * (1.0 + self.bypassRatio))
+
+            # Heissmassenstrom
+            self.mflow_h = self.thrust / F_s / (1.0 + self.bypassRatio)
+
+            # Kaltmassenstrom
+            self.mflow_c = self.mflow_h * self.bypassRatio
+
+            # Gesamtmassenstrom
+            self.mflow = self.mflow_h + self.mflow_c
+
+            # iteration massenstrom
+            def iterate_fun(mflow):
+                self.mflow = float(mflow)
+                self.calcCycle()
+                return self.F - self.thrust
+
+            try:
+                self.mflow = fsolve(iterate_fun, self.mflow)
+                if type(self.mflow) == 'list':
+                    self.mflow = self.mflow[0]
+            except:
+                if str(sys.exc_info()[1]) == "Error occured while calling the Python function named iterate_fun":
+                    raise Exception("Thrust iteration didn't converge. Cycle impossible / Thrust too high.")
+                    print(sys.exc_info())
 
-        # Gesamtmassenstrom
-        self.mflow = self.mflow_h + self.mflow_c
-
-        # iteration massenstrom
-        def iterate_fun(mflow):
-
-            self.mflow = float(mflow)
-
-            self.mflow_h = self.mflow / (self.bypassRatio + 1)
+        # SFC
+        self.SFC = self.combc.mflow_f * 3600. / self.F * 1000.
 
-            self.mflow_c = self.mflow * self.bypassRatio / (self.bypassRatio + 1)
+        self.mflow_f = self.combc.beta * self.mflow_h
 
-            # Initialisiere Massenströme der Komponenten
-            self.fan.mflow = self.mflow
-            self.hpc.mflow = self.mflow_h
-            self.combc.mflow = self.mflow_h
-            self.cn.mflow = self.mflow_c
+        # Thermischer Wirkungsgrad
+        self.eta_th = ((self.mflow_h + self.combc.mflow_f) * self.c_9 ** 2 + (
+            self.mflow_c) * self.c_19 ** 2 - self.mflow * self.c_0 ** 2) / 2. / self.combc.deltaP
 
-            # Berechne Thermodynamischen Kreisprozess
-            # low pressure compressor
-            self.fan.p_t1 = self.p_tinf * self.Pi_inlet
-            self.fan.T_t1 = self.T_tinf
-            self.fan.calcThermo()
+        # Vortriebswirkungsgrad
+        self.eta_p = 2. * (self.F * self.c_0) / ((
+                                                     self.mflow_h + self.combc.beta * self.mflow_h) * self.c_9 ** 2 + self.mflow_c * self.c_19 ** 2 - self.mflow * self.c_0 ** 2)
 
-            # high pressure compressor
-            self.hpc.p_t1 = self.fan.p_t3 * self.Pi_splitter
-            self.hpc.T_t1 = self.fan.T_t3
-            self.hpc.calcThermo()
+        # Gesamtwirkungsgrad
+        self.eta_tot = self.eta_p * self.eta_th
 
-            # combustion chamber
-            self.combc.p_t1 = self.hpc.p_t3
-            self.combc.T_t1 = self.hpc.T_t3
-            self.combc.calcThermo()
+        self.check(self.thermoOutputParams)
 
-            self.hpt.mflow = self.mflow_h + self.combc.beta * self.mflow_h
-            self.lpt.mflow = self.mflow_h + self.combc.beta * self.mflow_h
-            self.hn.mflow = self.mflow_h + self.combc.beta * self.mflow_h
+    def calcCycle(self):
+        """Diese Methode berechnet die Komponentenkette fuer den aktuellen Gesamtmassenstrom self.mflow"""
 
-            # high pressure turbine
-            self.hpt.R = self.combc.R_ex
-            self.hpt.p_t1 = self.combc.p_t3
-            self.hpt.T_t1 = self.combc.T_t3
-            self.hpt.deltaP = self.hpc.deltaP / self.eta_mech_hps
-            self.hpt.beta = self.combc.beta
-            self.hpt.calcThermo()
+        self.mflow_h = self.mflow / (self.bypassRatio + 1)
 
-            # low pressure turbine
-            self.lpt.R = self.combc.R_ex
-            self.lpt.p_t1 = self.hpt.p_t3
-            self.lpt.T_t1 = self.hpt.T_t3
-            self.lpt.deltaP = self.fan.deltaP / self.eta_mech_lps
-            self.lpt.beta = self.combc.beta
-            self.lpt.calcThermo()
+        self.mflow_c = self.mflow * self.bypassRatio / (self.bypassRatio + 1)
 
-            # hot nozzle
-            self.hn.R = self.combc.R_ex
-            self.hn.T_t1 = self.lpt.T_t3
-            self.hn.p_t1 = self.lpt.p_t3
-            self.hn.beta = self.combc.beta
-            self.hn.calcThermo()
+        # Initialisiere Massenströme der Komponenten
+        self.fan.mflow = self.mflow
+        self.hpc.mflow = self.mflow_h
+        self.combc.mflow = self.mflow_h
+        self.cn.mflow = self.mflow_c
 
-            # cold nozzle
-            self.cn.R = self.combc.R_ex
-            self.cn.T_t1 = self.fan.T_t3
-            self.cn.p_t1 = self.fan.p_t3 * self.Pi_splitter
-            self.cn.calcThermo()
+        # Berechne Thermodynamischen Kreisprozess
+        # low pressure compressor
+        self.fan.p_t1 = self.p_tinf * self.Pi_inlet
+        self.fan.T_t1 = self.T_tinf
+        self.fan.updateThermo()
 
-            # schub berechnen
-            # Ma cold nozzle outlet
-            self.Ma_19 = (((self.cn.p_t3 / self.p_inf) ** ((self.fan.kappa - 1) / self.fan.kappa) - 1) * 2 / (
-                self.fan.kappa - 1)) ** 0.5
+        # high pressure compressor
+        self.hpc.p_t1 = self.fan.p_t3 * self.Pi_splitter
+        self.hpc.T_t1 = self.fan.T_t3
+        self.hpc.updateThermo()
 
-            self.T_19 = self.fan.T_t3 / (1 + (self.fan.kappa - 1) / 2 * self.Ma_19 ** 0.5)
+        # combustion chamber
+        self.combc.p_t1 = self.hpc.p_t3
+        self.combc.T_t1 = self.hpc.T_t3
+        self.combc.updateThermo()
 
-            self.a_19 = (self.fan.kappa * self.R_inf * self.T_19) ** 0.5
+        self.hpt.mflow = self.mflow_h + self.combc.beta * self.mflow_h
+        self.lpt.mflow = self.mflow_h + self.combc.beta * self.mflow_h
+        self.hn.mflow = self.mflow_h + self.combc.beta * self.mflow_h
 
-            self.c_19 = self.Ma_19 * self.a_19
+        # high pressure turbine
+        self.hpt.R = self.combc.R_ex
+        self.hpt.p_t1 = self.combc.p_t3
+        self.hpt.T_t1 = self.combc.T_t3
+        self.hpt.deltaP = self.hpc.deltaP / self.eta_mech_hps
+        self.hpt.beta = self.combc.beta
+        self.hpt.updateThermo()
 
-            self.F_fan = (self.c_19 - self.c_0) * self.mflow_c
+        # low pressure turbine
+        self.lpt.R = self.combc.R_ex
+        self.lpt.p_t1 = self.hpt.p_t3
+        self.lpt.T_t1 = self.hpt.T_t3
+        self.lpt.deltaP = self.fan.deltaP / self.eta_mech_lps
+        self.lpt.beta = self.combc.beta
+        self.lpt.updateThermo()
 
-            # Ma hot nozzle outlet
-            self.Ma_9 = (((self.hn.p_t3 / self.p_inf) ** ((self.lpt.kappa - 1) / self.lpt.kappa) - 1) * 2 / (
-                self.lpt.kappa - 1)) ** 0.5
+        # hot nozzle
+        self.hn.R = self.combc.R_ex
+        self.hn.T_t1 = self.lpt.T_t3
+        self.hn.p_t1 = self.lpt.p_t3
+        self.hn.beta = self.combc.beta
+        self.hn.updateThermo()
 
-            self.T_9 = self.lpt.T_t3 / (1 + (self.lpt.kappa - 1) / 2 * self.Ma_9 ** 0.5)
+        # cold nozzle
+        self.cn.R = self.combc.R_ex
+        self.cn.T_t1 = self.fan.T_t3
+        self.cn.p_t1 = self.fan.p_t3 * self.Pi_splitter
+        self.cn.updateThermo()
 
-            self.a_9 = (self.lpt.kappa * self.combc.R_ex * self.T_9) ** 0.5
+        # schub berechnen
+        # Ma cold nozzle outlet (nan ohne Expansion in der Duese, see checkThrust)
+        Ma_19_sq = ((self.cn.p_t3 / self.p_inf) ** ((self.fan.kappa - 1) / self.fan.kappa) - 1) * 2 / (
+            self.fan.kappa - 1)
+        self.Ma_19 = Ma_19_sq ** 0.5 if Ma_19_sq >= 0.0 else float("nan")
 
-            self.c_9 = self.Ma_9 * self.a_9
+        self.T_19 = self.fan.T_t3 / (1 + (self.fan.kappa - 1) / 2 * self.Ma_19 ** 0.5)
 
-            self.F_main = (self.c_9 - self.c_0) * (self.mflow_h + self.combc.beta * self.mflow_h)
+        self.a_19 = (self.fan.kappa * self.R_inf * self.T_19) ** 0.5
 
-            self.F = self.F_main + self.F_fan
-            return self.F - self.thrust
+        self.c_19 = self.Ma_19 * self.a_19
 
-        try:
-            self.mflow = fsolve(iterate_fun, self.mflow)
-            if type(self.mflow) == 'list':
-                self.mflow = self.mflow[0]
-        except:
-            if str(sys.exc_info()[1]) == "Error occured while calling the Python function named iterate_fun":
-                raise Exception("Thrust iteration didn't converge. Cycle impossible / Thrust too high.")
-                print(sys.exc_info())
+        self.F_fan = (self.c_19 - self.c_0) * self.mflow_c
 
-        # SFC
-        self.SFC = self.combc.mflow_f * 3600. / self.F * 1000.
+        # Ma hot nozzle outlet (nan ohne Expansion in der Duese, see checkThrust)
+        Ma_9_sq = ((self.hn.p_t3 / self.p_inf) ** ((self.lpt.kappa - 1) / self.lpt.kappa) - 1) * 2 / (
+            self.lpt.kappa - 1)
+        self.Ma_9 = Ma_9_sq ** 0.5 if Ma_9_sq >= 0.0 else float("nan")
 
-        self.mflow_f = self.combc.beta * self.mflow_h
+        self.T_9 = self.lpt.T_t3 / (1 + (self.lpt.kappa - 1) / 2 * self.Ma_9 ** 0.5)
 
-        # Thermischer Wirkungsgrad
-        self.eta_th = ((self.mflow_h + self.combc.mflow_f) * self.c_9 ** 2 + (
-            self.mflow_c) * self.c_19 ** 2 - self.mflow * self.c_0 ** 2) / 2. / self.combc.deltaP
+        self.a_9 = (self.lpt.kappa * self.combc.R_ex * self.T_9) ** 0.5
 
-        # Vortriebswirkungsgrad
-        self.eta_p = 2. * (self.F * self.c_0) / ((
-                                                     self.mflow_h + self.combc.beta * self.mflow_h) * self.c_9 ** 2 + self.mflow_c * self.c_19 ** 2 - self.mflow * self.c_0 ** 2)
+        self.c_9 = self.Ma_9 * self.a_9
 
-        # Gesamtwirkungsgrad
-        self.eta_tot = self.eta_p * self.eta_th
+        self.F_main = (self.c_9 - self.c_0) * (self.mflow_h + self.combc.beta * self.mflow_h)
 
-        self.check(self.thermoOutputParams)
+        self.F = self.F_main + self.F_fan
 
+    @cachedCalculation("aero")
     def calcAero(self):
         """Diese Methode berechnet die Aerodynamischen Eckdaten der Komponenten"""
 
@@ -566,6 +591,13 @@ class Turbofan_Recalc(AbstractTurbo):
         self.Pi_splitter = 0.95
         self.Pi_inlet = 0.95
 
+        # Parameters proportional to the mass flow
+        self.massflowParams = ["mflow", "mflow_h", "mflow_c", "mflow_f", "F_fan", "F_main", "F"]
+
+        # Settings outside the parameter lists (see AbstractTurbo.cacheKeyParams)
+        self.cacheKeyParams = [["kappa_inf", "R_inf"], []]
+
+    @cachedCalculation("thermo")
     def calcThermo(self):
         """Diese Methode berechnet die Eckdaten des Kreisprozesses"""
 
@@ -590,6 +622,27 @@ class Turbofan_Recalc(AbstractTurbo):
         # Total pressure inlet engine
         self.p_tinf = self.p_inf * (1 + (self.kappa_inf - 1) / 2 * Ma_0 ** 2) ** (self.kappa_inf / (self.kappa_inf - 1))
 
+        self.calcCycle()
+
+        # SFC
+        self.SFC = self.combc.mflow_f * 3600. / self.F * 1000.
+
+        # Thermischer Wirkungsgrad
+        self.eta_th = ((self.mflow_h + self.combc.mflow_f) * self.c_9 ** 2 + (
+            self.mflow_c) * self.c_19 ** 2 - self.mflow * self.c_0 ** 2) / 2. / self.combc.deltaP
+
+        # Vortriebswirkungsgrad
+        self.eta_p = 2. * (self.F * self.c_0) / ((
+                                                     self.mflow_h + self.combc.beta * self.mflow_h) * self.c_9 ** 2 + self.mflow_c * self.c_19 ** 2 - self.mflow * self.c_0 ** 2)
+
+        # Gesamtwirkungsgrad
+        self.eta_tot = self.eta_p * self.eta_th
+
+        self.check(self.thermoOutputParams)
+
+    def calcCycle(self):
+        """Diese Methode berechnet die Komponentenkette fuer den aktuellen Gesamtmassenstrom self.mflow"""
+
         self.mflow_h = self.mflow / (self.bypassRatio + 1)
 
         self.mflow_c = self.mflow * self.bypassRatio / (self.bypassRatio + 1)
@@ -604,17 +657,17 @@ class Turbofan_Recalc(AbstractTurbo):
         # low pressure compressor
         self.fan.p_t1 = self.p_tinf * self.Pi_inlet
         self.fan.T_t1 = self.T_tinf
-        self.fan.calcThermo()
+        self.fan.updateThermo()
 
         # high pressure compressor
         self.hpc.p_t1 = self.fan.p_t3 * self.Pi_splitter
         self.hpc.T_t1 = self.fan.T_t3
-        self.hpc.calcThermo()
+        self.hpc.updateThermo()
 
         # combustion chamber
         self.combc.p_t1 = self.hpc.p_t3
         self.combc.T_t1 = self.hpc.T_t3
-        self.combc.calcThermo()
+        self.combc.updateThermo()
 
         self.hpt.mflow = self.mflow_h + self.combc.beta * self.mflow_h
         self.lpt.mflow = self.mflow_h + self.combc.beta * self.mflow_h
@@ -626,7 +679,7 @@ class Turbofan_Recalc(AbstractTurbo):
         self.hpt.T_t1 = self.combc.T_t3
         self.hpt.deltaP = self.hpc.deltaP / self.eta_mech_hps
         self.hpt.beta = self.combc.beta
-        self.hpt.calcThermo()
+        self.hpt.updateThermo()
 
         # low pressure turbine
         self.lpt.R = self.combc.R_ex
@@ -634,25 +687,26 @@ class Turbofan_Recalc(AbstractTurbo):
         self.lpt.T_t1 = self.hpt.T_t3
         self.lpt.deltaP = self.fan.deltaP / self.eta_mech_lps
         self.lpt.beta = self.combc.beta
-        self.lpt.calcThermo()
+        self.lpt.updateThermo()
 
         # hot nozzle
         self.hn.R = self.combc.R_ex
         self.hn.T_t1 = self.lpt.T_t3
         self.hn.p_t1 = self.lpt.p_t3
         self.hn.beta = self.combc.beta
-        self.hn.calcThermo()
+        self.hn.updateThermo()
 
         # cold nozzle
         self.cn.R = self.R_inf
         self.cn.T_t1 = self.fan.T_t3
         self.cn.p_t1 = self.fan.p_t3 * self.Pi_splitter
-        self.cn.calcThermo()
+        self.cn.updateThermo()
 
         # schub berechnen
-        # Ma cold nozzle outlet
-        self.Ma_19 = (((self.cn.p_t3 / self.p_inf) ** ((self.fan.kappa - 1) / self.fan.kappa) - 1) * 2 / (
-            self.fan.kappa - 1)) ** 0.5
+        # Ma cold nozzle outlet (nan ohne Expansion in der Duese, see checkThrust)
+        Ma_19_sq = ((self.cn.p_t3 / self.p_inf) ** ((self.fan.kappa - 1) / self.fan.kappa) - 1) * 2 / (
+            self.fan.kappa - 1)
+        self.Ma_19 = Ma_19_sq ** 0.5 if Ma_19_sq >= 0.0 else float("nan")
 
         self.T_19 = self.fan.T_t3 / (1 + (self.fan.kappa - 1) / 2 * self.Ma_19 ** 0.5)
 
@@ -662,9 +716,10 @@ class Turbofan_Recalc(AbstractTurbo):
 
         self.F_fan = (self.c_19 - self.c_0) * self.mflow_c
 
-        # Ma hot nozzle outlet
-        self.Ma_9 = (((self.hn.p_t3 / self.p_inf) ** ((self.lpt.kappa_3 - 1) / self.lpt.kappa_3) - 1) * 2 / (
-            self.lpt.kappa_3 - 1)) ** 0.5
+        # Ma hot nozzle outlet (nan ohne Expansion in der Duese, see checkThrust)
+        Ma_9_sq = ((self.hn.p_t3 / self.p_inf) ** ((self.lpt.kappa_3 - 1) / self.lpt.kappa_3) - 1) * 2 / (
+            self.lpt.kappa_3 - 1)
+        self.Ma_9 = Ma_9_sq ** 0.5 if Ma_9_sq >= 0.0 else float("nan")
 
         self.T_9 = self.lpt.T_t3 / (1 + (self.lpt.kappa_3 - 1) / 2 * self.Ma_9 ** 0.5)
 
@@ -678,22 +733,20 @@ class Turbofan_Recalc(AbstractTurbo):
 
         self.F = self.F_main + self.F_fan
 
-        # SFC
-        self.SFC = self.combc.mflow_f * 3600. / self.F * 1000.
-
-        # Thermischer Wirkungsgrad
-        self.eta_th = ((self.mflow_h + self.combc.mflow_f) * self.c_9 ** 2 + (
-            self.mflow_c) * self.c_19 ** 2 - self.mflow * self.c_0 ** 2) / 2. / self.combc.deltaP
-
-        # Vortriebswirkungsgrad
-        self.eta_p = 2. * (self.F * self.c_0) / ((
-                                                     self.mflow_h + self.combc.beta * self.mflow_h) * self.c_9 ** 2 + self.mflow_c * self.c_19 ** 2 - self.mflow * self.c_0 ** 2)
-
-        # Gesamtwirkungsgrad
-        self.eta_tot = self.eta_p * self.eta_th
-
-        self.check(self.thermoOutputParams)
-
+    ## Diese Methode bestimmt den Massenstrom fuer den geforderten Schub ohne aeussere Iteration
+    #
+    # Der Kreisprozess wird mit dem aktuellen Massenstrom (1 kg/s falls nicht gesetzt) gerechnet und anschliessend
+    # auf den Schub skaliert, da alle spezifischen Groessen unabhaengig vom Massenstrom sind.
+    # @param thrust
+    #	geforderter Gesamtschub [N]
+    def sizeToThrust(self, thrust):
+        if self.mflow is None:
+            self.mflow = 1.0
+        self.calcThermo()
+        self.checkThrust()
+        self.scaleMassflow(thrust / self.F)
+
+    @cachedCalculation("aero")
     def calcAero(self):
         """Diese Methode berechnet die Aerodynamischen Eckdaten der Komponenten"""
 
@@ -14,6 +14,7 @@ import numpy
 from gtdev.abstract import *
 import gtdev.compressor, gtdev.turbine, gtdev.combChamber, gtdev.nozzle
 from gtdev.helper_methods import *
+from gtdev.resultCache import cachedCalculation
 import sys
 
 
@@ -80,6 +81,16 @@ class Turbojet(AbstractTurbo):
         self.c_0 = 0.0
         self.Pi_inlet = 0.95
 
+        # True: Kreisprozess einmal fuer 1 kg/s rechnen und skalieren, False: Iteration des Massenstroms mit fsolve
+        self.useSpecificCycle = True
+
+        # Parameters proportional to the mass flow
+        self.massflowParams = ["mflow", "F"]
+
+        # Settings outside the parameter lists (see AbstractTurbo.cacheKeyParams)
+        self.cacheKeyParams = [["kappa_inf", "R_inf", "useSpecificCycle"], []]
+
+    @cachedCalculation("thermo")
     def calcThermo(self):
         """Diese Methode berechnet die Eckdaten des Kreisprozesses"""
 
@@ -102,68 +113,30 @@ class Turbojet(AbstractTurbo):
         # Total pressure inlet engine
         self.p_tinf = self.p_inf * (1 + (self.kappa_inf - 1) / 2 * Ma_0 ** 2) ** (self.kappa_inf / (self.kappa_inf - 1))
 
-        # Gesamtmassenstrom
-        mflow_start = 5.0
-
-        # iteration massenstrom
-        def iterate_fun(mflow):
-            self.mflow = float(mflow)
-
-            # Initialisiere Massenströme der Komponenten
-            self.hpc.mflow = self.mflow
-            self.combc.mflow = self.mflow
-
-            # high pressure compressor
-            self.hpc.p_t1 = self.p_tinf * self.Pi_inlet
-            self.hpc.T_t1 = self.T_tinf
-            self.hpc.calcThermo()
-
-            # combustion chamber
-            self.combc.p_t1 = self.hpc.p_t3
-            self.combc.T_t1 = self.hpc.T_t3
-            self.combc.calcThermo()
-
-            self.hpt.mflow = self.mflow + self.combc.beta * self.mflow
-            self.hn.mflow = self.mflow + self.combc.beta * self.mflow
-
-            # high pressure turbine
-            self.hpt.R = self.combc.R_ex
-            self.hpt.p_t1 = self.combc.p_t3
-            self.hpt.T_t1 = self.combc.T_t3
-            self.hpt.deltaP = self.hpc.deltaP / self.eta_mech_hps
-            self.hpt.beta = self.combc.beta
-            self.hpt.calcThermo()
-
-            # hot nozzle
-            self.hn.R = self.combc.R_ex
-            self.hn.T_t1 = self.hpt.T_t3
-            self.hn.p_t1 = self.hpt.p_t3
-            self.hn.beta = self.combc.beta
-            self.hn.calcThermo()
+        if self.useSpecificCycle:
+            # Spezifischer Kreisprozess: alle spezifischen Groessen sind unabhaengig vom Massenstrom, der Schub
+            # ist linear im Massenstrom -> Kreisprozess fuer 1 kg/s rechnen und auf den Schub skalieren
+            self.mflow = 1.0
+            self.calcCycle()
+            self.checkThrust()
+            self.scaleMassflow(self.thrust / self.F)
+        else:
+            # Gesamtmassenstrom
+            mflow_start = 5.0
 
-            # schub berechnen
+            # iteration massenstrom
+            def iterate_fun(mflow):
+                self.mflow = float(mflow)
+                self.calcCycle()
+                return self.F - self.thrust
 
-            # Ma hot nozzle outlet
-            self.Ma_9 = (((self.hn.p_t3 / self.p_inf) ** ((self.hpt.kappa - 1) / self.hpt.kappa) - 1) * 2 / (
-                self.hpt.kappa - 1)) ** 0.5
+            # try:
+            self.mflow = float(fsolve(iterate_fun, [mflow_start]))
 
-            self.T_9 = self.hpt.T_t3 / (1 + (self.hpt.kappa - 1) / 2 * self.Ma_9 ** 0.5)
-
-            self.a_9 = (self.hpt.kappa * self.combc.R_ex * self.T_9) ** 0.5
-
-            self.c_9 = self.Ma_9 * self.a_9
-
-            self.F = self.c_9 * self.mflow
-
-            return self.F - self.thrust
-
-        # try:
-        self.mflow = float(fsolve(iterate_fun, [mflow_start]))
-
-        # except:
-        # if str(sys.exc_info()[1])=="Error occured while calling the Python function named iterate_fun":
-        # raise Exception,"Thrust iteration didn't converge. Cycle impossible / Thrust too high."
-        # print sys.exc_info()
+            # except:
+            # if str(sys.exc_info()[1])=="Error occured while calling the Python function named iterate_fun":
+            # raise Exception,"Thrust iteration didn't converge. Cycle impossible / Thrust too high."
+            # print sys.exc_info()
 
 
         # Thermischer Wirkungsgrad (Strahlleistung/Wärmeeintrag)
@@ -183,6 +156,173 @@ class Turbojet(AbstractTurbo):
 
         self.check(self.thermoOutputParams)
 
+    def calcCycle(self):
+        """Diese Methode berechnet die Komponentenkette fuer den aktuellen Massenstrom self.mflow"""
+
+        # Initialisiere Massenströme der Komponenten
+        self.hpc.mflow = self.mflow
+        self.combc.mflow = self.mflow
+
+        # high pressure compressor
+        self.hpc.p_t1 = self.p_tinf * self.Pi_inlet
+        self.hpc.T_t1 = self.T_tinf
+        self.hpc.updateThermo()
+
+        # combustion chamber
+        self.combc.p_t1 = self.hpc.p_t3
+        self.combc.T_t1 = self.hpc.T_t3
+        self.combc.updateThermo()
+
+        self.hpt.mflow = self.mflow + self.combc.beta * self.mflow
+        self.hn.mflow = self.mflow + self.combc.beta * self.mflow
+
+        # high pressure turbine
+        self.hpt.R = self.combc.R_ex
+        self.hpt.p_t1 = self.combc.p_t3
+        self.hpt.T_t1 = self.combc.T_t3
+        self.hpt.deltaP = self.hpc.deltaP / self.eta_mech_hps
+        self.hpt.beta = self.combc.beta
+        self.hpt.updateThermo()
+
+        # hot nozzle
+        self.hn.R = self.combc.R_ex
+        self.hn.T_t1 = self.hpt.T_t3
+        self.hn.p_t1 = self.hpt.p_t3
+        self.hn.beta = self.combc.beta
+        self.hn.updateThermo()
+
+        # schub berechnen
+
+        # Ma hot nozzle outlet (nan ohne Expansion in der Duese, see checkThrust)
+        Ma_9_sq = ((self.hn.p_t3 / self.p_inf) ** ((self.hpt.kappa - 1) / self.hpt.kappa) - 1) * 2 / (
+            self.hpt.kappa - 1)
+        self.Ma_9 = Ma_9_sq ** 0.5 if Ma_9_sq >= 0.0 else float("nan")
+
+        self.T_9 = self.hpt.T_t3 / (1 + (self.hpt.kappa - 1) / 2 * self.Ma_9 ** 0.5)
+
+        self.a_9 = (self.hpt.kappa * self.combc.R_ex * self.T_9) ** 0.5
+
+        self.c_9 = self.Ma_9 * self.a_9
+
+        self.F = self.c_9 * self.mflow
+
+    ## Kreisprozess fuer viele Betriebspunkte auf einmal (struct of arrays)
+    #
+    # Same chain as calcThermo (specific cycle for 1 kg/s, scaled to the thrust) on numpy arrays: compressor
+    # (polytropeArray), combustion chamber (combChamber.solveCombustion), turbine (turbine.solveTurbineWork) and
+    # nozzle. The object itself is not changed, inputs that are not given are taken from the object.
+    # Points that fail (no convergence, no expansion in the nozzle, non finite values) are masked: "valid" is
+    # False and all outputs are nan, nothing is raised.
+    # The results match calcThermo within a relative deviation of 1e-8 (the solvers converge to 1e-10 and
+    # tighter, the gas properties are the same functions in both paths).
+    #
+    # @param inputs
+    #	dotted thermodynamic input paths (see getThermoInputPaths) with scalars or arrays (broadcast against
+    #	each other), e.g. calcThermoBatch(**{"hpc.Pi": numpy.linspace(3., 5., 100)})
+    # @return dictionary {dotted output path (see getThermoOutputPaths): array} and "valid" (bool array)
+    def calcThermoBatch(self, **inputs):
+        if isinstance(self.hpc, gtdev.compressor.MultiStageAxialCompressor):
+            raise Exception("Batch calculation does not support a multistage compressor as hpc")
+        paths = self.getThermoInputPaths()
+        for path in inputs:
+            if path not in paths:
+                raise Exception("Unknown input '" + path + "' for batch calculation, use one of " + str(paths))
+        values = numpy.broadcast_arrays(*[numpy.asarray(inputs[path] if path in inputs else self.getParameter(path),
+                                                        dtype=float) for path in paths])
+        x = dict(zip(paths, values))
+        results = {}
+
+        with numpy.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            # Eintrittszustand (kappa_inf wie in calcThermo)
+            a_0 = numpy.sqrt(self.kappa_inf * self.R_inf * x["T_inf"])
+            Ma_0 = x["c_0"] / a_0
+            T_tinf = x["T_inf"] * (1 + (self.kappa_inf - 1) / 2 * Ma_0 ** 2)
+            p_tinf = x["p_inf"] * (1 + (self.kappa_inf - 1) / 2 * Ma_0 ** 2) ** (self.kappa_inf / (self.kappa_inf - 1))
+
+            # high pressure compressor (1 kg/s)
+            R = getR()
+            p_t1 = p_tinf * x["Pi_inlet"]
+            results["hpc.p_t3"] = p_t1 * x["hpc.Pi"]
+            results["hpc.T_t3"] = polytropeArray(eta_pol=x["hpc.eta_pol"], T1=T_tinf, p1=p_t1,
+                                                 p2=results["hpc.p_t3"], Ma=x["hpc.Ma_outlet"])
+            kappa_1 = getKappaArray(T_tinf, x["hpc.Ma_inlet"])
+            kappa_3 = getKappaArray(results["hpc.T_t3"], x["hpc.Ma_outlet"])
+            results["hpc.R"] = numpy.full(T_tinf.shape, R)
+            results["hpc.deltaP"] = kappa_3 / (kappa_3 - 1.) * R * results["hpc.T_t3"] - \
+                                    kappa_1 / (kappa_1 - 1.) * R * T_tinf
+
+            # combustion chamber
+            combustion = gtdev.combChamber.solveCombustion(results["hpc.T_t3"], x["combc.T_t3"], mflow=1.0,
+                                                           H_f=x["combc.H_f"], eta_combc=x["combc.eta_combc"],
+                                                           Ma_inlet=x["combc.Ma_inlet"],
+                                                           Ma_outlet=x["combc.Ma_outlet"])
+            for name in ["deltaP", "R_ex", "beta", "lambda_air", "mflow_f"]:
+                results["combc." + name] = combustion[name]
+            results["combc.p_t3"] = results["hpc.p_t3"] * x["combc.Pi_Combc_fr"]
+            beta = combustion["beta"]
+
+            # high pressure turbine
+            turbine = gtdev.turbine.solveTurbineWork(results["hpc.deltaP"] / x["eta_mech_hps"], 1.0 + beta,
+                                                     x["combc.T_t3"], results["combc.p_t3"], beta, x["hpt.eta_pol"],
+                                                     Ma_inlet=x["hpt.Ma_inlet"], Ma_outlet=x["hpt.Ma_outlet"])
+            for name in ["kappa", "p_t3", "R", "T_t3"]:
+                results["hpt." + name] = turbine[name]
+            results["hpt.T_t2"] = x["combc.T_t3"]
+
+            # hot nozzle
+            results["hn.R"] = getRArray(material="exhaust", beta=beta)
+            results["hn.T_t3"] = turbine["T_t3"]
+            results["hn.p_t3"] = x["hn.Pi"] * turbine["p_t3"]
+
+            # spezifischer Schub (wie calcCycle)
+            kappa = turbine["kappa"]
+            Ma_9 = (((results["hn.p_t3"] / x["p_inf"]) ** ((kappa - 1) / kappa) - 1) * 2 / (kappa - 1)) ** 0.5
+            T_9 = turbine["T_t3"] / (1 + (kappa - 1) / 2 * Ma_9 ** 0.5)
+            c_9 = Ma_9 * (kappa * combustion["R_ex"] * T_9) ** 0.5
+
+            # Skalierung auf den Schub
+            mflow = x["thrust"] / c_9
+            for name in ["hpc.deltaP", "combc.deltaP", "combc.mflow_f"]:
+                results[name] = results[name] * mflow
+            results["mflow"] = mflow
+
+            # von der Komponentenkette gesetzte Eintrittsgroessen
+            results["hpc.mflow"] = mflow
+            results["hpc.T_t1"] = T_tinf
+            results["hpc.p_t1"] = p_t1
+            results["combc.mflow"] = mflow
+            results["combc.T_t1"] = results["hpc.T_t3"]
+            results["combc.p_t1"] = results["hpc.p_t3"]
+            results["hpt.mflow"] = mflow + beta * mflow
+            results["hpt.T_t1"] = x["combc.T_t3"]
+            results["hpt.p_t1"] = results["combc.p_t3"]
+            results["hpt.deltaP"] = results["hpc.deltaP"] / x["eta_mech_hps"]
+            results["hpt.beta"] = beta
+            results["hn.T_t1"] = turbine["T_t3"]
+            results["hn.p_t1"] = turbine["p_t3"]
+            results["hn.beta"] = beta
+
+            results["c_9"] = c_9
+            results["F"] = c_9 * mflow
+            results["p_tinf"] = p_tinf
+            results["T_tinf"] = T_tinf
+            results["eta_th"] = ((mflow + results["combc.mflow_f"]) * c_9 ** 2 - mflow * x["c_0"] ** 2) / 2. / \
+                                results["combc.deltaP"]
+            results["eta_p"] = 2. * (results["F"] * x["c_0"]) / (
+                mflow * x["c_0"] ** 2 - (mflow + beta * mflow) * c_9 ** 2)
+            results["eta_tot"] = results["eta_p"] * results["eta_th"]
+            results["SFC"] = results["combc.mflow_f"] * 3600. / results["F"] * 1000.
+
+        # ungueltige Punkte maskieren
+        valid = combustion["converged"] & turbine["converged"] & (c_9 > 0)
+        for name in results:
+            valid &= numpy.isfinite(results[name])
+        for name in results:
+            results[name] = numpy.where(valid, results[name], numpy.nan)
+        results["valid"] = valid
+        return results
+
+    @cachedCalculation("aero")
     def calcAero(self):
         """Diese Methode berechnet die Aerodynamischen Eckdaten der Komponenten"""
 
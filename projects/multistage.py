@@ -4,7 +4,12 @@
 # (c) Hummingbird, Institute for Flight Propulsion
 # Author: Sebastian Barthmes
 
-import math
+# Sechsstufiger Axialverdichter als MultiStageAxialCompressor (frueher eine Kette von CompressorAxial Objekten,
+# die Ergebnisse sind gleich, siehe tests/test_compressor.py)
+# Usage:
+#	python gtdev.py -t -f projects/multistage.py
+
+import numpy
 
 #Boundary Conditions
 MFLOW=0.28
@@ -24,84 +29,47 @@ C_3TOC_1=1.0
 DIFF_S=0.45
 DIFF_R=0.4
 
-#Initialize Objects
-comp=[]
-for n in range(STAGES):
-	exec("comp.append(compressor.CompressorAxial('"+str(n)+"'))")
-	comp[n].eta_is=ETA
-	comp[n].mflow=MFLOW
-	comp[n].n=N
-	comp[n].c_3toc_1=C_3TOC_1	
-	comp[n].diffusion_stator=DIFF_S
-	comp[n].diffusion_rotor=DIFF_R
-	comp[n].radius_const="casing"
+#Initialize Object
+comp=compressor.MultiStageAxialCompressor("multistage", STAGES)
+comp.eta_pol=ETA
+comp.mflow=MFLOW
+comp.n=N
+comp.c_3toc_1=C_3TOC_1
+comp.diffusion_stator=DIFF_S
+comp.diffusion_rotor=DIFF_R
+comp.radius_const="casing"
 
-#Setup Configuration
-comp[0].reaction=0.70
-comp[0].Pi=1.20
-comp[0].b_to_s_rotor=1.2
-comp[0].b_to_s_stator=1.7
-comp[1].reaction=0.72
-comp[1].Pi=1.19
-comp[1].b_to_s_rotor=1.2
-comp[1].b_to_s_stator=1.6
-comp[2].reaction=0.72
-comp[2].Pi=1.18
-comp[2].b_to_s_rotor=1.15
-comp[2].b_to_s_stator=1.5
-comp[3].reaction=0.72
-comp[3].Pi=1.17
-comp[3].b_to_s_rotor=1.1
-comp[3].b_to_s_stator=1.35
-comp[4].reaction=0.72
-comp[4].Pi=1.16
-comp[4].b_to_s_rotor=1.0
-comp[4].b_to_s_stator=1.2
-comp[5].reaction=0.72
-comp[5].Pi=1.15
-comp[5].b_to_s_rotor=0.9
-comp[5].b_to_s_stator=1.1
+#Setup Configuration (per stage)
+comp.reaction=numpy.array([0.70, 0.72, 0.72, 0.72, 0.72, 0.72])
+comp.Pi=numpy.array([1.20, 1.19, 1.18, 1.17, 1.16, 1.15])
+comp.b_to_s_rotor=numpy.array([1.2, 1.2, 1.15, 1.1, 1.0, 0.9])
+comp.b_to_s_stator=numpy.array([1.7, 1.6, 1.5, 1.35, 1.2, 1.1])
 
+#Calculate
+comp.T_t1=T_T1
+comp.p_t1=P_0
+comp.r_s1=R_S
+comp.r_h1=R_H
+comp.calcThermo()
+comp.calcAero()
 
-#Connect Components and Calculate
-comp[0].T_t1=T_T1
-comp[0].calcThermo()
-comp[0].p_t1=P_0
-comp[0].r_s1=R_S
-comp[0].r_h1=R_H
-comp[0].calcAero()
-P=comp[0].deltaP
-for n in range(1,STAGES):
-	comp[n].T_t1=comp[n-1].T_t3
-	comp[n].calcThermo()
-	comp[n].r_s1=comp[n-1].r_s3
-	comp[n].p_t1=comp[n-1].p_t3
-	comp[n].r_h1=comp[n-1].r_h3
-	comp[n].z_1=comp[n-1].z_3
-	comp[n].calcAero()
-	P+=comp[n].deltaP
-	
 #Calculate Blade Twist
-comp[0].calcBladeGeom(cuts=5,end=0,n_lay1=1,n_lay2=-1)
-comp[1].calcBladeGeom(cuts=5,preStageObj=comp[0],end=0,n_lay1=1,n_lay2=-1)
-comp[2].calcBladeGeom(cuts=5,preStageObj=comp[1],end=0,n_lay1=1,n_lay2=-1)
-comp[3].calcBladeGeom(cuts=5,preStageObj=comp[2],end=0,n_lay1=1,n_lay2=-1)
-comp[4].calcBladeGeom(cuts=5,preStageObj=comp[3],end=0,n_lay1=1,n_lay2=-1)
-comp[5].calcBladeGeom(cuts=5,preStageObj=comp[4],end=1,n_lay1=1,n_lay2=-1,n_lay3=1)
+comp.calcBladeGeom(cuts=5,n_lay1=1,n_lay2=-1,n_lay3=1)
 
 
 #Output
-print "\nPi (ges):",comp[0].Pi*comp[1].Pi*comp[2].Pi*comp[3].Pi*comp[4].Pi*comp[5].Pi
-print "deltaT_t:",comp[STAGES-1].T_t3-T_T1
-print "P (ges):       ",P
-for n in range(STAGES):
-	comp[n].printEverything()
+stages=comp.getStages()
+print("\nPi (ges):",comp.Pi_total)
+print("deltaT_t:",comp.T_t3-T_T1)
+print("P (ges):       ",comp.deltaP)
+for stage in stages:
+	stage.printEverything()
 for n in range(STAGES):
-	print "Stufe:",n+1
-	comp[n].printStage()
+	print("Stufe:",n+1)
+	stages[n].printStage()
 
 #BladeDesigner Export und Aufruf
-xml=bladeDesignerXML.BdXML(comp)
+xml=bladeDesignerXML.BdXML(stages)
 xml.writeTurboMachineXML("multistage")
 
 #try:
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# engines.py
+# Engines with complete boundary conditions for the tests.
+# imports:
+from gtdev import turbofan, turbojet
+
+## mass flow of the Turbofan design of makeTurbofan [kg/s] (start value of Turbofan_Recalc)
+TURBOFAN_MFLOW = 5.01163828844
+
+
+## small single spool Turbojet (120 N static thrust)
+def makeTurbojet(identification="TJ-70"):
+    turbo = turbojet.Turbojet(identification)
+    turbo.thrust = 120.0
+    turbo.T_inf = 288.15
+    turbo.Pi_inlet = 0.95
+    turbo.c_0 = 0.0
+    turbo.eta_mech_hps = 0.99
+    turbo.hpc.Ma_inlet = 0.4
+    turbo.hpc.eta_pol = 0.75
+    turbo.hpc.Pi = 3.9
+    turbo.combc.Ma_inlet = 0.2
+    turbo.combc.Ma_outlet = 0.4
+    turbo.combc.T_t3 = 1000.0
+    turbo.hpt.Ma_inlet = 0.4
+    turbo.hpt.Ma_outlet = 0.4
+    turbo.hpt.eta_pol = 0.8
+    turbo.hn.Pi = 0.95
+    return turbo
+
+
+## two spool Turbofan (800 N static thrust, bypass ratio 1)
+#
+# @param cls
+#	turbofan.Turbofan or turbofan.Turbofan_Recalc (mass flow set to TURBOFAN_MFLOW)
+def makeTurbofan(cls=turbofan.Turbofan, identification="TF-800"):
+    turbo = cls(identification)
+    turbo.thrust = 800.0
+    turbo.bypassRatio = 1.0
+    turbo.T_inf = 288.15
+    turbo.Pi_inlet = 0.95
+    turbo.Pi_splitter = 0.95
+    turbo.c_0 = 0.0
+    turbo.eta_mech_lps = 0.98
+    turbo.eta_mech_hps = 0.98
+    turbo.fan.Ma_inlet = 0.5
+    turbo.fan.Ma_outlet = 0.5
+    turbo.fan.eta_pol = 0.8
+    turbo.fan.Pi = 1.3
+    turbo.hpc.Ma_inlet = 0.5
+    turbo.hpc.Ma_outlet = 0.7
+    turbo.hpc.eta_pol = 0.85
+    turbo.hpc.Pi = 6.0
+    turbo.combc.Ma_inlet = 0.2
+    turbo.combc.Ma_outlet = 0.5
+    turbo.combc.T_t3 = 1400.0
+    turbo.hpt.Ma_inlet = 0.5
+    turbo.hpt.Ma_outlet = 0.5
+    turbo.hpt.eta_pol = 0.8
+    turbo.lpt.Ma_inlet = 0.45
+    turbo.lpt.Ma_outlet = 0.45
+    turbo.lpt.eta_pol = 0.8
+    turbo.hn.Pi = 0.95
+    turbo.cn.Pi = 0.95
+    if cls is turbofan.Turbofan_Recalc:
+        turbo.mflow = TURBOFAN_MFLOW
+    return turbo
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_abstract.py
+# State handling of AbstractTurbo: snapshots, transactions and clones.
+# imports:
+import unittest
+
+from tests.engines import makeTurbojet
+
+
+# Werte aller thermodynamischen Parameter (Ein- und Ausgaben) des Triebwerks und seiner Komponenten
+def getThermoState(turbo):
+    return dict((path, turbo.getParameter(path)) for path in turbo.getThermoInputPaths() +
+                turbo.getThermoOutputPaths())
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.turbo = makeTurbojet()
+        self.turbo.calcThermo()
+        self.state = getThermoState(self.turbo)
+
+    def testRestoreSnapshot(self):
+        snapshot = self.turbo.takeSnapshot()
+        hpc = self.turbo.hpc
+        self.turbo.hpc.Pi = 5.0
+        self.turbo.combc.T_t3 = 1200.0
+        self.turbo.calcThermo()
+        self.assertNotEqual(self.turbo.SFC, self.state["SFC"])
+        for i in range(2):  # ein Snapshot kann mehrfach zurueckgesetzt werden
+            self.turbo.restoreSnapshot(snapshot)
+            self.assertEqual(getThermoState(self.turbo), self.state)
+            self.assertIs(self.turbo.hpc, hpc)
+            self.turbo.hpc.Pi = 6.0
+
+    def testRestoreOtherComponent(self):
+        snapshot = makeTurbojet().takeSnapshot()
+        self.assertRaises(Exception, self.turbo.restoreSnapshot, snapshot)
+
+    def testTransaction(self):
+        with self.assertRaises(Exception):
+            with self.turbo.transaction():
+                self.turbo.hpc.Pi = 1.5
+                self.turbo.calcThermo()
+        self.assertEqual(getThermoState(self.turbo), self.state)
+
+    def testClone(self):
+        clone = self.turbo.clone()
+        self.assertEqual(getThermoState(clone), self.state)
+        self.assertIsNot(clone.hpc, self.turbo.hpc)
+        clone.hpc.Pi = 5.0
+        clone.calcThermo()
+        self.assertEqual(getThermoState(self.turbo), self.state)
+
+
+if __name__ == "__main__":
+    unittest.main()
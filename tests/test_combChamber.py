@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_combChamber.py
+# Energy balance of the combustion chamber (Newton solver) against the former fsolve iteration over beta.
+# imports:
+import unittest
+
+from scipy.optimize import fsolve
+
+from gtdev.combChamber import CombChamber
+from gtdev.helper_methods import getKappa, getR
+
+
+# beta aus der Energiebilanz wie frueher in CombChamber.calcThermo (fsolve, kappa_3 in jedem Schritt neu)
+def fixedPointBeta(chamber):
+    kappa_1 = getKappa(Tt=chamber.T_t1, Ma=chamber.Ma_inlet)
+    R = getR()
+
+    def iterate_fun(beta):
+        beta = float(beta[0])
+        kappa_3 = getKappa(Tt=chamber.T_t3, Ma=chamber.Ma_outlet, material="exhaust", beta=beta)
+        R_ex = 8314.472 * (0.034524 + beta * 0.035645) / (1 + beta)
+        deltaP = chamber.mflow * (kappa_3 / (kappa_3 - 1.) * R_ex * chamber.T_t3 - kappa_1 / (kappa_1 - 1.) * R *
+                                  chamber.T_t1)
+        return beta - deltaP / (chamber.H_f * chamber.eta_combc) / chamber.mflow
+
+    return float(fsolve(iterate_fun, [0.034])[0])
+
+
+class CombChamberTest(unittest.TestCase):
+    def testEnergyBalance(self):
+        for T_t1 in (400.0, 550.0, 700.0):
+            for T_t3 in (1000.0, 1400.0, 1800.0):
+                chamber = CombChamber("combc")
+                chamber.T_t1 = T_t1
+                chamber.T_t3 = T_t3
+                chamber.mflow = 2.0
+                chamber.calcThermo()
+                beta = fixedPointBeta(chamber)
+                self.assertAlmostEqual(chamber.beta / beta, 1.0, delta=1e-9, msg=str((T_t1, T_t3)))
+                self.assertAlmostEqual(chamber.mflow_f, chamber.beta * chamber.mflow, delta=1e-9 * chamber.mflow_f)
+                self.assertAlmostEqual(chamber.kappa_3, getKappa(Tt=T_t3, Ma=chamber.Ma_outlet, material="exhaust",
+                                                                 beta=chamber.beta), delta=1e-9)
+
+    def testWarmStart(self):
+        chamber = CombChamber("combc")
+        chamber.T_t1 = 550.0
+        chamber.T_t3 = 1400.0
+        chamber.mflow = 2.0
+        chamber.calcThermo()
+        beta = chamber.beta
+        chamber.warmStart = True
+        chamber.calcThermo()
+        self.assertAlmostEqual(chamber.beta / beta, 1.0, delta=1e-10)
+        self.assertLessEqual(chamber.solverIterations, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_compressor.py
+# MultiStageAxialCompressor against a chain of CompressorAxial stages (configuration of projects/multistage.py).
+# imports:
+import unittest
+
+import numpy
+
+from gtdev import compressor
+
+# Stufenwerte aus projects/multistage.py
+PI = [1.20, 1.19, 1.18, 1.17, 1.16, 1.15]
+REACTION = [0.70, 0.72, 0.72, 0.72, 0.72, 0.72]
+B_TO_S_ROTOR = [1.2, 1.2, 1.15, 1.1, 1.0, 0.9]
+B_TO_S_STATOR = [1.7, 1.6, 1.5, 1.35, 1.2, 1.1]
+
+
+# gemeinsame Randbedingungen aller Stufen
+def setCommon(comp):
+    comp.eta_pol = 0.75
+    comp.mflow = 0.28
+    comp.n = 90000.0
+    comp.c_3toc_1 = 1.0
+    comp.diffusion_stator = 0.45
+    comp.diffusion_rotor = 0.4
+    comp.radius_const = "casing"
+
+
+def makeMultiStage():
+    comp = compressor.MultiStageAxialCompressor("multistage", len(PI))
+    setCommon(comp)
+    comp.Pi = numpy.array(PI)
+    comp.reaction = numpy.array(REACTION)
+    comp.b_to_s_rotor = numpy.array(B_TO_S_ROTOR)
+    comp.b_to_s_stator = numpy.array(B_TO_S_STATOR)
+    comp.T_t1 = 293.15
+    comp.p_t1 = 101325.0
+    comp.r_s1 = 0.03
+    comp.r_h1 = 0.015
+    comp.calcThermo()
+    comp.calcAero()
+    comp.calcBladeGeom(cuts=5, n_lay1=1, n_lay2=-1, n_lay3=1)
+    return comp
+
+
+# die Stufen einzeln gerechnet, der Austritt einer Stufe ist der Eintritt der folgenden
+def makeStageChain():
+    stages = []
+    for k in range(len(PI)):
+        stage = compressor.CompressorAxial(str(k))
+        setCommon(stage)
+        stage.Pi = PI[k]
+        stage.reaction = REACTION[k]
+        stage.b_to_s_rotor = B_TO_S_ROTOR[k]
+        stage.b_to_s_stator = B_TO_S_STATOR[k]
+        if k == 0:
+            stage.T_t1 = 293.15
+            stage.p_t1 = 101325.0
+            stage.r_s1 = 0.03
+            stage.r_h1 = 0.015
+        else:
+            stage.T_t1 = stages[-1].T_t3
+            stage.p_t1 = stages[-1].p_t3
+            stage.r_s1 = stages[-1].r_s3
+            stage.r_h1 = stages[-1].r_h3
+            stage.z_1 = stages[-1].z_3
+        stage.calcThermo()
+        stage.calcAero()
+        stages.append(stage)
+    for k, stage in enumerate(stages):
+        stage.calcBladeGeom(cuts=5, preStageObj=stages[k - 1] if k > 0 else None, end=int(k == len(stages) - 1),
+                            n_lay1=1, n_lay2=-1, n_lay3=1)
+    return stages
+
+
+class MultiStageAxialCompressorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.multiStage = makeMultiStage()
+        cls.chain = makeStageChain()
+
+    def testStages(self):
+        for k, reference in enumerate(self.chain):
+            stage = self.multiStage.getStage(k)
+            for item in reference.thermoOutputParams + reference.aeroOutputParams:
+                value = getattr(reference, item[0])
+                self.assertAlmostEqual(getattr(stage, item[0]), value, delta=1e-10 * abs(value),
+                                       msg=item[0] + " of stage " + str(k + 1))
+
+    def testTotals(self):
+        self.assertAlmostEqual(self.multiStage.T_t3, self.chain[-1].T_t3, delta=1e-10)
+        self.assertAlmostEqual(self.multiStage.Pi_total, numpy.prod(PI), delta=1e-12)
+        self.assertAlmostEqual(self.multiStage.deltaP / sum(stage.deltaP for stage in self.chain), 1.0, delta=1e-12)
+
+    def testBladeGeometry(self):
+        for k, reference in enumerate(self.chain):
+            for name in ["ArrayLayer1", "ArrayLayer2", "ArrayLayer3"]:
+                numpy.testing.assert_allclose(getattr(self.multiStage, name)[k], getattr(reference, name),
+                                              rtol=1e-10, atol=1e-12, err_msg=name + " of stage " + str(k + 1))
+
+    def testStageArrayLength(self):
+        comp = compressor.MultiStageAxialCompressor("multistage", 3)
+        comp.Pi = numpy.array([1.2, 1.2])
+        self.assertRaises(Exception, comp.getStageArray, "Pi")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_designLibrary.py
+# Design files (designLibrary.saveDesigns / loadDesigns) and the import of INI files.
+# imports:
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from gtdev import compressor, designLibrary
+from tests.engines import makeTurbofan, makeTurbojet
+
+
+# Turbojet mit dreistufigem Axialverdichter
+def makeMultiStageTurbojet():
+    turbo = makeTurbojet("TJ-70 multistage")
+    hpc = compressor.MultiStageAxialCompressor("hpc", 3)
+    hpc.Pi = numpy.array([1.7, 1.5, 1.53])
+    hpc.eta_pol = 0.75
+    hpc.Ma_inlet = 0.4
+    turbo.replaceSubcomponent("hpc", hpc)
+    return turbo
+
+
+class DesignLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "library.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertSameDesign(self, obj, reference):
+        self.assertIs(type(obj), type(reference))
+        self.assertEqual(obj.identification, reference.identification)
+        for item in reference.thermoInputParams + reference.thermoOutputParams + reference.aeroInputParams + \
+                reference.aeroOutputParams:
+            value = getattr(reference, item[0], None)
+            if isinstance(value, numpy.ndarray):
+                numpy.testing.assert_array_equal(getattr(obj, item[0]), value, err_msg=item[0])
+            else:
+                self.assertEqual(getattr(obj, item[0]), value, item[0])
+        for component in reference.subcomponentList:
+            self.assertSameDesign(getattr(obj, component[0]), component[1])
+
+    def testRoundTrip(self):
+        engines = [makeTurbojet(), makeTurbofan(), makeMultiStageTurbojet()]
+        for engine in engines:
+            engine.calcThermo()
+        designLibrary.saveDesigns(self.filename, engines)
+        loaded = designLibrary.loadDesigns(self.filename)
+        self.assertEqual(len(loaded), len(engines))
+        for obj, engine in zip(loaded, engines):
+            self.assertSameDesign(obj, engine)
+        self.assertEqual(os.listdir(self.directory), ["library.json"])
+
+    def testLoadedDesignCalculates(self):
+        engine = makeMultiStageTurbojet()
+        engine.calcThermo()
+        designLibrary.saveDesigns(self.filename, [makeMultiStageTurbojet()])
+        obj = designLibrary.loadDesigns(self.filename)[0]
+        self.assertIs(obj.hpc, obj.subcomponentList[0][1])
+        obj.calcThermo()
+        self.assertEqual(obj.SFC, engine.SFC)
+        numpy.testing.assert_array_equal(obj.hpc.T_t3_stages, engine.hpc.T_t3_stages)
+
+    def testImportIniFiles(self):
+        engine = makeTurbojet()
+        engine.calcThermo()
+        filename = os.path.join(self.directory, "tj70")
+        engine.saveObject(filename)
+        obj = designLibrary.importIniFiles([filename])[0]
+        self.assertEqual(obj.type, engine.type)
+        self.assertEqual(obj.hpc.Pi, engine.hpc.Pi)
+        self.assertAlmostEqual(obj.SFC, engine.SFC, delta=1e-9 * engine.SFC)
+
+    def testUnknownFormat(self):
+        with open(self.filename, "w") as f:
+            json.dump({"format": designLibrary.DESIGN_FORMAT + 1, "designs": []}, f)
+        self.assertRaises(Exception, designLibrary.readDesigns, self.filename)
+
+    def testUnknownType(self):
+        design = designLibrary.getDesign(makeTurbojet())
+        design["type"] = "Ramjet"
+        self.assertRaises(Exception, designLibrary.buildDesign, design)
+
+
+if __name__ == "__main__":
+    unittest.main()
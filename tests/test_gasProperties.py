@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_gasProperties.py
+# Gas property backends (setGasPropertyMode) against each other.
+# imports:
+import unittest
+
+import numpy
+
+from gtdev import helper_methods
+
+# (material, beta) der geprueften Gase
+GASES = [("Air", 0.0), ("exhaust", 0.0), ("exhaust", 0.02), ("exhaust", 0.05)]
+
+
+class GasPropertyModeTest(unittest.TestCase):
+    def tearDown(self):
+        helper_methods.setGasPropertyMode("fsolve")
+
+    # kappa of all GASES on a grid of total temperatures and mach numbers in the given mode
+    def getKappas(self, mode):
+        helper_methods.setGasPropertyMode(mode)
+        kappas = {}
+        with helper_methods.propertyCache(enabled=False):
+            for material, beta in GASES:
+                for Tt in numpy.linspace(200.0, 2200.0, 41):
+                    for Ma in (0.0, 0.4, 0.9):
+                        kappas[material, beta, Tt, Ma] = helper_methods.getKappa(Tt, Ma, material, beta)
+        return kappas
+
+    def testTableWithinErrorBound(self):
+        reference = self.getKappas("fsolve")
+        table = self.getKappas("table")
+        errorBound = helper_methods.getKappaTable().errorBound
+        for key, kappa in reference.items():
+            self.assertLessEqual(abs(table[key] - kappa), 1.1 * errorBound[key[0]] + 1.5e-8 * kappa, str(key))
+
+    def testUnknownMode(self):
+        self.assertRaises(ValueError, helper_methods.setGasPropertyMode, "spline")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_processModes.py
+# isentrope/polytrope in the "entropy" process mode against a converged march (benchmarks/process_modes.py).
+# imports:
+import unittest
+
+from benchmarks.process_modes import CASES, endState, referenceState
+from gtdev import helper_methods
+
+
+class EntropyProcessTest(unittest.TestCase):
+    def setUp(self):
+        helper_methods.setProcessMode("entropy")
+
+    def tearDown(self):
+        helper_methods.setProcessMode("march")
+
+    def testEndTemperature(self):
+        for case in CASES:
+            T2, p2back = endState(*case)
+            self.assertAlmostEqual(T2, referenceState(*case, steps=2000), delta=1e-3, msg=str(case))
+
+    def testRoundTrip(self):
+        for case in CASES:
+            T2, p2back = endState(*case)
+            self.assertAlmostEqual(p2back / case[3], 1.0, delta=1e-9, msg=str(case))
+
+
+if __name__ == "__main__":
+    unittest.main()
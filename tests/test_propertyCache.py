@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_propertyCache.py
+# Memoization of the gas property functions (helper_methods.PropertyCache).
+# imports:
+import threading
+import unittest
+
+from gtdev import helper_methods
+from tests.engines import makeTurbojet
+
+
+class PropertyCacheTest(unittest.TestCase):
+    def testOffByDefault(self):
+        self.assertIsNone(helper_methods.getPropertyCache())
+
+    def testExactResults(self):
+        reference = makeTurbojet()
+        reference.calcThermo()
+        with helper_methods.propertyCache() as cache:
+            for i in range(2):
+                turbo = makeTurbojet()
+                turbo.calcThermo()
+                self.assertEqual(turbo.SFC, reference.SFC)
+                self.assertEqual(turbo.mflow, reference.mflow)
+        self.assertGreater(cache.hits, 0)
+        self.assertIsNone(helper_methods.getPropertyCache())
+
+    def testRoundedArguments(self):
+        with helper_methods.propertyCache(digits=6) as cache:
+            kappa = helper_methods.getKappa(1000.0000001, 0.3)
+            self.assertEqual(helper_methods.getKappa(1000.0, 0.3), kappa)
+        self.assertEqual(cache.getStatistics()["hits"], 1)
+        self.assertEqual(kappa, helper_methods.getKappa(1000.0, 0.3))
+
+    def testEviction(self):
+        with helper_methods.propertyCache(maxSize=10) as cache:
+            for T in range(300, 320):
+                helper_methods.getKappa(float(T))
+        self.assertEqual(cache.getStatistics()["size"], 10)
+        self.assertEqual(cache.evictions, 10)
+
+    def testThreads(self):
+        temperatures = [300.0 + 10.0 * i for i in range(50)]
+        reference = [helper_methods.getKappa(T, 0.3) for T in temperatures]
+        errors = []
+
+        def work():
+            try:
+                for i in range(5):
+                    if [helper_methods.getKappa(T, 0.3) for T in temperatures] != reference:
+                        errors.append("wrong result")
+            except Exception as detail:
+                errors.append(detail)
+
+        with helper_methods.propertyCache(maxSize=20) as cache:
+            threads = [threading.Thread(target=work) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(cache.hits + cache.misses, 4 * 5 * len(temperatures))
+        self.assertLessEqual(len(cache.entries), cache.maxSize)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_resultCache.py
+# Persistent result cache: hits, misses and the parts of the key.
+# imports:
+import shutil
+import tempfile
+import unittest
+
+from gtdev import compressor, helper_methods
+from gtdev.resultCache import ResultCache
+from tests.engines import makeTurbojet
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResultCache(self.directory)
+
+    def tearDown(self):
+        helper_methods.setGasPropertyMode("fsolve")
+        shutil.rmtree(self.directory)
+
+    def calcTurbojet(self, **params):
+        turbo = makeTurbojet()
+        for path, value in params.items():
+            turbo.setParameter(path, value)
+        turbo.setResultCache(self.cache)
+        turbo.calcThermo()
+        return turbo
+
+    def testHit(self):
+        reference = self.calcTurbojet()
+        self.assertEqual((self.cache.hits, self.cache.stores), (0, self.cache.misses))
+        misses = self.cache.misses
+        turbo = self.calcTurbojet()
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, misses))
+        for path in reference.getThermoOutputPaths():
+            self.assertEqual(turbo.getParameter(path), reference.getParameter(path), path)
+
+    def testInputChange(self):
+        reference = self.calcTurbojet()
+        hits = self.cache.hits
+        turbo = self.calcTurbojet(**{"hpc.Pi": 4.5})
+        self.assertEqual(self.cache.hits, hits)
+        self.assertNotEqual(turbo.SFC, reference.SFC)
+
+    def testSettingChange(self):
+        self.calcTurbojet()
+        hits = self.cache.hits
+        helper_methods.setGasPropertyMode("table")
+        self.calcTurbojet()
+        self.assertEqual(self.cache.hits, hits)
+
+    def calcStage(self, radius_const):
+        comp = compressor.CompressorAxial("stage")
+        comp.T_t1 = 293.15
+        comp.Pi = 1.2
+        comp.eta_pol = 0.8
+        comp.mflow = 0.28
+        comp.n = 90000.0
+        comp.r_h1 = 0.015
+        comp.r_s1 = 0.03
+        comp.reaction = 0.7
+        comp.diffusion_rotor = 0.4
+        comp.diffusion_stator = 0.45
+        comp.b_to_s_rotor = 1.2
+        comp.b_to_s_stator = 1.7
+        comp.radius_const = radius_const
+        comp.setResultCache(self.cache)
+        comp.calcThermo()
+        comp.calcAero()
+        return comp
+
+    def testCacheKeyParams(self):
+        reference = self.calcStage("rm")
+        hits = self.cache.hits
+        comp = self.calcStage("casing")
+        self.assertEqual(self.cache.hits, hits + 1)  # calcThermo, radius_const wirkt nur auf calcAero
+        self.assertEqual(comp.r_s3, comp.r_s1)
+        self.assertNotEqual(comp.r_s3, reference.r_s3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_turbofan.py
+# Turbofan and Turbofan_Recalc cycles.
+# imports:
+import unittest
+
+from gtdev import turbofan
+from tests.engines import makeTurbofan
+
+
+class TurbofanTest(unittest.TestCase):
+    def testSpecificCycle(self):
+        turbo = makeTurbofan()
+        turbo.calcThermo()
+        reference = makeTurbofan()
+        reference.useSpecificCycle = False
+        reference.calcThermo()
+        self.assertAlmostEqual(turbo.F, turbo.thrust, delta=1e-9 * turbo.thrust)
+        for name in ["mflow", "SFC", "c_9", "c_19"]:
+            self.assertAlmostEqual(getattr(turbo, name) / getattr(reference, name), 1.0, delta=1e-6, msg=name)
+
+    def testRecalc(self):
+        turbo = makeTurbofan(turbofan.Turbofan_Recalc)
+        turbo.calcThermo()
+        self.assertEqual(turbo.mflow, makeTurbofan(turbofan.Turbofan_Recalc).mflow)
+        self.assertGreater(turbo.F, 0.0)
+        self.assertGreater(turbo.SFC, 0.0)
+
+    def testRecalcSizeToThrust(self):
+        reference = makeTurbofan(turbofan.Turbofan_Recalc)
+        reference.calcThermo()
+        turbo = makeTurbofan(turbofan.Turbofan_Recalc)
+        turbo.sizeToThrust(2 * reference.F)
+        self.assertAlmostEqual(turbo.F / reference.F, 2.0, delta=1e-12)
+        self.assertAlmostEqual(turbo.mflow / reference.mflow, 2.0, delta=1e-9)
+        self.assertAlmostEqual(turbo.SFC / reference.SFC, 1.0, delta=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ===============================================================================
+# Gas Turbine Developer (c) Hummingbird - TUM Gas Turbines
+# Institute for Flight Propulsion, TU Munich
+# Author: Sebastian G. Barthmes, Sebastian Brehm, Jan Matheis, Peter Schöttl
+# Published under the Terms of GNU public licence v3
+# ===============================================================================
+
+# test_turbojet.py
+# Turbojet cycle: specific cycle against the thrust iteration, batch cycle against the scalar cycle.
+# imports:
+import unittest
+
+import numpy
+
+from tests.engines import makeTurbojet
+
+
+class TurbojetTest(unittest.TestCase):
+    def testSpecificCycle(self):
+        turbo = makeTurbojet()
+        turbo.calcThermo()
+        reference = makeTurbojet()
+        reference.useSpecificCycle = False
+        reference.calcThermo()
+        self.assertAlmostEqual(turbo.F, turbo.thrust, delta=1e-9 * turbo.thrust)
+        for name in ["mflow", "SFC", "c_9", "eta_th"]:
+            self.assertAlmostEqual(getattr(turbo, name) / getattr(reference, name), 1.0, delta=1e-6, msg=name)
+
+    def testNoSolution(self):
+        turbo = makeTurbojet()
+        turbo.hpc.Pi = 1.5  # Turbine braucht mehr Druckverhaeltnis als vorhanden
+        with self.assertRaises(Exception) as context:
+            turbo.calcThermo()
+        self.assertIn("wrong result", str(context.exception))
+
+    def testBatchCycle(self):
+        Pi, T_t3 = numpy.meshgrid([2.5, 3.9, 6.0], [1000.0, 1150.0, 1300.0])
+        results = makeTurbojet().calcThermoBatch(**{"hpc.Pi": Pi, "combc.T_t3": T_t3})
+        self.assertTrue(numpy.all(results["valid"]))
+        for index in numpy.ndindex(Pi.shape):
+            turbo = makeTurbojet()
+            turbo.hpc.Pi = float(Pi[index])
+            turbo.combc.T_t3 = float(T_t3[index])
+            turbo.calcThermo()
+            for path, values in results.items():
+                if path == "valid":
+                    continue
+                value = turbo.getParameter(path)
+                self.assertAlmostEqual(values[index], value, delta=1e-8 * abs(value) + 1e-12, msg=path)
+
+    def testBatchCycleMasksFailedPoints(self):
+        results = makeTurbojet().calcThermoBatch(**{"hpc.Pi": numpy.array([1.5, 3.9])})
+        self.assertEqual(results["valid"].tolist(), [False, True])
+        self.assertTrue(numpy.isnan(results["SFC"][0]))
+        self.assertTrue(numpy.isfinite(results["SFC"][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()